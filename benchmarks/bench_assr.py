@@ -0,0 +1,39 @@
+"""
+Compare the vectorized ASSR construction with the state-by-state loop.
+
+    python -m benchmarks.bench_assr --min-bits 8 --max-bits 24 --loop-max-bits 18
+"""
+import argparse
+import time
+
+from benchmarks.networks import random_network
+from pybcn.small_bcn import SmallBCN
+from tests.test_small_bcn import generate_assr_loop
+
+
+def timeit(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-bits", type=int, default=8)
+    parser.add_argument("--max-bits", type=int, default=24)
+    parser.add_argument("--loop-max-bits", type=int, default=18, help="skip the loop above this size")
+    args = parser.parse_args()
+
+    print(f"{'n+m':>4} {'n':>3} {'m':>3} {'vectorized (s)':>15} {'loop (s)':>10} {'speedup':>8}")
+    for bits in range(args.min_bits, args.max_bits + 1):
+        m = max(1, bits // 4)
+        n = bits - m
+        bcn = SmallBCN(random_network(n, m, seed=bits))
+        vectorized = timeit(bcn._generate_assr)
+        if bits <= args.loop_max_bits:
+            res = {}
+            loop = timeit(lambda: res.update(L=generate_assr_loop(bcn)))
+            assert (res["L"] == bcn.L).all(), "results differ"
+            print(f"{bits:>4} {n:>3} {m:>3} {vectorized:>15.4f} {loop:>10.4f} {loop / vectorized:>7.1f}x")
+        else:
+            print(f"{bits:>4} {n:>3} {m:>3} {vectorized:>15.4f} {'-':>10} {'-':>8}")
@@ -0,0 +1,44 @@
+"""
+Compare the forward BFS of `SmallBCN.optimal_time_control` with the bidirectional search on networks
+with long control horizons.
+
+    python -m benchmarks.bench_bidirectional --queries 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.networks import random_network
+from pybcn.small_bcn import SmallBCN
+
+
+def timeit(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def ring(n: int) -> dict:
+    """
+    A shift register of `n` variables fed by an input, most states need close to `n` steps.
+    """
+    return {"x1": f"x{n} ^ u1", **{f"x{i}": f"x{i - 1}" for i in range(2, n + 1)}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'network':<12} {'mean T':>7} {'forward (s)':>12} {'bidirectional (s)':>18} {'speedup':>8}")
+    for name, d in (("ring 12", ring(12)), ("ring 16", ring(16)), ("random 14", random_network(12, 2, degree=2, seed=0)),
+                    ("random 16", random_network(14, 2, degree=2, seed=1))):
+        bcn = SmallBCN(d)
+        bcn.predecessors
+        pairs = np.random.default_rng(0).integers(1, bcn.N + 1, (args.queries, 2)).tolist()
+        Ts = [bcn.optimal_time_control(init, dest, bidirectional=True)[0] for init, dest in pairs]
+        mean = np.mean([T for T in Ts if T < 2 ** 32] or [0])
+        forward = timeit(lambda: [bcn.optimal_time_control(init, dest) for init, dest in pairs])
+        bidirectional = timeit(lambda: [bcn.optimal_time_control(init, dest, bidirectional=True) for init, dest in pairs])
+        print(f"{name:<12} {mean:>7.1f} {forward:>12.4f} {bidirectional:>18.4f} {forward / bidirectional:>7.1f}x")
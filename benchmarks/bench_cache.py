@@ -0,0 +1,51 @@
+"""
+Compare cold and warm startup of `LargeBCN.partition` with an ASSRCache, and loading a snapshot saved by `LargeBCN.save`.
+
+    python -m benchmarks.bench_cache
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.networks import EXAMPLE_NETWORK, random_network
+from pybcn.cache import ASSRCache
+from pybcn.large_bcn import LargeBCN
+
+
+def startup(d: dict, cache=None) -> float:
+    start = time.perf_counter()
+    bcn = LargeBCN(d)
+    bcn.partition(cache=cache)
+    return time.perf_counter() - start
+
+
+def load(path: str, mmap: bool) -> float:
+    start = time.perf_counter()
+    LargeBCN.load(path, mmap=mmap)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    networks = {
+        "example": EXAMPLE_NETWORK,
+        "random n=18 m=4": random_network(18, 4),
+        "random n=20 m=4": random_network(20, 4),
+    }
+    print(f"{'network':<20} {'no cache (s)':>13} {'cold (s)':>10} {'warm (s)':>10} {'snapshot (s)':>13} {'mmap (s)':>9}")
+    for name, d in networks.items():
+        no_cache = min(startup(d) for _ in range(args.repeat))
+        with tempfile.TemporaryDirectory() as directory:
+            cold = startup(d, ASSRCache(directory))
+            warm = min(startup(d, ASSRCache(directory)) for _ in range(args.repeat))
+            bcn = LargeBCN(d)
+            bcn.partition()
+            path = os.path.join(directory, "network.snapshot")
+            bcn.save(path)
+            snapshot = min(load(path, False) for _ in range(args.repeat))
+            mmap = min(load(path, True) for _ in range(args.repeat))
+        print(f"{name:<20} {no_cache:>13.4f} {cold:>10.4f} {warm:>10.4f} {snapshot:>13.4f} {mmap:>9.4f}")
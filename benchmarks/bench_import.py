@@ -0,0 +1,55 @@
+"""
+Measure the time to import the package in a fresh interpreter, apart from its dependencies numpy and rustworkx,
+and check that the modules only some queries need are not imported.
+
+    python -m benchmarks.bench_import --repeat 20 --max-ms 40
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# modules imported only where they are used
+LAZY_MODULES = (
+    "ply.yacc", "rustworkx.visualization", "multiprocessing", "concurrent.futures", "hashlib", "logging", "asyncio",
+)
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import numpy, rustworkx
+middle = time.perf_counter()
+import {module}
+end = time.perf_counter()
+print(json.dumps([middle - start, end - middle, [m for m in {lazy!r} if m in sys.modules]]))
+"""
+
+
+def measure(module: str) -> tuple:
+    """
+    :return: the seconds to import numpy and rustworkx, the seconds to import `module` after them,
+        and the modules of `LAZY_MODULES` that were imported
+    """
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)], capture_output=True, text=True, check=True
+    ).stdout
+    return tuple(json.loads(out))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, help="fail if importing a module takes longer, dependencies excluded")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<22} {'dependencies (ms)':>18} {'pybcn (ms)':>11}  eagerly imported")
+    for module in ("pybcn.small_bcn", "pybcn.large_bcn"):
+        runs = [measure(module) for _ in range(args.repeat)]
+        dependencies = statistics.median(run[0] for run in runs) * 1000
+        own = statistics.median(run[1] for run in runs) * 1000
+        eager = sorted({m for run in runs for m in run[2]})
+        print(f"{module:<22} {dependencies:>18.1f} {own:>11.1f}  {', '.join(eager) or '-'}")
+        failed |= bool(eager) or (args.max_ms is not None and own > args.max_ms)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,81 @@
+"""
+Compare loading large networks, i.e. tokenizing them, finding their inputs and condensing their dependency graph,
+from dicts and from `.bnet` and `var = expr` files with the former implementation.
+
+    python -m benchmarks.bench_load --sizes 1000,10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import rustworkx as rx
+
+from benchmarks.networks import structured_network
+from pybcn.large_bcn import LargeBCN
+from pybcn.lexer import lexer
+
+
+def timeit(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def former_load(d: dict) -> list:
+    """
+    The former `LargeBCN._generate` and the condensation of the former `LargeBCN.partition`.
+    """
+    variables = list(d.keys())
+    list_of_tokens = {}
+    input_variables = []
+    for var, expr in d.items():
+        lexer.input(expr)
+        tokens = lexer.get_all_tokens()
+        list_of_tokens[var] = tokens
+        input_variables.extend(
+            t.value for t in tokens if t.value not in variables and t.value not in input_variables and t.type == "VARIABLE"
+        )
+    dag = rx.PyDiGraph()
+    variable_indices = dict(zip(variables, dag.add_nodes_from(variables)))
+    for var, tokens in list_of_tokens.items():
+        for tok in tokens:
+            if tok.value in variables:
+                dag.add_edge(variable_indices[tok.value], variable_indices[var], None)
+    sccs = rx.strongly_connected_components(dag)
+    return [{dag.nodes()[i]: d[dag.nodes()[i]] for i in scc} for scc in sccs]
+
+
+def load(f) -> list:
+    bcn = f()
+    return bcn._condense()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000", help="the approximate numbers of variables")
+    parser.add_argument("--former-max", type=int, default=5000, help="time the former implementation up to this size")
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'former (s)':>11} {'dict (s)':>9} {'bnet (s)':>9} {'text (s)':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in map(int, args.sizes.split(",")):
+            rng = random.Random(size)
+            sccs = []
+            while sum(sccs) < size * 3 // 4:
+                sccs.append(rng.randint(1, 6))
+            d = structured_network(sccs, inputs=20, degree=3, chains=size // 40, chain_depth=10, seed=size)
+            bnet = os.path.join(directory, f"{size}.bnet")
+            text = os.path.join(directory, f"{size}.txt")
+            with open(bnet, "w") as f:
+                f.write("targets, factors\n")
+                f.writelines(f"{var}, {expr}\n" for var, expr in d.items())
+            with open(text, "w") as f:
+                f.writelines(f"{var} = {expr}\n" for var, expr in d.items())
+
+            former = timeit(lambda: former_load(d)) if len(d) <= args.former_max else float("nan")
+            from_dict = timeit(lambda: load(lambda: LargeBCN(d)))
+            from_bnet = timeit(lambda: load(lambda: LargeBCN.from_file(bnet)))
+            from_text = timeit(lambda: load(lambda: LargeBCN.from_file(text)))
+            print(f"{len(d):>6} {former:>11.4f} {from_dict:>9.4f} {from_bnet:>9.4f} {from_text:>9.4f} {former / from_dict:>7.1f}x")
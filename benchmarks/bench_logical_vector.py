@@ -0,0 +1,69 @@
+"""
+Compare the LogicalVector conversions with their former implementations and with the batch functions.
+
+    python -m benchmarks.bench_logical_vector --count 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pybcn.logical_vector import LogicalVector, positions_to_states, states_to_positions
+
+
+def timeit(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def halving_to_list(v: LogicalVector) -> list:
+    """
+    The former `LogicalVector.to_list`.
+    """
+    result = []
+    pos = v.pos
+    dim = v.dim
+    while dim != 1:
+        result.append(1 if pos <= dim // 2 else 0)
+        dim = dim // 2
+        pos = (pos - 1) % dim + 1
+    return result
+
+
+def recursive_mul(v: LogicalVector, o: list) -> LogicalVector:
+    if len(o) == 0:
+        return v
+    return recursive_mul(v * o[0], o[1:])
+
+
+def recursive_from_states(l: list) -> LogicalVector:
+    """
+    The former `LogicalVector.from_states`.
+    """
+    l = [LogicalVector.from_integer(i) for i in l]
+    return recursive_mul(l[0], l[1:])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'n':>3} {'conversion':<12} {'former (s)':>11} {'scalar (s)':>11} {'batch (s)':>10} {'speedup':>8} {'batch speedup':>14}")
+    for n in (8, 16, 32, 48):
+        rng = np.random.default_rng(n)
+        states = rng.integers(0, 2, (args.count, n))
+        positions = states_to_positions(states)
+        vectors = [LogicalVector(pos, 2 ** n) for pos in positions.tolist()]
+        lists = states.tolist()
+
+        former = timeit(lambda: [halving_to_list(v) for v in vectors])
+        scalar = timeit(lambda: [v.to_list() for v in vectors])
+        batch = timeit(lambda: positions_to_states(positions, n))
+        print(f"{n:>3} {'to_list':<12} {former:>11.4f} {scalar:>11.4f} {batch:>10.4f} {former / scalar:>7.1f}x {former / batch:>13.1f}x")
+
+        former = timeit(lambda: [recursive_from_states(l) for l in lists])
+        scalar = timeit(lambda: [LogicalVector.from_states(l) for l in lists])
+        batch = timeit(lambda: states_to_positions(states))
+        print(f"{n:>3} {'from_states':<12} {former:>11.4f} {scalar:>11.4f} {batch:>10.4f} {former / scalar:>7.1f}x {former / batch:>13.1f}x")
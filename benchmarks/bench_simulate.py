@@ -0,0 +1,58 @@
+"""
+Compare simulating many trajectories with `SmallBCN.next_state` one at a time with `simulate_batch`.
+
+    python -m benchmarks.bench_simulate --trajectories 10000 --steps 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.networks import EXAMPLE_NETWORK, random_network
+from pybcn.large_bcn import LargeBCN
+from pybcn.small_bcn import SmallBCN
+
+
+def timeit(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def loop_simulate(bcn: SmallBCN, inits: np.ndarray, inputs: np.ndarray) -> list:
+    res = []
+    for init, seq in zip(inits.tolist(), inputs.tolist()):
+        state = init
+        trajectory = [state]
+        for u in seq:
+            state = bcn.next_state(state, u)
+            trajectory.append(state)
+        res.append(trajectory)
+    return res
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trajectories", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+    K, T = args.trajectories, args.steps
+
+    print(f"{'network':<10} {'loop (s)':>9} {'batch (s)':>10} {'stream (s)':>11} {'speedup':>8}")
+    for n, m in ((8, 2), (12, 3), (16, 4)):
+        bcn = SmallBCN(random_network(n, m, seed=n))
+        rng = np.random.default_rng(n)
+        inits = rng.integers(1, bcn.N + 1, K)
+        inputs = rng.integers(1, bcn.M + 1, (K, T))
+        loop = timeit(lambda: loop_simulate(bcn, inits, inputs))
+        batch = timeit(lambda: bcn.simulate_batch(inits, inputs))
+        stream = timeit(lambda: [None for _ in bcn.simulate_batch(inits, inputs, stream=True)])
+        print(f"{f'n={n} m={m}':<10} {loop:>9.4f} {batch:>10.4f} {stream:>11.4f} {loop / batch:>7.1f}x")
+
+    bcn = LargeBCN(EXAMPLE_NETWORK)
+    bcn.partition()
+    rng = np.random.default_rng(0)
+    inits = rng.integers(1, bcn.N + 1, K, dtype=np.int64)
+    inputs = rng.integers(1, bcn.M + 1, (K, T))
+    batch = timeit(lambda: bcn.simulate_batch(inits, inputs))
+    print(f"{'large':<10} {'-':>9} {batch:>10.4f}")
@@ -0,0 +1,54 @@
+"""
+Compare one-step successor queries on the SuccessorIndex with scanning the columns of `L`.
+
+    python -m benchmarks.bench_successors --min-bits 8 --max-bits 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.networks import random_network
+from pybcn.small_bcn import SmallBCN
+
+
+def timeit(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def scan_one_step_states(bcn: SmallBCN, state: int) -> dict:
+    """
+    The former `SmallBCN.one_step_states`, scanning all M columns of `L`.
+    """
+    res = {}
+    for k in range(bcn.M):
+        r = int(bcn.L[k * bcn.N + state - 1])
+        if r not in res:
+            res[r] = []
+        res[r].append(k + 1)
+    return res
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-bits", type=int, default=8)
+    parser.add_argument("--max-bits", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'n+m':>4} {'n':>3} {'m':>3} {'build (s)':>10} {'scan (s)':>9} {'index (s)':>10} {'speedup':>8}"
+          f" {'loop image (s)':>15} {'batch image (s)':>16} {'speedup':>8}")
+    for bits in range(args.min_bits, args.max_bits + 1):
+        m = max(1, bits // 4)
+        n = bits - m
+        bcn = SmallBCN(random_network(n, m, seed=bits))
+        states = np.random.default_rng(bits).integers(1, bcn.N + 1, args.queries).tolist()
+        build = timeit(lambda: bcn.successors)
+        scan = timeit(lambda: [scan_one_step_states(bcn, state) for state in states])
+        index = timeit(lambda: [bcn.one_step_states(state) for state in states])
+        loop_image = timeit(lambda: {s for state in states for s in scan_one_step_states(bcn, state)})
+        batch_image = timeit(lambda: bcn.one_step_image(states))
+        print(f"{bits:>4} {n:>3} {m:>3} {build:>10.4f} {scan:>9.4f} {index:>10.4f} {scan / index:>7.1f}x"
+              f" {loop_image:>15.4f} {batch_image:>16.4f} {loop_image / batch_image:>7.1f}x")
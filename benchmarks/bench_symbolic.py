@@ -0,0 +1,46 @@
+"""
+Compare minimum-time control on the ASSR of SmallBCN with SymbolicBCN, on networks up to sizes only the latter handles.
+
+    python -m benchmarks.bench_symbolic --max-bits 40
+"""
+import argparse
+import time
+
+from benchmarks.networks import random_network
+from pybcn.small_bcn import SmallBCN
+from pybcn.symbolic_bcn import SymbolicBCN
+
+# build ASSRs only up to this many state and input variables
+EXPLICIT_MAX_BITS = 20
+
+
+def timeit(f):
+    start = time.perf_counter()
+    res = f()
+    return time.perf_counter() - start, res
+
+
+def ring(n: int) -> dict:
+    """
+    A shift register of `n` variables fed by an input, every state is reachable in at most `n` steps.
+    """
+    return {"x1": f"x{n} ^ u1", **{f"x{i}": f"x{i - 1}" for i in range(2, n + 1)}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-bits", type=int, default=8)
+    parser.add_argument("--max-bits", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'network':<8} {'n+m':>4} {'T':>4} {'explicit (s)':>13} {'symbolic (s)':>13} {'BDD nodes':>10}")
+    for bits in range(args.min_bits, args.max_bits + 1, 4):
+        for name, d in (("ring", ring(bits - 1)), ("random", random_network(bits - max(1, bits // 4), max(1, bits // 4), seed=bits))):
+            explicit = "-"
+            if bits <= EXPLICIT_MAX_BITS:
+                seconds, (T, _) = timeit(lambda: SmallBCN(d).optimal_time_control_2(1, 2, first_only=True))
+                explicit = f"{seconds:.4f}"
+            build, bcn = timeit(lambda: SymbolicBCN(d))
+            seconds, (T, _) = timeit(lambda: bcn.optimal_time_control(1, 2))
+            seconds += build
+            print(f"{name:<8} {bits:>4} {T if T < 2 ** 32 else '-':>4} {explicit:>13} {seconds:>13.4f} {len(bcn.bdd):>10}")
@@ -0,0 +1,112 @@
+import random
+from typing import List, Sequence
+
+# the network of `example.py`
+EXAMPLE_NETWORK = {
+    "x1": "u1 & (x3 | x6)",
+    "x2": "x1 | (x3 & x6)",
+    "x3": "(u1 & u2) & (!x5)",
+    "x4": "(!x7) & x3 & x2",
+    "x5": "x1 | (!x6)",
+    "x6": "u3 & (!x7)",
+    "x7": "x4",
+    "x8": "x3",
+    "x9": "x4",
+    "x10": "x9",
+    "x11": "x10",
+    "x12": "x11 & x4",
+    "x13": "x9",
+    "x14": "x9",
+    "x15": "(x8 | x12) & (x4 & x11 & x14)",
+    "x16": "x15",
+    "x17": "x16",
+    "x18": "x17",
+    "x19": "x18",
+    "x20": "x15",
+    "x21": "x23",
+    "x22": "x21",
+    "x23": "x20",
+    "x24": "x22",
+    "x25": "x23",
+    "x26": "!x25",
+    "x27": "!x26",
+    "x28": "x29",
+    "x29": "x30",
+    "x30": "x34",
+    "x31": "x13 | x35",
+    "x32": "x31",
+    "x33": "x32",
+    "x34": "x33",
+    "x35": "x20 & x23",
+    "x36": "x34",
+    "x37": "x36 & x24"
+}
+
+
+def random_network(n: int, m: int, degree: int = 3, seed: int = 0) -> dict:
+    """
+    Generate a random network with `n` state variables and `m <= n` inputs, every input being used.
+    """
+    rng = random.Random(seed)
+    variables = [f"x{i}" for i in range(1, n + 1)]
+    inputs = [f"u{i}" for i in range(1, m + 1)]
+    d = {}
+    for i, var in enumerate(variables):
+        operands = rng.sample(variables, min(degree, n))
+        if i < m:
+            operands[0] = inputs[i]
+        d[var] = _expression(rng, operands)
+    return d
+
+
+def structured_network(
+    sccs: Sequence[int],
+    inputs: int = 1,
+    degree: int = 2,
+    chains: int = 0,
+    chain_depth: int = 0,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate a random network made of strongly connected components, like the blocks `LargeBCN.partition` finds.
+    The variables of every component form a ring and refer to `degree - 1` other random variables of it,
+    the first variable of every component but the first also refers to a variable of an earlier component.
+    Then `chains` chains of `chain_depth` copies hang off random variables, like `x15..x19` of the example.
+    :param sccs: the number of variables of every component, in topological order
+    :param inputs: the number of inputs, input `i` is used by the first variable of component `i % len(sccs)`
+    :param degree: the number of variables of its component every update function refers to
+    :param chains: the number of chains
+    :param chain_depth: the number of variables of every chain, each of them a block of its own
+    :param seed: the seed of the random choices
+    :return: a dict with structure '<variable, expression>'
+    """
+    rng = random.Random(seed)
+    d = {}
+    components = []
+    for k, size in enumerate(sccs):
+        component = [f"x{len(d) + j + 1}" for j in range(size)]
+        for j, var in enumerate(component):
+            operands = [component[j - 1]] + rng.sample(component, min(degree - 1, size))
+            if j == 0:
+                if components:
+                    operands.append(rng.choice(rng.choice(components)))
+                operands.extend(f"u{i + 1}" for i in range(k, inputs, len(sccs)))
+            d[var] = _expression(rng, operands)
+        components.append(component)
+    variables = list(d)
+    for _ in range(chains):
+        previous = rng.choice(variables)
+        for _ in range(chain_depth):
+            var = f"x{len(d) + 1}"
+            d[var] = previous
+            previous = var
+    return d
+
+
+def _expression(rng: random.Random, operands: List[str]) -> str:
+    expr = operands[0]
+    for operand in operands[1:]:
+        if rng.random() < 0.3:
+            operand = f"(!{operand})"
+        expr = f"({expr}) {rng.choice(['&', '|', '^'])} {operand}"
+    return expr
@@ -0,0 +1,138 @@
+"""
+Run the suites of `benchmarks.suites`, save the timings as JSON and compare them with those of another commit.
+
+    python -m benchmarks.run                                    # saves .benchmarks/<commit>.json
+    python -m benchmarks.run --compare .benchmarks/<base>.json  # fails if a benchmark got slower
+    python -m benchmarks.run --bench Partition --repeat 10 --output partition.json
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import product
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+import benchmarks.suites
+
+RESULTS_DIR = ".benchmarks"
+
+
+def commit() -> str:
+    """
+    :return: the hash of the checked out commit, with a "+" if the tree has changes, "unknown" outside of git
+    """
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return head + ("+" if dirty else "")
+
+
+def benchmarks(module=benchmarks.suites) -> Iterator[Tuple[str, type, str]]:
+    """
+    :return: `(name, suite, method)` for every `time_*` and `track_*` method of the suites of `module`,
+        the name being "Suite.time_x"
+    """
+    for suite_name, suite in inspect.getmembers(module, inspect.isclass):
+        if suite.__module__ != module.__name__:
+            continue
+        for method in sorted(name for name in vars(suite) if name.startswith(("time_", "track_"))):
+            yield f"{suite_name}.{method}", suite, method
+
+
+def run(suite: type, method: str, repeat: int) -> Dict[str, dict]:
+    """
+    Time `method` of `suite` for every combination of the parameters, `setup` being called once for each of them.
+    A `track_*` method measures itself, the value it returns is recorded instead of its time.
+    :return: a dict with structure '<parameters, statistics of the times in seconds>', the parameters joined by ", "
+    """
+    res = {}
+    for params in product(*getattr(suite, "params", [[]])):
+        instance = suite()
+        if hasattr(instance, "setup"):
+            instance.setup(*params)
+        f = getattr(instance, method)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = f(*params)
+            times.append(value if method.startswith("track_") else time.perf_counter() - start)
+        res[", ".join(map(str, params))] = {
+            "min": min(times), "median": statistics.median(times), "max": max(times), "repeat": repeat,
+        }
+    return res
+
+
+def compare(base: dict, results: dict, threshold: float) -> list:
+    """
+    :param base: the results of an earlier run, as saved by `main`
+    :param results: the results of this run
+    :param threshold: a benchmark regressed if its median got more than this many times slower
+    :return: `(name, parameters, base median, median, ratio, regressed)` of every benchmark of both runs
+    """
+    rows = []
+    for name, timings in results.items():
+        for params, stats in timings.items():
+            before = base.get(name, {}).get(params)
+            if before is None:
+                continue
+            ratio = stats["median"] / before["median"]
+            rows.append((name, params, before["median"], stats["median"], ratio, ratio > threshold))
+    return rows
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", default="", help="a regular expression the names of the benchmarks to run must match")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help=f"the JSON file to save the results to, {RESULTS_DIR}/<commit>.json by default")
+    parser.add_argument("--compare", help="the JSON file of the results of another run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    revision = commit()
+    results = {}
+    for name, suite, method in benchmarks():
+        if not re.search(args.bench, name):
+            continue
+        results[name] = run(suite, method, args.repeat)
+        for params, stats in results[name].items():
+            print(f"{name:<45} {params:<12} {stats['median']:>10.5f} s")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": revision,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "results": results,
+        }, f, indent=2)
+    print(f"saved to {output}")
+
+    if args.compare is None:
+        return 0
+    with open(args.compare) as f:
+        base = json.load(f)
+    rows = compare(base["results"], results, args.threshold)
+    print(f"\ncompared with {base['commit']}")
+    print(f"{'benchmark':<45} {'params':<12} {'base (s)':>10} {'new (s)':>10} {'ratio':>7}")
+    for name, params, before, after, ratio, regressed in rows:
+        print(f"{name:<45} {params:<12} {before:>10.5f} {after:>10.5f} {ratio:>6.2f}x{'  REGRESSION' if regressed else ''}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
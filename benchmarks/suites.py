@@ -0,0 +1,101 @@
+"""
+Benchmark suites of the hot paths and of the import time, in the format of airspeed velocity: every class has
+`params`, one list of values for each of `param_names`, a `setup` taking one value of each, and `time_*` methods timed
+for every combination, or `track_*` methods returning what they measured.
+They are run by `benchmarks.run`, or by `asv` pointed at this module.
+"""
+import numpy as np
+
+from benchmarks.bench_import import measure
+from benchmarks.networks import random_network, structured_network
+from pybcn.large_bcn import LargeBCN
+from pybcn.small_bcn import SmallBCN
+
+# the number of queries of every control benchmark
+QUERIES = 20
+# the structures of the partition and control benchmarks: the sizes of the components, and the depth of the chains
+STRUCTURES = {
+    "3x4": ((4, 4, 4), 0),
+    "4x6+chains": ((6, 5, 4, 3), 5),
+    "5x8+chains": ((8, 6, 6, 4, 4), 10),
+}
+
+
+def reachable_pairs(bcn, count: int, steps: int = 4, seed: int = 0) -> list:
+    """
+    :return: `count` pairs `(init, dest)` of positions, `dest` being reached from a random `init` in `steps` random steps
+    """
+    rng = np.random.default_rng(seed)
+    inits = rng.integers(1, bcn.N + 1, count, dtype=np.uint64)
+    trajectories = bcn.simulate_batch(inits, rng.integers(1, bcn.M + 1, (count, steps)))
+    return [(int(init), int(dest)) for init, dest in zip(trajectories[:, 0], trajectories[:, -1])]
+
+
+def structured(name: str) -> dict:
+    sccs, chain_depth = STRUCTURES[name]
+    return structured_network(sccs, inputs=2, chains=2, chain_depth=chain_depth, seed=1)
+
+
+class GenerateASSR:
+    params = [[10, 14, 18]]
+    param_names = ["n"]
+
+    def setup(self, n):
+        self.bcn = SmallBCN(random_network(n, 2, seed=n))
+
+    def time_generate_assr(self, n):
+        self.bcn._generate_assr()
+
+
+class Partition:
+    params = [list(STRUCTURES)]
+    param_names = ["structure"]
+
+    def setup(self, structure):
+        self.bcn = LargeBCN(structured(structure))
+
+    def time_partition(self, structure):
+        self.bcn.partition()
+
+
+class SmallControl:
+    params = [[10, 14]]
+    param_names = ["n"]
+
+    def setup(self, n):
+        self.bcn = SmallBCN(random_network(n, 2, degree=2, seed=n))
+        self.bcn.successors
+        self.pairs = reachable_pairs(self.bcn, QUERIES)
+
+    def time_optimal_time_control(self, n):
+        for init, dest in self.pairs:
+            self.bcn.optimal_time_control(init, dest)
+
+    def time_optimal_time_control_2(self, n):
+        for init, dest in self.pairs:
+            self.bcn.optimal_time_control_2(init, dest)
+
+
+class LargeControl:
+    params = [list(STRUCTURES)]
+    param_names = ["structure"]
+
+    def setup(self, structure):
+        self.bcn = LargeBCN(structured(structure))
+        self.bcn.partition()
+        self.pairs = reachable_pairs(self.bcn, QUERIES)
+
+    def time_optimal_time_control(self, structure):
+        for init, dest in self.pairs:
+            self.bcn.optimal_time_control(init, dest)
+
+
+class Import:
+    params = [["pybcn.small_bcn", "pybcn.large_bcn"]]
+    param_names = ["module"]
+
+    def track_import(self, module):
+        """
+        :return: the seconds to import `module` in a fresh interpreter, numpy and rustworkx excluded
+        """
+        return measure(module)[1]
@@ -1,9 +1,6 @@
-import rustworkx as rx
 import time
-from tqdm import tqdm
 from pybcn.large_bcn import LargeBCN
 from pybcn.small_bcn import SmallBCN
-from rustworkx.visualization import graphviz_draw
 from pybcn.logical_vector import LogicalVector
 
 
@@ -0,0 +1,124 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class Attractors:
+    """
+    The attractors and basins of a functional graph, e.g. a column of `SmallBCN.L`, the network under constant inputs.
+    The transient states are peeled off layer by layer from those without predecessors, the states left are on cycles.
+    Every state is then labelled with the attractor it ends up in by walking the peeled layers backwards,
+    which takes O(N) array operations in all.
+    """
+
+    def __init__(self, next_states: np.ndarray):
+        """
+        :param next_states: `next_states[i]` is the position of the next state of state `i + 1`
+        :return: an Attractors instance
+        """
+        f = np.asarray(next_states, dtype=np.int64) - 1
+        N = len(f)
+        indegree = np.bincount(f, minlength=N)
+        layers = []
+        frontier = np.flatnonzero(indegree == 0)
+        while len(frontier):
+            layers.append(frontier)
+            targets, counts = np.unique(f[frontier], return_counts=True)
+            indegree[targets] -= counts
+            frontier = targets[indegree[targets] == 0]
+
+        # the states left with predecessors are on cycles, every cycle is first met at its smallest state
+        attractor_of = np.full(N, -1, dtype=np.int64)
+        self.cycles = []  # the positions of the states of every attractor in the order they are visited
+        successors = f.tolist()
+        for state in np.flatnonzero(indegree > 0).tolist():
+            if attractor_of[state] >= 0:
+                continue
+            cycle = []
+            while attractor_of[state] < 0:
+                attractor_of[state] = len(self.cycles)
+                cycle.append(state + 1)
+                state = successors[state]
+            self.cycles.append(cycle)
+        for layer in reversed(layers):
+            attractor_of[layer] = attractor_of[f[layer]]
+
+        self.attractor_of = attractor_of  # the index in `cycles` of the attractor state `i + 1` ends up in
+        self.basin_sizes = np.bincount(attractor_of, minlength=len(self.cycles))
+        # the number of steps of the longest transient
+        self.depth = len(layers)
+
+    @property
+    def fixed_points(self) -> List[int]:
+        """
+        :return: the positions of the states that are their own next state
+        """
+        return [cycle[0] for cycle in self.cycles if len(cycle) == 1]
+
+    def basin(self, k: int) -> np.ndarray:
+        """
+        :param k: the index of the attractor in `cycles`
+        :return: the sorted positions of the states that end up in it
+        """
+        return np.flatnonzero(self.attractor_of == k) + 1
+
+
+def block_attractors(bcn, inputs: int) -> List[List[int]]:
+    """
+    The attractors of a partitioned `LargeBCN` under constant inputs, composed block by block in topological order.
+    An attractor of the blocks seen so far is a periodic sequence of their states, of period `P`; under it a downstream
+    block is driven by a periodic sequence of inputs, so its attractors are the cycles of the map over one period
+    from its states at phase 0, each of them a cycle of `c` states giving an attractor of period `P * c`.
+    The periods can grow as the least common multiple of those of independent blocks.
+    :param bcn: a partitioned LargeBCN
+    :param inputs: pos of corresponding vector of the inputs of the network
+    :return: the positions of the states of every attractor in the order they are visited,
+        each one starting at its smallest state, sorted by that state
+    """
+    assert all(hasattr(block, "L") for block in bcn.blocks), "the attractors are composed of the ASSRs of all blocks"
+    input_index = inputs - 1
+    # the attractors of the blocks seen so far: (period, zero-based states, zero-based inputs of every block)
+    partial: List[Tuple[int, Dict[int, np.ndarray], Dict[int, np.ndarray]]] = [(1, {}, {})]
+    for k in bcn.A + bcn.B:
+        block = bcn.blocks[k]
+        exterior = 0
+        for global_shift, local_shift in bcn._input_shifts[k]:
+            exterior |= ((input_index >> global_shift) & 1) << local_shift
+        L = np.asarray(block.L, dtype=np.int64) - 1
+        res = []
+        for P, states, block_inputs in partial:
+            if k in bcn.projections:
+                projection = bcn.projections[k]
+                u = np.full(P, int(projection.exterior_bits(exterior)), dtype=np.int64)
+                for p, pred in enumerate(bcn.pred_list[k]):
+                    u |= projection.state_bits(p, states[pred])
+                    u |= projection.input_bits(p, block_inputs[pred])
+            else:
+                u = np.full(P, exterior, dtype=np.int64)
+            period_map = np.arange(block.N, dtype=np.int64)
+            for t in range(P):
+                period_map = L[u[t] * block.N + period_map]
+            for cycle in Attractors(period_map + 1).cycles:
+                c = len(cycle)
+                sequence = np.empty(P * c, dtype=np.int64)
+                state = cycle[0] - 1
+                for t in range(P * c):
+                    sequence[t] = state
+                    state = L[u[t % P] * block.N + state]
+                new_states = {b: np.tile(s, c) for b, s in states.items()}
+                new_states[k] = sequence
+                new_inputs = {b: np.tile(i, c) for b, i in block_inputs.items()}
+                new_inputs[k] = np.tile(u, c)
+                res.append((P * c, new_states, new_inputs))
+        partial = res
+
+    attractors = []
+    for P, states, _ in partial:
+        index = np.zeros(P, dtype=np.int64)
+        for k, shifts in enumerate(bcn._state_shifts):
+            for global_shift, local_shift in shifts:
+                index |= ((states[k] >> local_shift) & 1) << global_shift
+        cycle = (index + 1).tolist()
+        start = cycle.index(min(cycle))
+        attractors.append(cycle[start:] + cycle[:start])
+    return sorted(attractors)
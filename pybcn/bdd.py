@@ -0,0 +1,263 @@
+import threading
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+# the node of the constant false, and of the constant true
+FALSE = 0
+TRUE = 1
+
+# clear the memo tables of the operations once they hold this many results
+CACHE_LIMIT = 2 ** 20
+
+
+class BDD:
+    """
+    A minimal manager of reduced ordered binary decision diagrams, in pure Python.
+    Nodes are integers indexing the arrays `level`, `low` and `high`, `FALSE` and `TRUE` being the constants.
+    Variables are identified by their levels, the variable of the lower level being tested first.
+    Equal functions are the same node, so sets of states can be compared and hashed by their nodes.
+    A manager can be shared between threads, nodes are created and the memo tables cleared under a lock.
+    """
+
+    def __init__(self):
+        self.level = [float("inf"), float("inf")]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+        self._unique = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.level)
+
+    def node(self, level: int, low: int, high: int) -> int:
+        """
+        :return: the node testing the variable of `level`, `low` if it is 0 and `high` if it is 1
+        """
+        if low == high:
+            return low
+        key = (level, low, high)
+        u = self._unique.get(key)
+        if u is None:
+            with self._lock:
+                # another thread may have created the node since the lookup
+                u = self._unique.get(key)
+                if u is None:
+                    u = len(self.level)
+                    self.level.append(level)
+                    self.low.append(low)
+                    self.high.append(high)
+                    self._unique[key] = u
+        return u
+
+    def var(self, level: int) -> int:
+        """
+        :return: the node of the variable of `level`
+        """
+        return self.node(level, FALSE, TRUE)
+
+    def _memo(self, key):
+        if len(self._cache) > CACHE_LIMIT:
+            with self._lock:
+                if len(self._cache) > CACHE_LIMIT:
+                    self._cache.clear()
+        return self._cache.get(key)
+
+    def _store(self, key, res: int):
+        with self._lock:
+            self._cache[key] = res
+
+    def apply(self, op: str, u: int, v: int) -> int:
+        """
+        :param op: "AND", "OR" or "XOR", the names of the operators in `pybcn.parser`
+        :return: the node of `u op v`
+        """
+        if op == "AND":
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif op == "OR":
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        elif u == v:
+            return FALSE
+        elif u == FALSE:
+            return v
+        elif v == FALSE:
+            return u
+        if u > v:
+            u, v = v, u
+        key = (op, u, v)
+        res = self._memo(key)
+        if res is not None:
+            return res
+        level = min(self.level[u], self.level[v])
+        u0, u1 = (self.low[u], self.high[u]) if self.level[u] == level else (u, u)
+        v0, v1 = (self.low[v], self.high[v]) if self.level[v] == level else (v, v)
+        res = self.node(level, self.apply(op, u0, v0), self.apply(op, u1, v1))
+        self._store(key, res)
+        return res
+
+    def neg(self, u: int) -> int:
+        """
+        :return: the node of the negation of `u`
+        """
+        return self.apply("XOR", u, TRUE)
+
+    def cube(self, values: Mapping[int, int]) -> int:
+        """
+        :param values: the value of the variable of every level
+        :return: the node true only under these values
+        """
+        u = TRUE
+        for level in sorted(values, reverse=True):
+            u = self.node(level, FALSE, u) if values[level] else self.node(level, u, FALSE)
+        return u
+
+    def restrict(self, u: int, values: Mapping[int, int]) -> int:
+        """
+        :param values: the value of the variable of every level
+        :return: the cofactor of `u`, the variables replaced by their values
+        """
+        memo = {}
+
+        def restrict(u: int) -> int:
+            if u <= TRUE:
+                return u
+            res = memo.get(u)
+            if res is None:
+                level = self.level[u]
+                if level in values:
+                    res = restrict(self.high[u] if values[level] else self.low[u])
+                else:
+                    res = self.node(level, restrict(self.low[u]), restrict(self.high[u]))
+                memo[u] = res
+            return res
+
+        return restrict(u)
+
+    def exists(self, u: int, levels: Iterable[int]) -> int:
+        """
+        :return: the node of `u` with the variables of `levels` quantified existentially
+        """
+        return self.and_exists(u, TRUE, levels)
+
+    def and_exists(self, u: int, v: int, levels: Iterable[int]) -> int:
+        """
+        The relational product, `exists levels. u & v`, without building `u & v`.
+        """
+        levels = frozenset(levels)
+        return self._and_exists(u, v, levels, max(levels, default=-1), {})
+
+    def _and_exists(self, u: int, v: int, levels: frozenset, last: int, memo: Dict[tuple, int]) -> int:
+        if u == FALSE or v == FALSE:
+            return FALSE
+        if u == TRUE and v == TRUE:
+            return TRUE
+        if u > v:
+            u, v = v, u
+        level = min(self.level[u], self.level[v])
+        if level > last:
+            return self.apply("AND", u, v)
+        key = (u, v)
+        res = memo.get(key)
+        if res is not None:
+            return res
+        u0, u1 = (self.low[u], self.high[u]) if self.level[u] == level else (u, u)
+        v0, v1 = (self.low[v], self.high[v]) if self.level[v] == level else (v, v)
+        low = self._and_exists(u0, v0, levels, last, memo)
+        if level in levels:
+            res = TRUE if low == TRUE else self.apply("OR", low, self._and_exists(u1, v1, levels, last, memo))
+        else:
+            res = self.node(level, low, self._and_exists(u1, v1, levels, last, memo))
+        memo[key] = res
+        return res
+
+    def rename(self, u: int, levels: Mapping[int, int]) -> int:
+        """
+        Substitute variables for others, the order of the variables `u` depends on must be kept.
+        :param levels: the new level of the variable of every level, the others are kept
+        """
+        memo = {}
+
+        def rename(u: int) -> int:
+            if u <= TRUE:
+                return u
+            res = memo.get(u)
+            if res is None:
+                level = levels.get(self.level[u], self.level[u])
+                low, high = rename(self.low[u]), rename(self.high[u])
+                assert level < self.level[low] and level < self.level[high], \
+                    f"renaming the variable of level {self.level[u]} changes the order of the variables"
+                res = self.node(level, low, high)
+                memo[u] = res
+            return res
+
+        return rename(u)
+
+    def evaluate(self, u: int, values: Mapping[int, int]) -> bool:
+        """
+        :param values: the value of the variable of every level `u` depends on
+        :return: the value of `u` under them
+        """
+        while u > TRUE:
+            u = self.high[u] if values[self.level[u]] else self.low[u]
+        return u == TRUE
+
+    def count(self, u: int, levels: List[int]) -> int:
+        """
+        :return: the number of values of the variables of `levels` under which `u` is true, `u` depending on no other variable
+        """
+        rank = {level: i for i, level in enumerate(sorted(levels))}
+        memo = {FALSE: 0, TRUE: 1}
+
+        def rank_of(u: int) -> int:
+            return rank[self.level[u]] if u > TRUE else len(rank)
+
+        def count(u: int) -> int:
+            # the number of values of the variables from the level of `u` on
+            res = memo.get(u)
+            if res is None:
+                r = rank_of(u)
+                res = sum(count(v) << (rank_of(v) - r - 1) for v in (self.low[u], self.high[u]))
+                memo[u] = res
+            return res
+
+        return count(u) << rank_of(u)
+
+    def assignments(self, u: int, levels: List[int]) -> Iterator[Dict[int, int]]:
+        """
+        Enumerate the values of the variables of `levels` under which `u` is true, `u` depending on no other variable.
+        The variables are set in the order of `levels` ascending, 1 before 0, so that the positions of the
+        corresponding logical vectors come in ascending order.
+        """
+        values = {}
+
+        def walk(u: int, i: int) -> Iterator[Dict[int, int]]:
+            if u == FALSE:
+                return
+            if i == len(levels):
+                yield dict(values)
+                return
+            level = levels[i]
+            for value in (1, 0):
+                values[level] = value
+                if self.level[u] == level:
+                    yield from walk(self.high[u] if value else self.low[u], i + 1)
+                else:
+                    yield from walk(u, i + 1)
+            del values[level]
+
+        return walk(u, 0)
+
+    def pick(self, u: int, levels: List[int]) -> Dict[int, int]:
+        """
+        :return: the first item of `assignments`, `u` must not be `FALSE`
+        """
+        return next(self.assignments(u, levels))
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+from pybcn.parser import to_source
+
+CACHE_VERSION = 1
+
+
+class ASSRCache:
+    """
+    Persistent on-disk cache of ASSRs, content-addressed by the normalized update functions of a network.
+    Every entry is a `<key>.npy` file holding `L` and a `<key>.json` file holding its metadata.
+    Entries are evicted least recently used first once the cache grows over `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 ** 30):
+        """
+        :param directory: the directory of the cache, created if it does not exist
+        :param max_bytes: the maximum total size of the entries
+        :return: an ASSRCache instance
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, bcn) -> str:
+        """
+        :param bcn: a SmallBCN instance
+        :return: the key of the ASSR of the network, which depends on the update functions
+            and the order of the variables and the input variables, but not on the formatting of the expressions
+        """
+        import hashlib  # imported here, it takes a few milliseconds to import
+
+        content = {
+            "version": CACHE_VERSION,
+            "variables": bcn.variables,
+            "input_variables": bcn.input_variables,
+            "functions": [to_source(bcn.trees[var], str) for var in bcn.variables],
+        }
+        return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def get(self, key: str, bcn) -> Optional[np.ndarray]:
+        """
+        :param key: the key returned by `key`
+        :param bcn: the SmallBCN instance the ASSR is looked up for
+        :return: the memory-mapped ASSR, or None if it is not in the cache
+        """
+        try:
+            with open(self._path(key, "json")) as f:
+                metadata = json.load(f)
+            L = np.load(self._path(key, "npy"), mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        if metadata["variables"] != bcn.variables or metadata["input_variables"] != bcn.input_variables:
+            return None
+        # mark the entry as recently used
+        os.utime(self._path(key, "npy"))
+        return L
+
+    def put(self, key: str, bcn):
+        """
+        Add the ASSR of a network to the cache and evict old entries if needed.
+        :param key: the key returned by `key`
+        :param bcn: a SmallBCN instance
+        """
+        metadata = {
+            "version": CACHE_VERSION,
+            "variables": bcn.variables,
+            "input_variables": bcn.input_variables,
+            "n": bcn.n,
+            "m": bcn.m,
+            "dtype": str(bcn.L.dtype),
+            "created": time.time(),
+        }
+        # write to temporary files first so that concurrent readers never see partial entries
+        tmp = f".{os.getpid()}.tmp"
+        with open(self._path(key, "json") + tmp, "w") as f:
+            json.dump(metadata, f)
+        with open(self._path(key, "npy") + tmp, "wb") as f:
+            np.save(f, bcn.L, allow_pickle=False)
+        os.replace(self._path(key, "json") + tmp, self._path(key, "json"))
+        os.replace(self._path(key, "npy") + tmp, self._path(key, "npy"))
+        self.evict()
+
+    def entries(self) -> list:
+        """
+        :return: `(last_used, size, key)` of every entry, least recently used first
+        """
+        res = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npy"):
+                continue
+            key = name[:-len(".npy")]
+            try:
+                stat = os.stat(self._path(key, "npy"))
+                size = stat.st_size + os.path.getsize(self._path(key, "json"))
+            except OSError:
+                continue
+            res.append((stat.st_mtime, size, key))
+        res.sort()
+        return res
+
+    def size(self) -> int:
+        """
+        :return: the total size of the entries in bytes
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in `max_bytes`.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        for _, _, key in self.entries():
+            self._remove(key)
+
+    def _remove(self, key: str):
+        for ext in ("npy", "json"):
+            try:
+                os.remove(self._path(key, ext))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Dict, NamedTuple, Optional, Tuple
+
+from pybcn.stats import SolverStats
+
+
+class Progress(NamedTuple):
+    """
+    The state of a ControlJob after a horizon has been tried.
+    """
+
+    T: int  # the horizon tried last
+    states_explored: int  # the number of states in the forward layers of the source blocks up to `T`
+    combinations: int  # the number of combinations of control sequences of the source blocks tried
+    elapsed: float  # the seconds since the job started
+
+
+class _Stopped(Exception):
+    """
+    Raised in the thread of a query to stop it, see `ControlJob.cancel`.
+    """
+
+
+class ControlJob:
+    """
+    A `LargeBCN.optimal_time_control` query running in an executor, to be awaited from asyncio.
+    The query checks whether it was cancelled or ran out of time before every combination of control sequences of the
+    source blocks it tries, and reports its progress after every horizon, through the hook of its SolverStats,
+    see `pybcn.stats`.
+
+        job = ControlJob(bcn, init, dest, max_T=50, timeout=10)
+        async for progress in job:
+            print(progress.T, progress.states_explored)
+        T, res = await job
+
+    It must be made in a coroutine. Cancelling the task awaiting it cancels the query.
+    """
+
+    def __init__(
+        self,
+        bcn,
+        init: int,
+        dest: int,
+        max_T: Optional[int] = None,
+        timeout: Optional[float] = None,
+        progress: Optional[Callable[[Progress], None]] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        :param bcn: a partitioned LargeBCN instance
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param max_T: give up after trying the horizons up to this one, see `LargeBCN.iter_optimal_controls`
+        :param timeout: the seconds after which the query is stopped and awaiting it raises `asyncio.TimeoutError`
+        :param progress: called in the thread of the event loop with the Progress of every horizon tried
+        :param executor: the executor to run the query in, the default one of the event loop if it is None
+        :return: a ControlJob instance
+        """
+        self._loop = asyncio.get_running_loop()
+        self._start = time.monotonic()
+        self._deadline = None if timeout is None else self._start + timeout
+        self._stop = threading.Event()
+        self._progress = progress
+        self._queue: asyncio.Queue = asyncio.Queue()  # the Progress of every horizon, then None
+        self.stats = SolverStats(hook=self._hook)
+        self._future = self._loop.run_in_executor(
+            executor, lambda: bcn.optimal_time_control(init, dest, stats=self.stats, max_T=max_T)
+        )
+        self._future.add_done_callback(self._done)
+
+    def _hook(self, event: str, stats: SolverStats):
+        """
+        The hook of `stats`, called in the thread of the query.
+        """
+        if event == "done":
+            return
+        if self._stop.is_set():
+            raise _Stopped
+        now = time.monotonic()
+        if self._deadline is not None and now >= self._deadline:
+            raise asyncio.TimeoutError
+        if event != "horizon":
+            return
+        progress = Progress(
+            stats.T, sum(block.states_expanded for block in stats.blocks.values()), stats.combinations, now - self._start
+        )
+        self._loop.call_soon_threadsafe(self._report, progress)
+
+    def _report(self, progress: Progress):
+        self._queue.put_nowait(progress)
+        if self._progress is not None:
+            self._progress(progress)
+
+    def _done(self, future: asyncio.Future):
+        if not future.cancelled():
+            # the exception is raised by `result`, if anything awaits it
+            future.exception()
+        self._queue.put_nowait(None)
+
+    def cancel(self):
+        """
+        Stop the query before the next combination or horizon it tries, awaiting the job then raises
+        `asyncio.CancelledError`.
+        """
+        self._stop.set()
+
+    def done(self) -> bool:
+        """
+        :return: whether the query has been answered, stopped or has failed
+        """
+        return self._future.done()
+
+    async def result(self) -> Tuple[int, Dict[int, list]]:
+        """
+        :return: the result of `LargeBCN.optimal_time_control`
+        """
+        try:
+            if self._deadline is None:
+                return await asyncio.shield(self._future)
+            timeout = max(self._deadline - time.monotonic(), 0)
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except _Stopped:
+            raise asyncio.CancelledError from None
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # the query goes on in its thread until it tries the next combination or horizon
+            self._stop.set()
+            raise
+
+    def __await__(self):
+        return self.result().__await__()
+
+    async def __aiter__(self) -> AsyncIterator[Progress]:
+        """
+        :return: the Progress of every horizon tried until the query ends, it can only be iterated once
+        """
+        while True:
+            progress = await self._queue.get()
+            if progress is None:
+                return
+            yield progress
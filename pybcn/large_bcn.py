@@ -1,14 +1,307 @@
+import json
+import math
+import os
+import struct
 import sys
-import copy
 import rustworkx as rx
-from collections import deque
+import numpy as np
 from itertools import product
-from typing import List, Mapping, Optional, Union
-from rustworkx.visualization import graphviz_draw
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-from pybcn.lexer import lexer
-from pybcn.logical_vector import LogicalVector
-from pybcn.small_bcn import SmallBCN
+from pybcn.attractors import block_attractors
+from pybcn.cache import ASSRCache
+from pybcn.loader import NetworkBuilder, Source, load_network
+from pybcn.parser import CONSTANTS
+from pybcn.reachability import BackwardLayers, ForwardLayers
+from pybcn.small_bcn import SmallBCN, _batch_inputs, _batch_steps, _collect_steps, tokenize_network
+from pybcn.stats import SolverStats, stats_for
+from pybcn.symbolic_bcn import SymbolicBCN, SymbolicLayers
+
+# blocks with fewer state and input variables are built in the calling process by `partition`
+PARALLEL_MIN_BITS = 12
+# blocks with at least this many state and input variables are SymbolicBCNs instead of SmallBCNs
+SYMBOLIC_MIN_BITS = 25
+# sources of the inputs of a block with more variables are looked up bit by bit instead of in a table
+TABLE_MAX_BITS = 20
+# the first bytes of the files written by `LargeBCN.save`, followed by the version of their format
+SNAPSHOT_MAGIC = b"PYBCNSNP"
+SNAPSHOT_VERSION = 1
+# `SNAPSHOT_MAGIC`, the version and the size of the JSON metadata
+_SNAPSHOT_HEADER = struct.Struct("<8sIQ")
+# the offsets of the ASSRs in a snapshot are multiples of this, so that they can be viewed in place
+_SNAPSHOT_ALIGNMENT = 64
+
+
+def _build_assr(d: Mapping[str, str], cache: Optional[ASSRCache] = None):
+    """
+    Build the ASSR of a block in a worker process and hand it back through shared memory.
+    :return: the name of the shared memory block, the dtype and the shape of `L`
+    """
+    # multiprocessing is imported where it is used, it takes longer to import than small networks take to solve
+    from multiprocessing import resource_tracker, shared_memory
+
+    L = SmallBCN(d, cache=cache).L
+    shm = shared_memory.SharedMemory(create=True, size=max(L.nbytes, 1))
+    np.ndarray(L.shape, L.dtype, buffer=shm.buf)[:] = L
+    shm.close()
+    # the calling process owns the block from now on and unlinks it in `_receive_assr`
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm.name, L.dtype.str, L.shape
+
+
+def _receive_assr(name: str, dtype: str, shape: tuple) -> np.ndarray:
+    """
+    Copy an ASSR out of the shared memory block created by `_build_assr` and release the block.
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# the network of a `LargeBCN.solve_many` worker process
+_solver = None
+
+
+def _init_solver(
+    d: Mapping[str, str],
+    cache: Optional[ASSRCache] = None,
+    symbolic_min_bits: int = SYMBOLIC_MIN_BITS,
+    snapshot: Optional[str] = None,
+):
+    global _solver
+    if snapshot is not None:
+        _solver = LargeBCN.load(snapshot)
+        return
+    _solver = LargeBCN(d)
+    _solver.partition(cache=cache, symbolic_min_bits=symbolic_min_bits)
+
+
+def _solve(pair: Tuple[int, int]):
+    return _solver.optimal_time_control(*pair)
+
+
+class _Pulled:
+    """
+    The items of an iterable, pulled from it as they are first needed.
+    """
+
+    def __init__(self, items: Iterable):
+        if isinstance(items, list):
+            self.items, self._rest = items, iter(())
+        else:
+            self.items, self._rest = [], iter(items)
+
+    def has(self, i: int) -> bool:
+        """
+        :return: whether there is an item at index `i`, pulling the items up to it
+        """
+        while len(self.items) <= i:
+            item = next(self._rest, _Pulled)
+            if item is _Pulled:
+                return False
+            self.items.append(item)
+        return True
+
+    def __getitem__(self, i: int):
+        return self.items[i]
+
+
+class Combinations:
+    """
+    Lazy enumeration of the combinations of the control sequences of the source blocks, one control sequence
+    of every block and one input of every step of it, in the order of `itertools.product`.
+    The combinations are counted by a mixed radix counter instead of being copied: its digits are the
+    indices of the control sequences of the blocks, followed by the indices of the inputs of every block at every step.
+    The control sequences may be given as generators, they are then pulled as the counter reaches them.
+    """
+
+    def __init__(self, res: Mapping[int, Iterable]):
+        """
+        :param res: a dict with structure '<block index, [(state sequence, input sequence), ...]>',
+            each item of an input sequence being the list of the inputs leading to the next state
+        :return: a Combinations instance
+        """
+        self.res = {k: _Pulled(paths) for k, paths in res.items()}
+        self.keys = list(res)
+        self._empty = not res or not all(paths.has(0) for paths in self.res.values())
+        self.T = 0 if self._empty else len(self.res[self.keys[0]][0][1])
+        # the digit of the control sequence of every block, then the digits of its inputs
+        self._offsets = [len(self.keys) + i * self.T for i in range(len(self.keys))]
+        self._digits = None
+        self._skipped = False
+
+    def pulled(self, key: int) -> int:
+        """
+        :return: the number of control sequences of block `key` pulled so far
+        """
+        return len(self.res[key].items)
+
+    def _valid(self, position: int, digit: int) -> bool:
+        if position < len(self.keys):
+            return self.res[self.keys[position]].has(digit)
+        i, t = divmod(position - len(self.keys), self.T)
+        return digit < len(self.res[self.keys[i]][self._digits[i]][1][t])
+
+    def _increment(self, position: int) -> bool:
+        """
+        Increment the digit at `position` and reset the digits after it.
+        :return: False if the counter overflowed, i.e. there are no more combinations
+        """
+        digits = self._digits
+        for p in range(position + 1, len(digits)):
+            digits[p] = 0
+        while position >= 0:
+            digits[position] += 1
+            if self._valid(position, digits[position]):
+                return True
+            digits[position] = 0
+            position -= 1
+        return False
+
+    def __iter__(self) -> Iterator[Dict[int, list]]:
+        """
+        :return: a generator of dicts with structure '<block index, [state sequence, input sequence]>',
+            each item of the input sequence being a single input; the dicts are new, the sequences are shared
+        """
+        if self._empty:
+            return
+        self._digits = [0] * (len(self.keys) * (1 + self.T))
+        while True:
+            combination = {}
+            for i, key in enumerate(self.keys):
+                seq, c_seq = self.res[key][self._digits[i]]
+                offset = self._offsets[i]
+                combination[key] = [seq, tuple(c_seq[t][self._digits[offset + t]] for t in range(self.T))]
+            yield combination
+            if self._skipped:
+                self._skipped = False
+            elif not self._increment(len(self._digits) - 1):
+                return
+            if self._digits is None:
+                return
+
+    def skip(self, keys: Iterable[int]):
+        """
+        Skip the combinations that follow the current one and agree with it on the blocks in `keys`,
+        up to the next change of their control sequences or inputs.
+        :param keys: block indices
+        """
+        positions = [self.keys.index(key) for key in keys]
+        if not positions:
+            # the remaining combinations all agree with the current one
+            self._digits = None
+        else:
+            last = max(positions)
+            position = self._offsets[last] + self.T - 1 if self.T else last
+            if not self._increment(position):
+                self._digits = None
+        self._skipped = True
+
+
+class Projection:
+    """
+    Lookup tables turning the states and inputs of the predecessors of a downstream block, and its own exterior inputs,
+    into the position of the inputs of the block, built once at partition time.
+    Every input variable of the block is read from the last source `LargeBCN.optimal_time_control` used to take it from:
+    its exterior inputs, then the inputs and states of the predecessors in reverse order.
+    The tables hold the bits of the zero-based input index contributed by every source, which are ORed together.
+    Sources of more than `TABLE_MAX_BITS` variables, such as the states of a SymbolicBCN, keep the pairs of shifts
+    of their bits instead of a table.
+    """
+
+    def __init__(self, block: Union[SmallBCN, SymbolicBCN], preds: List[Union[SmallBCN, SymbolicBCN]]):
+        """
+        :param block: the downstream block
+        :param preds: its predecessors, in the order of `LargeBCN.pred_list`
+        :return: a Projection instance
+        """
+        m = block.m
+        dtype = np.min_scalar_type(max(block.M - 1, 1))
+        shifts = {var: m - 1 - i for i, var in enumerate(block.input_variables)}
+        # the source of every input variable: (table kind, predecessor, variables of the source)
+        sources = {}
+        for p, pred in enumerate(preds):
+            for var in pred.variables:
+                sources[var] = ("state", p)
+            for var in pred.input_variables:
+                sources[var] = ("input", p)
+        for var in block.exterior_inputs:
+            sources[var] = ("exterior", None)
+
+        def table(variables: List[str], kind: str, p: Optional[int]) -> Union[np.ndarray, List[tuple]]:
+            if len(variables) > TABLE_MAX_BITS or m > 63:
+                # (shift in the index of the source, shift in the input index of the block)
+                return [
+                    (len(variables) - 1 - i, shifts[var]) for i, var in enumerate(variables)
+                    if var in shifts and sources.get(var) == (kind, p)
+                ]
+            index = np.arange(2 ** len(variables), dtype=np.uint64)
+            res = np.zeros(len(index), dtype=dtype)
+            for i, var in enumerate(variables):
+                if var in shifts and sources.get(var) == (kind, p):
+                    bit = (index >> np.uint64(len(variables) - 1 - i)) & np.uint64(1)
+                    res |= (bit << np.uint64(shifts[var])).astype(dtype)
+            return res
+
+        self.state_tables = [table(pred.variables, "state", p) for p, pred in enumerate(preds)]
+        self.input_tables = [table(pred.input_variables, "input", p) for p, pred in enumerate(preds)]
+        self.exterior_table = table(block.exterior_inputs, "exterior", None)
+        missing = set(block.input_variables) - set(sources)
+        assert not missing, f"inputs {missing} of the block are neither exterior nor provided by a predecessor"
+
+    @staticmethod
+    def _lookup(table: Union[np.ndarray, List[tuple]], index):
+        if isinstance(table, np.ndarray):
+            return table[index]
+        res = index & 0
+        for source_shift, block_shift in table:
+            res |= ((index >> source_shift) & 1) << block_shift
+        return res
+
+    def state_bits(self, p: int, index):
+        """
+        :param p: the index of a predecessor
+        :param index: the zero-based index of its state, an integer or an int64 array
+        :return: the bits of the zero-based input index of the block it contributes
+        """
+        return self._lookup(self.state_tables[p], index)
+
+    def input_bits(self, p: int, index):
+        """
+        The same as `state_bits`, for the zero-based index of the inputs of the predecessor.
+        """
+        return self._lookup(self.input_tables[p], index)
+
+    def exterior_bits(self, index):
+        """
+        The same as `state_bits`, for the zero-based index of the exterior inputs of the block.
+        """
+        return self._lookup(self.exterior_table, index)
+
+    def base(self, states: List[int], inputs: List[int]) -> int:
+        """
+        :param states: positions of the states of the predecessors
+        :param inputs: positions of the inputs of the predecessors
+        :return: the zero-based index of the inputs of the block before ORing in its exterior inputs
+        """
+        u = 0
+        for p, (state, i) in enumerate(zip(states, inputs)):
+            u |= int(self.state_bits(p, state - 1)) | int(self.input_bits(p, i - 1))
+        return u
+
+    def inputs(self, states: List[int], inputs: List[int], exterior: int = 1) -> int:
+        """
+        :param states: positions of the states of the predecessors
+        :param inputs: positions of the inputs of the predecessors
+        :param exterior: pos of corresponding vector of the exterior inputs of the block
+        :return: pos of corresponding vector of the inputs of the block
+        """
+        return (self.base(states, inputs) | int(self.exterior_bits(exterior - 1))) + 1
 
 
 class LargeBCN:
@@ -16,12 +309,15 @@ class LargeBCN:
     Large-scale Boolean Control Network
     """
 
-    def __init__(self, d: Mapping[str, str], init_states: Optional[List[int]] = None):
+    def __init__(
+        self, d: Mapping[str, str], init_states: Optional[List[int]] = None, builder: Optional[NetworkBuilder] = None
+    ):
         """
         Generate a LargeBCN instance.
 
         :param d: a dict with structure '<variable, expression>'
         :param init_states: initial states, set to all 0 if it is None
+        :param builder: the NetworkBuilder `d` was read with, its tokens and dependency graph are reused
         :return: a LargeBCN instance
         """
         self.d = d
@@ -33,31 +329,44 @@ class LargeBCN:
         self.m = None  # number of input variables
         self.N = None  # equals to 2 ** n
         self.M = None  # equals to 2 ** m
+        self.blocks = None  # set by `partition`
+        self._dag = None  # the dependency graph of the state variables, an edge from every variable to those referring to it
+        self._variable_indices = None  # the node of every state variable in `_dag`
 
-        self._generate(d, init_states)
+        self._generate(d, init_states, builder)
 
-    def _generate(self, d: Mapping[str, str], init_states: Optional[List[int]] = None):
+    @classmethod
+    def from_file(cls, source: Source, format: Optional[str] = None, init_states: Optional[List[int]] = None):
+        """
+        Read a network from a file, see `pybcn.loader.load_network`.
+        :param source: a path or an open text file
+        :param format: "bnet" or "text"
+        :param init_states: initial states, set to all 0 if it is None
+        :return: a LargeBCN instance
+        """
+        builder = load_network(source, format)
+        return cls(builder.d, init_states, builder)
+
+    def _generate(
+        self, d: Mapping[str, str], init_states: Optional[List[int]] = None, builder: Optional[NetworkBuilder] = None
+    ):
         """
         :param d: a dict with structure '<variable, expression>'
         :param init_states: initial states, set to all 0 if it is None
+        :param builder: the NetworkBuilder `d` was read with, built from `d` if it is None
         :return: a SmallBCN instance
         """
+        if builder is None:
+            builder = NetworkBuilder()
+            for var, expr in d.items():
+                builder.add(var, expr)
         self.variables = list(d.keys())
         self.n = len(self.variables)
         self.N = 2 ** self.n
-        for var, expr in d.items():
-            lexer.input(expr)
-            tokens = lexer.get_all_tokens()
-            self.list_of_tokens[var] = tokens
-            self.input_variables.extend(map(
-                lambda t: t.value,
-                filter(
-                    lambda t: t.value not in self.variables
-                    and t.value not in self.input_variables
-                    and t.type == "VARIABLE",
-                    tokens
-                )
-            ))
+        self.list_of_tokens = builder.list_of_tokens
+        self.input_variables = builder.input_variables
+        self._dag = builder.dag
+        self._variable_indices = builder.variable_indices
         self.m = len(self.input_variables)
         self.M = 2 ** self.m
 
@@ -70,16 +379,97 @@ class LargeBCN:
             assert state == 0 or state == 1, f"state should be 0 or 1, got {state}"
             self.states[var] = state
 
-    def partition(self):
-        dag = rx.PyDiGraph()
-        indices = dag.add_nodes_from(self.variables)
-        variable_indices = dict(zip(self.variables, indices))
-        
-        for var, tokens in self.list_of_tokens.items():
-            for tok in tokens:
-                if tok.value in self.variables:
-                    dag.add_edge(variable_indices[tok.value], variable_indices[var], None)
+    def partition(
+        self,
+        cache: Optional[ASSRCache] = None,
+        workers: Optional[int] = None,
+        symbolic_min_bits: int = SYMBOLIC_MIN_BITS,
+    ):
+        """
+        Partition the network into blocks, one for each strongly connected component.
+        A block is a SmallBCN, or a SymbolicBCN if its ASSR would be too large.
+        :param cache: an ASSRCache to reuse the ASSRs of blocks built before
+        :param workers: build the blocks with at least `PARALLEL_MIN_BITS` state and input variables
+            in a pool of this many processes, the blocks are built one after another if it is None
+        :param symbolic_min_bits: the blocks with at least this many state and input variables are SymbolicBCNs
+        """
+        self._cache = cache
+        self._symbolic_min_bits = symbolic_min_bits
+        block_dicts = self._condense()
+        symbolic = {i for i, d in enumerate(block_dicts) if self._symbolic(d)}
+        if workers is None:
+            blocks = [self._block(d, i in symbolic) for i, d in enumerate(block_dicts)]
+        else:
+            blocks = self._build_blocks(block_dicts, workers, cache, symbolic)
+        self._attach_blocks(blocks)
+
+    def update_expression(self, var: str, expr: str):
+        """
+        Replace the update function of a variable, e.g. `update_expression("x7", "0")` to knock `x7` out.
+        Only the edges of the dependency graph into `var` are replaced, and only the blocks whose update functions
+        changed are built again, the others are reused together with their ASSRs and lookup tables.
+        :param var: a state variable
+        :param expr: its new expression
+        """
+        assert var in self.variables, f"{var} is not a state variable"
+        self.d = {**self.d, var: expr}
+        self.list_of_tokens[var] = tokenize_network({var: expr})[0][var]
+        input_variables = {}
+        for v in self.variables:
+            for tok in self.list_of_tokens[v]:
+                if tok.type == "VARIABLE" and tok.value not in self.d and tok.value not in CONSTANTS:
+                    input_variables[tok.value] = None
+        self.input_variables = list(input_variables)
+        self.m = len(self.input_variables)
+        self.M = 2 ** self.m
+        node = self._variable_indices[var]
+        for edge in list(self._dag.in_edge_indices(node)):
+            self._dag.remove_edge_from_index(edge)
+        self._add_dependencies(var)
+        if self.blocks is None:
+            return
+
+        projections = {
+            (id(self.blocks[k]), tuple(id(self.blocks[pred]) for pred in self.pred_list[k])): projection
+            for k, projection in self.projections.items()
+        }
+        built = {frozenset(block.d.items()): block for block in self.blocks}
+        blocks = []
+        for d in self._condense():
+            block = built.get(frozenset(d.items()))
+            if block is None:
+                block = self._block(d, self._symbolic(d))
+            blocks.append(block)
+        self._attach_blocks(blocks, projections)
 
+    def _add_dependencies(self, var: str):
+        """
+        Add the edges from the state variables the update function of `var` refers to, to `var`.
+        """
+        for tok in self.list_of_tokens[var]:
+            if tok.value in self._variable_indices:
+                self._dag.add_edge(self._variable_indices[tok.value], self._variable_indices[var], None)
+
+    def _symbolic(self, d: Mapping[str, str]) -> bool:
+        """
+        :return: whether the block of the update functions `d` is built as a SymbolicBCN
+        """
+        return len(d) + len(tokenize_network(d, self.list_of_tokens)[1]) >= self._symbolic_min_bits
+
+    def _block(self, d: Mapping[str, str], symbolic: bool) -> Union[SmallBCN, SymbolicBCN]:
+        """
+        Build a block in this process, reusing the tokens of the network.
+        """
+        if symbolic:
+            return SymbolicBCN(d, tokens=self.list_of_tokens)
+        return SmallBCN(d, cache=self._cache, tokens=self.list_of_tokens)
+
+    def _condense(self) -> List[Dict[str, str]]:
+        """
+        Compute the strongly connected components of the dependency graph, the condensation graph and its order.
+        :return: the update functions of every block
+        """
+        dag = self._dag
         sccs = rx.strongly_connected_components(dag)
 
         condensation_graph = rx.PyDiGraph()
@@ -107,13 +497,23 @@ class LargeBCN:
             else:
                 self.B.append(block_idx)
                 self.pred_list[block_idx] = condensation_graph.predecessors(block_idx)
+        # the source blocks every downstream block depends on, in the order of `A`
+        source_order = {a: i for i, a in enumerate(self.A)}
+        self.source_ancestors = {}
+        for k in self.B:
+            ancestors = rx.ancestors(condensation_graph, k)
+            self.source_ancestors[k] = sorted((a for a in ancestors if a in source_order), key=source_order.get)
 
-        self.blocks = []
-        for scc in sccs:
-            d = {dag.nodes()[node_idx]: self.d[dag.nodes()[node_idx]] for node_idx in scc}
-            small_bcn = SmallBCN(d)
-            self.blocks.append(small_bcn)
+        names = dag.nodes()
+        return [{names[node_idx]: self.d[names[node_idx]] for node_idx in scc} for scc in sccs]
 
+    def _attach_blocks(self, blocks: List[Union[SmallBCN, SymbolicBCN]], projections: Optional[Mapping[tuple, "Projection"]] = None):
+        """
+        Set the blocks of the partition computed by `_condense`, with their projections and the shifts of their variables.
+        :param projections: projections built before, by the ids of their block and of its predecessors, to reuse
+        """
+        projections = {} if projections is None else projections
+        self.blocks = blocks
         for block in self.blocks:
             interior_inputs = []
             exterior_inputs = []
@@ -125,124 +525,536 @@ class LargeBCN:
             block.interior_inputs = interior_inputs
             block.exterior_inputs = exterior_inputs
 
-    def optimal_time_control(self, init, dest):
-        # 1. state projection
-        init_v = LogicalVector(init, 2 ** self.n)
-        dest_v = LogicalVector(dest, 2 ** self.n)
-        init_dict = dict(zip(self.variables, init_v.to_list()))
-        dest_dict = dict(zip(self.variables, dest_v.to_list()))
+        self.projections = {}
+        for k in self.B:
+            key = (id(self.blocks[k]), tuple(id(self.blocks[pred]) for pred in self.pred_list[k]))
+            projection = projections.get(key)
+            if projection is None:
+                projection = Projection(self.blocks[k], [self.blocks[pred] for pred in self.pred_list[k]])
+            self.projections[k] = projection
+        # (shift in the global state index, shift in the block state index) of the variables of every block
+        shifts = {var: self.n - 1 - i for i, var in enumerate(self.variables)}
+        self._state_shifts = [
+            [(shifts[var], block.n - 1 - i) for i, var in enumerate(block.variables)] for block in self.blocks
+        ]
+        # the same for the exterior inputs of every block, in the global input index
+        input_shifts = {var: self.m - 1 - i for i, var in enumerate(self.input_variables)}
+        self._input_shifts = [
+            [(input_shifts[var], len(block.exterior_inputs) - 1 - i) for i, var in enumerate(block.exterior_inputs)]
+            for block in self.blocks
+        ]
+
+    def _build_blocks(
+        self,
+        block_dicts: List[Mapping[str, str]],
+        workers: int,
+        cache: Optional[ASSRCache] = None,
+        symbolic: Iterable[int] = (),
+    ) -> List[Union[SmallBCN, SymbolicBCN]]:
+        """
+        Build the blocks, the ASSRs of the large ones in a process pool.
+        :param symbolic: the indices of the blocks built as SymbolicBCNs in the calling process
+        """
+        from concurrent.futures import ProcessPoolExecutor
 
-        self.inits = []
-        self.dests = []
+        sizes = [len(d) + len(tokenize_network(d, self.list_of_tokens)[1]) for d in block_dicts]
+
+        blocks = [None] * len(block_dicts)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # submit the largest blocks first so that they do not end up last on a single worker
+            futures = {
+                i: executor.submit(_build_assr, block_dicts[i], cache)
+                for i in sorted(range(len(block_dicts)), key=lambda i: -sizes[i])
+                if sizes[i] >= PARALLEL_MIN_BITS and i not in symbolic
+            }
+            for i, d in enumerate(block_dicts):
+                if i in symbolic or i not in futures:
+                    blocks[i] = self._block(d, i in symbolic)
+            received = set()
+            try:
+                for i, future in futures.items():
+                    L = _receive_assr(*future.result())
+                    received.add(i)
+                    blocks[i] = SmallBCN(block_dicts[i], L=L, tokens=self.list_of_tokens)
+            finally:
+                # release the shared memory of the blocks built but not received because of an error
+                for i, future in futures.items():
+                    if i not in received and not future.cancel() and future.exception() is None:
+                        _receive_assr(*future.result())
+        return blocks
+
+    def save(self, path: str):
+        """
+        Save the partitioned network to a snapshot `LargeBCN.load` restores without partitioning it again.
+        The file starts with `SNAPSHOT_MAGIC`, the version of the format and the size of a JSON metadata holding the
+        update functions, the states, the condensation graph and the variables of every block, followed by the ASSRs
+        of the SmallBCN blocks, each one at an offset aligned to `_SNAPSHOT_ALIGNMENT` bytes.
+        :param path: path of the file
+        """
+        assert self.blocks is not None, "the network should be partitioned before it is saved"
+        blocks = []
+        offset = 0
         for block in self.blocks:
-            block_init_l = [init_dict[key] for key in block.variables]
-            block_dest_l = [dest_dict[key] for key in block.variables]
-            block_init_v = LogicalVector.from_states(block_init_l)
-            block_dest_v = LogicalVector.from_states(block_dest_l)
-            self.inits.append(block_init_v.pos)
-            self.dests.append(block_dest_v.pos)
+            if isinstance(block, SymbolicBCN):
+                blocks.append({"variables": block.variables, "symbolic": True})
+                continue
+            L = np.ascontiguousarray(block.L)
+            blocks.append({"variables": block.variables, "symbolic": False, "dtype": L.dtype.str, "offset": offset, "size": L.size})
+            offset += -(-L.nbytes // _SNAPSHOT_ALIGNMENT) * _SNAPSHOT_ALIGNMENT
+        metadata = json.dumps({
+            "d": dict(self.d),
+            "states": [self.states[var] for var in self.variables],
+            "symbolic_min_bits": self._symbolic_min_bits,
+            "edges": list(self.condensation_graph.edge_list()),
+            "A": self.A,
+            "B": self.B,
+            "pred_list": [[k, list(preds)] for k, preds in self.pred_list.items()],
+            "source_ancestors": [[k, ancestors] for k, ancestors in self.source_ancestors.items()],
+            "blocks": blocks,
+        }).encode()
+        data_start = -(-(_SNAPSHOT_HEADER.size + len(metadata)) // _SNAPSHOT_ALIGNMENT) * _SNAPSHOT_ALIGNMENT
+
+        # write to a temporary file first so that processes loading the snapshot never see a partial one
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(metadata)))
+            f.write(metadata)
+            for block, entry in zip(self.blocks, blocks):
+                if entry["symbolic"]:
+                    continue
+                f.seek(data_start + entry["offset"])
+                f.write(np.ascontiguousarray(block.L).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """
+        Restore a network saved by `save`, partitioned, without building the ASSRs of its blocks again.
+        The SymbolicBCN blocks are built again from their update functions, they are not saved.
+        :param path: path of the file
+        :param mmap: memory-map the ASSRs read-only instead of reading them into memory,
+            processes mapping the same file share its pages
+        :return: a LargeBCN instance
+        """
+        with open(path, "rb") as f:
+            header = f.read(_SNAPSHOT_HEADER.size)
+            if len(header) != _SNAPSHOT_HEADER.size:
+                raise ValueError(f"{path} is not a LargeBCN snapshot")
+            magic, version, size = _SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a LargeBCN snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} has version {version} of the snapshot format, expected {SNAPSHOT_VERSION}")
+            metadata = json.loads(f.read(size))
+        data_start = -(-(_SNAPSHOT_HEADER.size + size) // _SNAPSHOT_ALIGNMENT) * _SNAPSHOT_ALIGNMENT
+        if os.path.getsize(path) <= data_start:
+            data = None  # all the blocks are SymbolicBCNs
+        elif mmap:
+            data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+        else:
+            data = np.fromfile(path, dtype=np.uint8, offset=data_start)
+
+        bcn = cls(metadata["d"], metadata["states"])
+        bcn._cache = None
+        bcn._symbolic_min_bits = metadata["symbolic_min_bits"]
+        bcn.condensation_graph = rx.PyDiGraph()
+        bcn.condensation_graph.add_nodes_from(list(range(len(metadata["blocks"]))))
+        bcn.condensation_graph.add_edges_from_no_data([tuple(edge) for edge in metadata["edges"]])
+        bcn.A = metadata["A"]
+        bcn.B = metadata["B"]
+        bcn.pred_list = {k: preds for k, preds in metadata["pred_list"]}
+        bcn.source_ancestors = {k: ancestors for k, ancestors in metadata["source_ancestors"]}
+        blocks = []
+        for entry in metadata["blocks"]:
+            d = {var: bcn.d[var] for var in entry["variables"]}
+            if entry["symbolic"]:
+                blocks.append(bcn._block(d, True))
+                continue
+            dtype = np.dtype(entry["dtype"])
+            L = data[entry["offset"]:entry["offset"] + dtype.itemsize * entry["size"]].view(dtype)
+            blocks.append(SmallBCN(d, L=L, tokens=bcn.list_of_tokens))
+        bcn._attach_blocks(blocks)
+        return bcn
+
+    def project(self, pos: int) -> List[int]:
+        """
+        :param pos: pos of corresponding vector of a state of the network
+        :return: the positions of the states of the blocks
+        """
+        index = pos - 1
+        res = []
+        for shifts in self._state_shifts:
+            local = 0
+            for global_shift, local_shift in shifts:
+                local |= ((index >> global_shift) & 1) << local_shift
+            res.append(local + 1)
+        return res
+
+    def combine(self, positions: List[int]) -> int:
+        """
+        The inverse of `project`.
+        :param positions: the positions of the states of the blocks
+        :return: pos of corresponding vector of the state of the network
+        """
+        index = 0
+        for shifts, pos in zip(self._state_shifts, positions):
+            for global_shift, local_shift in shifts:
+                index |= (((pos - 1) >> local_shift) & 1) << global_shift
+        return index + 1
+
+    def _step_batch(self, states: np.ndarray, inputs: np.ndarray) -> np.ndarray:
+        """
+        Advance many states of the network a step, block by block in topological order.
+        :param states: positions of the states of the network, an int64 array, or an object array of Python ints
+            if the network has 63 variables or more
+        :param inputs: positions of the inputs of the network, the same
+        :return: positions of the next states, of the dtype of `states`
+        """
+        def project(index: np.ndarray, shifts: List[tuple]) -> np.ndarray:
+            # the blocks are small, their indices always fit in int64
+            local = np.zeros(len(index), dtype=np.int64)
+            for global_shift, local_shift in shifts:
+                local |= ((index >> global_shift) & 1).astype(np.int64, copy=False) << local_shift
+            return local
+
+        assert all(isinstance(block, SmallBCN) for block in self.blocks), "simulating needs the ASSRs of all blocks"
+        index = states - 1
+        input_index = inputs - 1
+        local_states = [project(index, shifts) for shifts in self._state_shifts]
+        local_inputs = {}
+        res = np.zeros_like(index)
+        for k in self.A + self.B:
+            block = self.blocks[k]
+            u = project(input_index, self._input_shifts[k])
+            if k in self.projections:
+                projection = self.projections[k]
+                u = np.asarray(projection.exterior_bits(u), dtype=np.int64)
+                for p, pred in enumerate(self.pred_list[k]):
+                    u |= projection.state_bits(p, local_states[pred])
+                    u |= projection.input_bits(p, local_inputs[pred])
+            local_inputs[k] = u
+            nxt = block.L[u * block.N + local_states[k]].astype(np.int64) - 1
+            for global_shift, local_shift in self._state_shifts[k]:
+                res |= ((nxt >> local_shift) & 1).astype(res.dtype, copy=False) << global_shift
+        return res + 1
+
+    def simulate_batch(
+        self,
+        init_positions: Union[Iterable[int], np.ndarray],
+        input_sequences: Union[Iterable[Iterable[int]], np.ndarray],
+        stream: bool = False,
+    ) -> Union[np.ndarray, Iterator[np.ndarray]]:
+        """
+        Simulate many trajectories at once, see `SmallBCN.simulate_batch`.
+        Every step is composed of the ASSRs of the blocks, the network must have been partitioned.
+        The positions of networks of 63 state or input variables or more do not fit in int64, they are simulated
+        in object arrays of Python ints, the blocks still stepping in int64.
+        :param init_positions: positions of the `K` initial states
+        :param input_sequences: positions of the inputs, an array of shape `(K, T)`, or of shape `(T,)`
+            to apply the same input sequence to every trajectory
+        :param stream: return a generator of the `T + 1` arrays of the `K` states at every step instead
+        :return: an array of shape `(K, T + 1)` of the positions of the states, column 0 being `init_positions`,
+            of dtype uint64, or object for networks of 63 variables or more
+        """
+        dtype = object if max(self.n, self.m) >= 63 else np.int64
+        states, inputs = _batch_inputs(init_positions, input_sequences, dtype)
+        if stream:
+            return _batch_steps(states, inputs, self._step_batch)
+        return _collect_steps(states, inputs, self._step_batch, np.uint64 if dtype is np.int64 else object)
+
+    def attractors(self, inputs: int) -> List[List[int]]:
+        """
+        The attractors of the network under constant inputs, composed from the blocks, see `block_attractors`.
+        :param inputs: pos of corresponding vector of the inputs
+        :return: the positions of the states of every attractor in the order they are visited
+        """
+        return block_attractors(self, inputs)
+
+    def controllability(self, dest: int, max_bytes: Optional[int] = None) -> Mapping[int, BackwardLayers]:
+        """
+        The backward reachable sets of `dest` in the source blocks, kept by the blocks for later queries,
+        see `SmallBCN.controllability`.
+        :param dest: pos of corresponding vector of destination state
+        :param max_bytes: the memory budget of the layers of every block
+        :return: a dict with structure '<block index, BackwardLayers>' over the SmallBCN blocks in `A`
+        """
+        dests = self.project(dest)
+        return {k: self.blocks[k].controllability(dests[k], max_bytes) for k in self.A if isinstance(self.blocks[k], SmallBCN)}
+
+    def min_time_lower_bound(self, init: int, dest: int) -> int:
+        """
+        A lower bound of the T of `optimal_time_control`, answered from the kept backward reachable sets:
+        every source block must reach its part of `dest` on its own.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :return: the largest minimum time of the source blocks, `sys.maxsize` if one of them cannot reach `dest`
+        """
+        inits = self.project(init)
+        dests = self.project(dest)
+        return max((self.blocks[k].min_time(inits[k], dests[k]) for k in self.A), default=1)
+
+    def optimal_time_control(
+        self, init, dest, stats: Optional[SolverStats] = None, max_T: Optional[int] = None
+    ) -> Tuple[int, Dict[int, list]]:
+        """
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param stats: a SolverStats to record the query in, a new one is made if it is None and hooks are subscribed,
+            see `pybcn.stats`
+        :param max_T: give up after trying the horizons up to this one, see `iter_optimal_controls`
+        :return: the minimum time T, and the control sequences of the blocks,
+            T is `sys.maxsize` and the control sequences are empty if no solution was found
+        """
+        return next(self.iter_optimal_controls(init, dest, 1, stats, max_T), (sys.maxsize, {}))
+
+    async def optimal_time_control_async(
+        self, init, dest, max_T: Optional[int] = None, timeout: Optional[float] = None, progress=None, executor=None
+    ) -> Tuple[int, Dict[int, list]]:
+        """
+        `optimal_time_control` in an executor, to be awaited from asyncio, see `pybcn.jobs.ControlJob`.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param max_T: give up after trying the horizons up to this one
+        :param timeout: the seconds after which the query is stopped and `asyncio.TimeoutError` is raised
+        :param progress: called with the `pybcn.jobs.Progress` of every horizon tried
+        :param executor: the executor to run the query in, the default one of the event loop if it is None
+        :return: the result of `optimal_time_control`
+        """
+        from pybcn.jobs import ControlJob
+
+        return await ControlJob(self, init, dest, max_T, timeout, progress, executor)
+
+    def iter_optimal_controls(
+        self,
+        init,
+        dest,
+        limit: Optional[int] = None,
+        stats: Optional[SolverStats] = None,
+        max_T: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Dict[int, list]]]:
+        """
+        The solutions of minimum time one at a time, one for every combination of the control sequences of the source
+        blocks the downstream blocks can follow. The control sequences of the source blocks are reconstructed from
+        their forward layers as the combinations reach them, so the first solution is found without enumerating
+        the others.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param limit: stop after this many solutions
+        :param stats: a SolverStats to record the query in, see `optimal_time_control`
+        :param max_T: give up after trying the horizons up to this one. The search gives up by itself once the layers
+            of the source blocks are periodic and have not reached the destination together for a whole period,
+            but not if only the downstream blocks fail, so without `max_T` it may never end
+        :return: a generator of `(T, control sequences of the blocks)`, the first one being that of `optimal_time_control`,
+            empty if no solution was found
+        """
+        if limit == 0:
+            return
+        stats = stats_for(stats)
+        if stats is not None:
+            stats.start()
+        # 1. state projection
+        inits = self.project(init)
+        dests = self.project(dest)
+        if stats is not None:
+            stats.stop("project")
 
         # 2. initialize
-        queues = {k: deque([(self.inits[k], [self.inits[k]], [])]) for k in self.A}
+        layers = {k: self.blocks[k].forward_layers(inits[k]) for k in self.A}
         T = 0
-        flag = True
-        find_flag = False
-        res = {k: [] for k in self.A}
+        found = 0
+        counted = {k: 0 for k in self.A}  # the number of layers of every source block recorded in `stats`
+        periodic_since = None  # the first horizon at which the layers of all the source blocks were periodic
+        last_reached = 0  # the last horizon at which the source blocks reached their destinations together
 
-        while flag:
-            flag = False
+        while found == 0 and (max_T is None or T < max_T):
             T += 1
-            res = {k: [] for k in self.A}
-            for k in self.A:
-                find_flag = False
-                bcn = self.blocks[k]
-                dest = self.dests[k]
-                while len(queues[k][0][1]) == T:
-                    state, seq, c_seq = queues[k].popleft()
-                    for next_state, inputs in bcn.one_step_states(state).items():
-                        new_seq = seq + [next_state]
-                        new_c_seq = c_seq + [inputs]
-                        queues[k].append((next_state, new_seq, new_c_seq))
-                for i in queues[k]:
-                    if i[0] == dest:
-                        res[k].append((i[1], i[2]))
-                        find_flag = True
-                if not find_flag:
-                    flag = True
-
-            if flag:
+            reached = all(layers[k].reaches(dests[k], T) for k in self.A)
+            if stats is not None:
+                stats.T = T
+                stats.stop("forward")
+                self._record_layers(stats, layers, counted)
+            if periodic_since is None and all(layers[k].period is not None for k in self.A):
+                periodic_since = T
+            if not reached:
+                if stats is not None:
+                    stats.emit("horizon")
+                # from `periodic_since` on, whether the source blocks reach their destinations repeats with this period
+                if periodic_since is not None and last_reached < periodic_since \
+                        and T - periodic_since >= math.lcm(*(layers[k].period for k in self.A)):
+                    break
                 continue
+            last_reached = T
+            combinations = self.iterate({k: layers[k].paths(dests[k], T) for k in self.A})
+            if stats is not None:
+                stats.stop("paths")
 
-            block_find_flag = False
-            cur_seq_comb = None
-            for seq_comb in self.iterate(res):
-                block_find_flag = False
-                cur_seq_comb = seq_comb
+            for seq_comb in combinations:
+                if stats is not None:
+                    stats.combinations += 1
+                    stats.stop("combinations")
+                    if stats.hook is not None:
+                        stats.hook("combination", stats)
                 for k in self.B:
-                    block = self.blocks[k]
-                    cur_state = self.inits[k]
-                    cur_seq = [[cur_state], []]
-                    ex_inputs_num = 2 ** len(block.exterior_inputs)
-
-                    if ex_inputs_num != 1:
-                        for self_control_seq in product(*([range(1, ex_inputs_num + 1)] * T)):
-                            cur_state = self.inits[k]
-                            cur_seq = [[cur_state], []]
-                            for t in range(T):
-                                projection = {}
-                                for pred in self.pred_list[k]:
-                                    self.blocks[pred].set_states_i(cur_seq_comb[pred][0][t])
-                                    projection.update(self.blocks[pred].get_states("dict"))
-                                    projection.update(self.blocks[pred].get_inputs(cur_seq_comb[pred][1][t]))
-                                projection.update(dict(zip(block.exterior_inputs, LogicalVector(self_control_seq[t], ex_inputs_num).to_list())))
-                                inputs = block.get_inputs(projection)
-                                next_state = block.next_state(cur_state, inputs)
-                                cur_seq[0].append(next_state)
-                                cur_seq[1].append(inputs)
-                                cur_state = next_state
-                            if cur_state == self.dests[k]:
-                                block_find_flag = True
-                                cur_seq_comb[k] = cur_seq
-                                break
-                            else:
-                                block_find_flag = False
-                    else:
-                        for t in range(T):
-                            projection = {}
-                            for pred in self.pred_list[k]:
-                                self.blocks[pred].set_states_i(cur_seq_comb[pred][0][t])
-                                projection.update(self.blocks[pred].get_states("dict"))
-                                projection.update(self.blocks[pred].get_inputs(cur_seq_comb[pred][1][t]))
-                            inputs = block.get_inputs(projection)
-                            next_state = block.next_state(cur_state, inputs)
-                            cur_seq[0].append(next_state)
-                            cur_seq[1].append(inputs)
-                            cur_state = next_state
-                        if cur_state == self.dests[k]:
-                            block_find_flag = True
-                            cur_seq_comb[k] = cur_seq
-                        else:
-                            block_find_flag = False
-
-                    if block_find_flag == False:
-                        flag = True
+                    cur_seq = self._control_block(k, T, seq_comb, inits[k], dests[k])
+                    if stats is not None:
+                        stats.stop("downstream")
+                        block = stats.block(k)
+                        block.combinations += 1
+                        block.simulations += cur_seq is not None
+                    if cur_seq is None:
+                        # the combinations agreeing on the blocks `k` depends on fail at `k` as well
+                        combinations.skip(self.source_ancestors[k])
                         break
-                    else:
-                        flag = False
+                    seq_comb[k] = cur_seq
+                else:
+                    found += 1
+                    if found == limit:
+                        if stats is not None:
+                            self._record_paths(stats, combinations)
+                            stats.emit("horizon")
+                            stats.emit("done")
+                        yield T, seq_comb
+                        return
+                    yield T, seq_comb
+                    if stats is not None:
+                        stats.start()
+            if stats is not None:
+                stats.stop("combinations")
+                self._record_paths(stats, combinations)
+                stats.emit("horizon")
 
-                if flag == False:
-                    break
+        if stats is not None:
+            stats.emit("done")
+
+    @staticmethod
+    def _record_paths(stats: SolverStats, combinations: Combinations):
+        """
+        Add the numbers of control sequences of the source blocks pulled by `combinations` to their counters.
+        """
+        for k in combinations.keys:
+            stats.block(k).paths += combinations.pulled(k)
+
+    @staticmethod
+    def _record_layers(
+        stats: SolverStats, layers: Mapping[int, Union[ForwardLayers, SymbolicLayers]], counted: Dict[int, int]
+    ):
+        """
+        Add the sizes of the forward layers of the source blocks computed since the last call to their counters.
+        :param counted: the number of layers of every block already recorded, updated
+        """
+        for k, block_layers in layers.items():
+            block = stats.block(k)
+            for t in range(counted[k], block_layers.T + 1):
+                size = block_layers.size(t)
+                block.states_expanded += size
+                block.queue_peak = max(block.queue_peak, size)
+            counted[k] = block_layers.T + 1
+
+    def solve_many(
+        self,
+        pairs: Sequence[Tuple[int, int]],
+        workers: Optional[int] = None,
+        processes: bool = False,
+        cache: Optional[ASSRCache] = None,
+        snapshot: Optional[str] = None,
+    ) -> List[Tuple[int, dict]]:
+        """
+        Answer many `optimal_time_control` queries concurrently. The queries only read the partitioned network,
+        so they can share it between threads.
+        :param pairs: `(init, dest)` pairs
+        :param workers: the maximum number of threads or processes
+        :param processes: run the queries in a process pool instead of threads,
+            every process partitions its own copy of the network
+        :param cache: an ASSRCache the processes look the ASSRs of the blocks up in
+        :param snapshot: a file written by `save`, the processes load it memory-mapped instead of partitioning,
+            sharing the pages of the ASSRs
+        :return: the results of `optimal_time_control`, in the order of `pairs`
+        """
+        if processes:
+            from concurrent.futures import ProcessPoolExecutor
+
+            initargs = (self.d, cache, self._symbolic_min_bits, snapshot)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_solver, initargs=initargs) as executor:
+                return list(executor.map(_solve, pairs))
+        from concurrent.futures import ThreadPoolExecutor
 
-        return T, cur_seq_comb
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda pair: self.optimal_time_control(*pair), pairs))
 
-    def iterate(self, res: dict):
-        ret = {}
-        for i in product(*res.values()):
-            ret = dict(zip(res.keys(), [[ii[0], None] for ii in i]))
-            for j in product(*[product(*k[1]) for k in i]):
-                for idx, key in enumerate(ret.keys()):
-                    ret[key][1] = j[idx]
-                yield copy.deepcopy(ret)
+    def _block_inputs(self, k: int, t: int, seq_comb: Mapping[int, list], exterior: int = 1) -> int:
+        """
+        :param k: index of a block in `B`
+        :param t: the step
+        :param seq_comb: the control sequences of the predecessors of the block
+        :param exterior: pos of corresponding vector of the exterior inputs of the block
+        :return: pos of corresponding vector of the inputs of the block at step `t`
+        """
+        preds = self.pred_list[k]
+        return self.projections[k].inputs(
+            [seq_comb[pred][0][t] for pred in preds], [seq_comb[pred][1][t] for pred in preds], exterior
+        )
+
+    def _control_block(self, k: int, T: int, seq_comb: Mapping[int, list], init: int, dest: int) -> Optional[list]:
+        """
+        Steer a block in `B` from its part of the initial state to its part of the destination in `T` steps,
+        driven by the control sequences of its predecessors and choosing its exterior inputs.
+        The sets of states from which the destination can still be reached are computed backwards over all
+        states of the block, so a block is decided in O(T * N * 2 ** e) for `e` exterior inputs.
+        :param k: index of a block in `B`
+        :param T: the number of steps
+        :param seq_comb: the control sequences of the predecessors of the block
+        :param init: pos of corresponding vector of the initial state of the block
+        :param dest: pos of corresponding vector of the destination state of the block
+        :return: `[state sequence, input sequence]`, the exterior inputs being the least in lexicographic order,
+            or None if the destination cannot be reached
+        """
+        block = self.blocks[k]
+        projection = self.projections[k]
+        preds = self.pred_list[k]
+        bases = [
+            projection.base([seq_comb[p][0][t] for p in preds], [seq_comb[p][1][t] for p in preds]) for t in range(T)
+        ]
+        if isinstance(block, SymbolicBCN):
+            shifts = {var: block.m - 1 - i for i, var in enumerate(block.input_variables)}
+            interior = [{var: 1 ^ ((base >> shifts[var]) & 1) for var in block.interior_inputs} for base in bases]
+            return block.control_driven(T, interior, init, dest)
+        # inputs[t][e - 1] is the input of the block at step t under exterior inputs `e`
+        # the tables have the least dtype holding M - 1, so M itself would overflow it
+        exterior = np.asarray(
+            projection.exterior_bits(np.arange(2 ** len(block.exterior_inputs), dtype=np.int64)), dtype=np.int64
+        )
+        inputs = [((base | exterior) + 1).tolist() for base in bases]
+        L = block.L.reshape(block.M, block.N)
+        good = np.zeros(block.N, dtype=bool)
+        good[dest - 1] = True
+        goods = [good]
+        for t in range(T - 1, -1, -1):
+            rows = L[np.asarray(inputs[t]) - 1]
+            good = good[rows.astype(np.intp) - 1].any(axis=0)
+            goods.append(good)
+        goods.reverse()
+
+        cur_state = init
+        if not goods[0][cur_state - 1]:
+            return None
+        cur_seq = [[cur_state], []]
+        for t in range(T):
+            for u in inputs[t]:
+                next_state = block.next_state(cur_state, u)
+                if goods[t + 1][next_state - 1]:
+                    break
+            cur_seq[0].append(next_state)
+            cur_seq[1].append(u)
+            cur_state = next_state
+        return cur_seq
+
+    def iterate(self, res: dict) -> Combinations:
+        """
+        :param res: the control sequences of the source blocks, see `Combinations`
+        :return: the lazy enumeration of their combinations
+        """
+        return Combinations(res)
 
     def iterate_2(self, res: dict, self_control: int, T):
         ret = res
@@ -1,8 +1,10 @@
+import re
+import threading
 import types
+from typing import List
 
 import ply.lex as lex
-import ply.yacc as yacc
-from ply.lex import Lexer
+from ply.lex import Lexer, LexToken
 
 # List of token names.
 tokens = (
@@ -37,7 +39,31 @@ def t_error(t):
     t.lexer.skip(1)
 
 
-lexer = lex.lex()
+# names of the module, `lexer` being built on first use
+__all__ = ["tokens", "lexer", "get_lexer", "get_all_tokens", "tokenize"]
+
+_lexer = None
+_lock = threading.Lock()
+
+
+def get_lexer() -> Lexer:
+    """
+    Build the ply lexer on first use, the tokenizer of the package being `tokenize`.
+    :return: the lexer, with the method `get_all_tokens`
+    """
+    global _lexer
+    with _lock:
+        if _lexer is None:
+            lexer = lex.lex()
+            lexer.get_all_tokens = types.MethodType(get_all_tokens, lexer)
+            _lexer = lexer
+    return _lexer
+
+
+def __getattr__(name: str):
+    if name == "lexer":
+        return get_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_all_tokens(self):
@@ -51,4 +77,30 @@ def get_all_tokens(self):
     return tokens
 
 
-lexer.get_all_tokens = types.MethodType(get_all_tokens, lexer)
+
+# the token types of the single characters, and the pattern matching one token, or one illegal character
+_CHARACTERS = {"&": "AND", "|": "OR", "!": "NOT", "^": "XOR", "(": "LPAREN", ")": "RPAREN"}
+_TOKEN = re.compile(r"(?P<VARIABLE>[\d\w]+)|[^\s]")
+
+
+def tokenize(expr: str) -> List[LexToken]:
+    """
+    The tokens of an expression, as `lexer.get_all_tokens` produces them but without the state of `lexer`,
+    so that it can be called from any thread and skips the per-token overhead of `ply`.
+    :param expr: an expression
+    :return: the tokens, illegal characters being reported and skipped as by `t_error`
+    """
+    res = []
+    for match in _TOKEN.finditer(expr):
+        value = match.group()
+        kind = match.lastgroup or _CHARACTERS.get(value)
+        if kind is None:
+            print(f"Illegal character '{value}'")
+            continue
+        tok = LexToken()
+        tok.type = kind
+        tok.value = value
+        tok.lineno = 1
+        tok.lexpos = match.start()
+        res.append(tok)
+    return res
@@ -0,0 +1,165 @@
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+import rustworkx as rx
+
+from pybcn.lexer import tokenize
+from pybcn.parser import CONSTANTS
+
+Source = Union[str, os.PathLike, TextIO]
+
+
+class NetworkBuilder:
+    """
+    Collect the update functions of a network one at a time, e.g. while reading them from a file.
+    Every expression is tokenized once, the variables are looked up in dicts, and the edges of the dependency graph
+    used by `LargeBCN.partition` are added as soon as both of their variables are defined.
+    """
+
+    def __init__(self):
+        self.d: Dict[str, str] = {}
+        self.list_of_tokens: Dict[str, list] = {}
+        self.dag = rx.PyDiGraph()  # the state variables, an edge from every variable to those referring to it
+        self.variable_indices: Dict[str, int] = {}  # the node of every state variable in `dag`
+        self._names = {}  # the variables referred to, in order of first appearance
+        self._pending: Dict[str, List[int]] = {}  # a variable not defined yet -> the nodes referring to it
+
+    def add(self, var: str, expr: str):
+        """
+        :param var: a state variable
+        :param expr: its update function
+        """
+        assert var not in self.d, f"{var} is defined twice"
+        tokens = tokenize(expr)
+        node = self.dag.add_node(var)
+        self.d[var] = expr
+        self.list_of_tokens[var] = tokens
+        self.variable_indices[var] = node
+        for target in self._pending.pop(var, ()):
+            self.dag.add_edge(node, target, None)
+        for tok in tokens:
+            if tok.type != "VARIABLE" or tok.value in CONSTANTS:
+                continue
+            self._names[tok.value] = None
+            source = self.variable_indices.get(tok.value)
+            if source is None:
+                self._pending.setdefault(tok.value, []).append(node)
+            else:
+                self.dag.add_edge(source, node, None)
+
+    @property
+    def input_variables(self) -> List[str]:
+        """
+        :return: the variables referred to that are not state variables, in order of first appearance
+        """
+        return [name for name in self._names if name not in self.d]
+
+
+@contextmanager
+def _open(source: Source) -> Iterator[TextIO]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            yield f
+    else:
+        yield source
+
+
+def _lines(f: TextIO) -> Iterator[Tuple[int, str]]:
+    """
+    :return: the line numbers and the lines of `f` without comments, skipping the blank ones
+    """
+    for lineno, line in enumerate(f, 1):
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield lineno, line
+
+
+def _bnet_expression(expr: str) -> str:
+    """
+    In BoolNet `!` binds tighter than `&` and `|`, but it binds loosest in the grammar of `pybcn.parser`.
+    Parenthesize every `!` whose operand is followed by a binary operator, e.g. `!x2 & x3` -> `(!x2) & x3`,
+    the other ones mean the same in both.
+    :param expr: an expression in the BoolNet syntax
+    :return: the expression in the syntax of `pybcn.parser`
+    """
+    tokens = tokenize(expr)
+
+    def operand_end(i: int) -> int:
+        # the index of the token after the operand starting at token `i`
+        while i < len(tokens) and tokens[i].type == "NOT":
+            i += 1
+        if i < len(tokens) and tokens[i].type == "LPAREN":
+            depth = 0
+            for j in range(i, len(tokens)):
+                depth += {"LPAREN": 1, "RPAREN": -1}.get(tokens[j].type, 0)
+                if depth == 0:
+                    return j + 1
+            return len(tokens)
+        return i + 1
+
+    insertions = []
+    for i, tok in enumerate(tokens):
+        if tok.type != "NOT":
+            continue
+        end = operand_end(i + 1)
+        if end < len(tokens) and tokens[end].type != "RPAREN":
+            last = tokens[end - 1]
+            insertions += [(tok.lexpos, "("), (last.lexpos + len(last.value), ")")]
+    for pos, paren in sorted(insertions, reverse=True):
+        expr = expr[:pos] + paren + expr[pos:]
+    return expr
+
+
+def read_bnet(source: Source) -> Iterator[Tuple[str, str]]:
+    """
+    Read a network in the BoolNet format: an optional header `targets, factors`, then one line
+    `variable, expression` for every state variable, `#` starting a comment.
+    :param source: a path or an open text file
+    :return: a generator of `(variable, expression)` in the order of the file, the expressions rewritten
+        to keep the precedence of `!` in BoolNet
+    """
+    with _open(source) as f:
+        for lineno, line in _lines(f):
+            var, sep, expr = line.partition(",")
+            var, expr = var.strip(), expr.strip()
+            if var.lower() == "targets" and expr.lower() == "factors":
+                continue
+            if not sep or not var or not expr:
+                raise SyntaxError(f"line {lineno}: expected 'variable, expression', got '{line}'")
+            yield var, _bnet_expression(expr)
+
+
+def read_text(source: Source) -> Iterator[Tuple[str, str]]:
+    """
+    Read a network of one line `variable = expression` for every state variable, `#` starting a comment.
+    :param source: a path or an open text file
+    :return: a generator of `(variable, expression)` in the order of the file
+    """
+    with _open(source) as f:
+        for lineno, line in _lines(f):
+            var, sep, expr = line.partition("=")
+            var, expr = var.strip(), expr.strip()
+            if not sep or not var or not expr:
+                raise SyntaxError(f"line {lineno}: expected 'variable = expression', got '{line}'")
+            yield var, expr
+
+
+READERS = {"bnet": read_bnet, "text": read_text}
+
+
+def load_network(source: Source, format: Optional[str] = None) -> NetworkBuilder:
+    """
+    Read a network line by line into a NetworkBuilder.
+    :param source: a path or an open text file
+    :param format: "bnet" or "text", "bnet" if it is None and `source` is a path ending with `.bnet`, else "text"
+    :return: the NetworkBuilder of the network, its `d` being the dict with structure '<variable, expression>'
+    """
+    if format is None:
+        path = os.fspath(source) if isinstance(source, (str, os.PathLike)) else ""
+        format = "bnet" if path.endswith(".bnet") else "text"
+    assert format in READERS, f"format should be one of {list(READERS)}, got {format}"
+    builder = NetworkBuilder()
+    for var, expr in READERS[format](source):
+        builder.add(var, expr)
+    return builder
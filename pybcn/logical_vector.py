@@ -1,12 +1,17 @@
 from typing import List, Union
 
+import numpy as np
+
 
 class LogicalVector:
     """
     Logical vector, a vector of a single 1 and all other 0
     When Logical vector is used to represent the state of BCNs, only those vectors whose dims are a power of 2 are legal.
+    The state of the `i`-th of `n` variables is the complement of bit `n - 1 - i` of `pos - 1`.
     """
 
+    __slots__ = ("pos", "dim")
+
     def __init__(self, pos: int, dim: int):
         """
         :param pos: can be integer in `[1, dim]`, indicates the position of 1 in the logical vector
@@ -23,17 +28,9 @@ class LogicalVector:
         Convert to vector form.
         :return: the corresponding state list
         """
-        result = []
-        pos = self.pos
-        dim = self.dim
-        while dim != 1:
-            if pos <= dim // 2:
-                result.append(1)
-            else:
-                result.append(0)
-            dim = dim // 2
-            pos = (pos - 1) % dim + 1
-        return result
+        n = self.dim.bit_length() - 1
+        index = self.pos - 1
+        return [1 ^ ((index >> shift) & 1) for shift in range(n - 1, -1, -1)]
 
     @classmethod
     def from_list(cls, l: List[int]):
@@ -63,8 +60,11 @@ class LogicalVector:
         :param l: a list of states consisting of 1 or 0
         """
         assert len(l) != 0, f"l cannot be empty"
-        l = list(map(lambda i: cls.from_integer(i), l))
-        return l[0] * l[1:]
+        index = 0
+        for val in l:
+            assert val == 0 or val == 1, f"got {val}, should be 0 or 1"
+            index = (index << 1) | (1 ^ val)
+        return cls(index + 1, 1 << len(l))
 
     def __eq__(self, o):
         if isinstance(o, LogicalVector) and self.dim == o.dim and self.pos == o.pos:
@@ -83,6 +83,31 @@ class LogicalVector:
             dim = self.dim * o.dim
             return LogicalVector(pos, dim)
         elif isinstance(o, List):
-            if len(o) == 0:
-                return self
-            return (self * o[0]) * o[1:]
+            pos, dim = self.pos, self.dim
+            for v in o:
+                pos = (pos - 1) * v.dim + v.pos
+                dim *= v.dim
+            return LogicalVector(pos, dim)
+
+
+def positions_to_states(positions: Union[List[int], np.ndarray], n: int) -> np.ndarray:
+    """
+    Convert many positions at once, the batch version of `LogicalVector.to_list`.
+    :param positions: positions of logical vectors of dim `2 ** n`
+    :param n: the number of variables
+    :return: a `uint8` array of shape `(len(positions), n)`, row `k` being the state list of `positions[k]`
+    """
+    index = np.asarray(positions, dtype=np.uint64) - np.uint64(1)
+    shifts = np.arange(n - 1, -1, -1, dtype=np.uint64)
+    return (1 ^ ((index[:, None] >> shifts) & np.uint64(1))).astype(np.uint8)
+
+
+def states_to_positions(states: Union[List[List[int]], np.ndarray]) -> np.ndarray:
+    """
+    Convert many state lists at once, the batch version of `LogicalVector.from_states`.
+    :param states: an array of shape `(k, n)` consisting of 1 or 0, `n <= 64`
+    :return: a `uint64` array of the `k` positions
+    """
+    states = np.asarray(states, dtype=np.uint64)
+    shifts = np.arange(states.shape[1] - 1, -1, -1, dtype=np.uint64)
+    return ((1 ^ states) << shifts).sum(axis=1, dtype=np.uint64) + np.uint64(1)
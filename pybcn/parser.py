@@ -0,0 +1,183 @@
+import threading
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, Callable, List, Mapping, Sequence, Tuple
+
+from ply.lex import LexToken
+
+from pybcn.lexer import tokens
+
+# A parsed expression is a tree of tuples whose first item is the node type:
+#   ("VARIABLE", name), `name` being one of `CONSTANTS` for a constant
+#   ("NOT", operand)
+#   ("AND" | "OR" | "XOR", left, right)
+Node = Tuple
+
+# names of the constant values, e.g. to knock a variable out with the expression `0`
+CONSTANTS = ("0", "1")
+
+# The grammar mirrors the precedence of the Python operators the expressions
+# used to be evaluated with: `!` (`not`) binds loosest, then `|`, `^`, `&`.
+precedence = (
+    ("right", "NOT"),
+    ("left", "OR"),
+    ("left", "XOR"),
+    ("left", "AND"),
+)
+
+
+def p_expression_binop(p):
+    """
+    expression : expression OR expression
+               | expression XOR expression
+               | expression AND expression
+    """
+    p[0] = (p.slice[2].type, p[1], p[3])
+
+
+def p_expression_not(p):
+    "expression : NOT expression"
+    p[0] = ("NOT", p[2])
+
+
+def p_expression_group(p):
+    "expression : LPAREN expression RPAREN"
+    p[0] = p[2]
+
+
+def p_expression_variable(p):
+    "expression : VARIABLE"
+    p[0] = ("VARIABLE", p[1])
+
+
+def p_error(p):
+    if p is None:
+        raise SyntaxError("unexpected end of expression")
+    raise SyntaxError(f"unexpected token '{p.value}' at position {p.lexpos}")
+
+
+_parser = None
+_lock = threading.Lock()
+# the lexer `parse` hands to ply, the tokens come from `tokenfunc`, but without a lexer ply falls back to the last
+# `ply.lex` lexer built, which is not built anymore unless `pybcn.lexer.lexer` is used
+_NO_LEXER = SimpleNamespace(lineno=1, lexpos=0)
+
+
+def get_parser():
+    """
+    Build the parser on first use, importing `ply.yacc` and generating the tables takes longer than parsing
+    most networks.
+    :return: the `ply.yacc` parser
+    """
+    global _parser
+    with _lock:
+        if _parser is None:
+            import ply.yacc as yacc
+
+            _parser = yacc.yacc(debug=False, write_tables=False)
+    return _parser
+
+
+def __getattr__(name: str):
+    if name == "parser":
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_OPERATORS = {"AND": "&", "OR": "|", "XOR": "^"}
+
+
+def parse(tokens: List[LexToken]) -> Node:
+    """
+    Parse the tokens of an expression into a syntax tree.
+    :param tokens: tokens produced by `pybcn.lexer.tokenize` or `lexer.get_all_tokens`
+    :return: the root node of the syntax tree
+    """
+    return get_parser().parse(lexer=_NO_LEXER, tokenfunc=partial(next, iter(tokens), None))
+
+
+def to_source(tree: Node, operand: Callable[[str], str]) -> str:
+    """
+    Render a syntax tree as a Python expression over 0/1 integers.
+    Chains of the same associative operator are flattened so that long
+    expressions do not run into the nesting limit of the Python compiler.
+    :param tree: the syntax tree
+    :param operand: maps a variable name to the source of its value
+    :return: the source of the expression
+    """
+    kind = tree[0]
+    if kind == "VARIABLE":
+        return tree[1] if tree[1] in CONSTANTS else operand(tree[1])
+    if kind == "NOT":
+        return f"(1 ^ {to_source(tree[1], operand)})"
+
+    operands = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node[0] == kind:
+            stack.append(node[2])
+            stack.append(node[1])
+        else:
+            operands.append(to_source(node, operand))
+    return "(" + f" {_OPERATORS[kind]} ".join(operands) + ")"
+
+
+def _bit_operand(variables: Sequence[str], input_variables: Sequence[str]) -> Callable[[str], str]:
+    """
+    Read variables from the zero-based indices `s` and `u` of the state and input logical vectors.
+    The first variable is the most significant bit, and a set bit means the variable is 0.
+    """
+    n = len(variables)
+    m = len(input_variables)
+    shifts = {var: ("s", n - 1 - i) for i, var in enumerate(variables)}
+    for i, var in enumerate(input_variables):
+        shifts.setdefault(var, ("u", m - 1 - i))
+
+    def operand(name: str) -> str:
+        index, shift = shifts[name]
+        return f"(1 ^ (({index} >> {shift}) & 1))"
+
+    return operand
+
+
+def compile_expression(tree: Node, variables: Sequence[str], input_variables: Sequence[str]) -> Callable[[int, int], int]:
+    """
+    Compile a syntax tree into a function of the state and input indices.
+    :param tree: the syntax tree
+    :param variables: the state variables, in order
+    :param input_variables: the input variables, in order
+    :return: a function `f(s, u)` returning the value (0 or 1) of the expression,
+        where `s` and `u` are the positions of the state and input logical vectors minus 1
+    """
+    source = to_source(tree, _bit_operand(variables, input_variables))
+    return eval(f"lambda s, u: {source}")
+
+
+def compile_network(trees: Sequence[Node], variables: Sequence[str], input_variables: Sequence[str]) -> Callable[[int, int], int]:
+    """
+    Compile the update functions of all state variables into a single transition function.
+    :param trees: the syntax trees of the update functions, in the order of `variables`
+    :param variables: the state variables, in order
+    :param input_variables: the input variables, in order
+    :return: a function `f(s, u)` returning the position of the next state minus 1,
+        where `s` and `u` are the positions of the state and input logical vectors minus 1
+    """
+    operand = _bit_operand(variables, input_variables)
+    n = len(variables)
+    terms = [
+        f"((1 ^ {to_source(tree, operand)}) << {n - 1 - i})"
+        for i, tree in enumerate(trees)
+    ]
+    return eval(f"lambda s, u: {' | '.join(terms)}")
+
+
+def compile_vectorized(tree: Node) -> Callable[[Mapping[str, Any]], Any]:
+    """
+    Compile a syntax tree into a function evaluating the expression column-wise.
+    :param tree: the syntax tree
+    :return: a function `f(columns)` where `columns` maps every variable of the expression
+        to an array of 0/1 values (e.g. a `numpy.uint8` array), returning the array of results
+    """
+    source = to_source(tree, lambda name: f"c[{name!r}]")
+    return eval(f"lambda c: {source}")
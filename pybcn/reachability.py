@@ -0,0 +1,367 @@
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class SuccessorIndex:
+    """
+    One-step successors of every state in compressed sparse row (CSR) form, built once from `L`.
+    The next states of state `i + 1` are `next_states[indptr[i]:indptr[i + 1]]`, ordered by the first
+    input leading to them as in `SmallBCN.one_step_states`, and the inputs leading to the `k`-th of them
+    are `inputs[input_indptr[k]:input_indptr[k + 1]]`. States and inputs are stored as positions,
+    in the smallest unsigned integer dtypes that hold them.
+    """
+
+    def __init__(self, L: np.ndarray, N: int, M: int):
+        """
+        :param L: the ASSR of the network, see `SmallBCN.L`
+        :param N: the number of states
+        :param M: the number of inputs
+        :return: a SuccessorIndex instance
+        """
+        self.L = L
+        self.N = N
+        self.M = M
+        L = np.asarray(L)
+        pointer_dtype = np.min_scalar_type(N * M)
+        # key of the pair (state `i + 1`, next state) in row-major order of the states, inputs ascending
+        keys = np.arange(N, dtype=np.intp)[:, None] * (N + 1) + L.reshape(M, N).T
+        keys = keys.ravel()
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        lengths = np.diff(np.r_[starts, len(keys)])
+        states = keys[starts] // (N + 1)
+        # order the next states of every state by the first input leading to them
+        groups = np.lexsort((order[starts] % M, states))
+        starts, lengths = starts[groups], lengths[groups]
+
+        self.next_states = (keys[starts] % (N + 1)).astype(L.dtype)
+        self.indptr = np.zeros(N + 1, dtype=pointer_dtype)
+        np.cumsum(np.bincount(states, minlength=N), out=self.indptr[1:])
+        self.input_indptr = np.zeros(len(starts) + 1, dtype=pointer_dtype)
+        np.cumsum(lengths, out=self.input_indptr[1:])
+        index = np.repeat(starts - self.input_indptr[:-1].astype(np.intp), lengths) + np.arange(len(keys))
+        self.inputs = (order[index] % M + 1).astype(np.min_scalar_type(M))
+
+    def successors(self, state: int) -> Dict[int, List[int]]:
+        """
+        :param state: pos of corresponding vector of current state
+        :return: the next states and the inputs leading to them, the same as `SmallBCN.one_step_states`
+        """
+        start, end = self.indptr[state - 1:state + 1].tolist()
+        bounds = self.input_indptr[start:end + 1].tolist()
+        offset = bounds[0]
+        inputs = self.inputs[offset:bounds[-1]].tolist()
+        return {
+            next_state: inputs[bounds[k] - offset:bounds[k + 1] - offset]
+            for k, next_state in enumerate(self.next_states[start:end].tolist())
+        }
+
+    def image(self, mask: np.ndarray) -> np.ndarray:
+        """
+        :param mask: a boolean array over the `N` states
+        :return: the boolean array of the states that can be reached from the states in `mask` in one step
+        """
+        # positions are 1-based, index `res` directly and drop the dummy state 0
+        res = np.zeros(self.N + 1, dtype=bool)
+        res[self.next_states[np.repeat(mask, np.diff(self.indptr))]] = True
+        return res[1:]
+
+    def preimage(self, mask: np.ndarray) -> np.ndarray:
+        """
+        :param mask: a boolean array over the `N` states
+        :return: the boolean array of the states that have a next state in `mask`
+        """
+        hits = np.r_[False, mask][self.next_states]
+        # every state has at least one next state, so no row of the index is empty
+        return np.logical_or.reduceat(hits, self.indptr[:-1].astype(np.intp))
+
+    def image_of(self, states: Iterable[int]) -> np.ndarray:
+        """
+        :param states: positions of the current states
+        :return: the sorted positions of the states that can be reached from `states` in one step
+        """
+        mask = np.zeros(self.N, dtype=bool)
+        mask[np.fromiter(states, dtype=np.intp) - 1] = True
+        return np.flatnonzero(self.image(mask)) + 1
+
+    def next_of(self, state: int) -> np.ndarray:
+        """
+        :return: the positions of the next states of `state`, without the inputs leading to them
+        """
+        return self.next_states[self.indptr[state - 1]:self.indptr[state]]
+
+
+class PredecessorIndex:
+    """
+    The inverse of a SuccessorIndex in the same CSR form, the states having state `i + 1` as a next state
+    are `previous_states[indptr[i]:indptr[i + 1]]`, ascending. The inputs leading from them are left in the SuccessorIndex.
+    """
+
+    def __init__(self, successors: SuccessorIndex):
+        """
+        :param successors: the SuccessorIndex of the network
+        :return: a PredecessorIndex instance
+        """
+        self.successors = successors
+        N = successors.N
+        states = np.repeat(np.arange(1, N + 1, dtype=np.intp), np.diff(successors.indptr.astype(np.intp)))
+        next_states = successors.next_states.astype(np.intp)
+        order = np.argsort(next_states, kind="stable")
+        self.previous_states = states[order].astype(successors.next_states.dtype)
+        self.indptr = np.zeros(N + 1, dtype=successors.indptr.dtype)
+        np.cumsum(np.bincount(next_states - 1, minlength=N), out=self.indptr[1:])
+
+    def previous_of(self, state: int) -> np.ndarray:
+        """
+        :return: the positions of the states having `state` as a next state
+        """
+        return self.previous_states[self.indptr[state - 1]:self.indptr[state]]
+
+
+class ForwardLayers:
+    """
+    Sets of the states reachable from an initial state in exactly `t` steps, `t = 0, 1, ...`,
+    stored as boolean arrays over the `N` states, i.e. O(N * T) memory for T layers.
+    Control sequences are reconstructed from the layers and `L` on demand.
+    """
+
+    def __init__(self, L: np.ndarray, N: int, M: int, init: int, successors: Optional[SuccessorIndex] = None):
+        """
+        :param L: the ASSR of the network, see `SmallBCN.L`
+        :param N: the number of states
+        :param M: the number of inputs
+        :param init: pos of corresponding vector of initial state
+        :param successors: the SuccessorIndex of `L`, built if it is None
+        :return: a ForwardLayers instance
+        """
+        self.N = N
+        self.M = M
+        self.init = init
+        self.successors = SuccessorIndex(L, N, M) if successors is None else successors
+        layer = np.zeros(N, dtype=bool)
+        layer[init - 1] = True
+        self.layers = [layer]
+        self._seen = {layer.tobytes(): 0}
+        self.period = None  # set once a layer repeats an earlier one, after which the layers are periodic
+
+    @property
+    def T(self) -> int:
+        """
+        :return: the number of steps of the last layer
+        """
+        return len(self.layers) - 1
+
+    def extend(self) -> np.ndarray:
+        """
+        Compute the next layer.
+        :return: the states reachable in exactly `T` steps, after incrementing `T`
+        """
+        layer = self.successors.image(self.layers[-1])
+        self.layers.append(layer)
+        if self.period is None:
+            key = layer.tobytes()
+            if key in self._seen:
+                self.period = self.T - self._seen[key]
+            else:
+                self._seen[key] = self.T
+        return layer
+
+    def extend_to(self, T: int):
+        """
+        Compute the layers up to `T` steps.
+        """
+        while self.T < T:
+            self.extend()
+
+    def reaches(self, dest: int, T: int) -> bool:
+        """
+        :return: whether `dest` can be reached in exactly `T` steps
+        """
+        self.extend_to(T)
+        return bool(self.layers[T][dest - 1])
+
+    def size(self, t: int) -> int:
+        """
+        :return: the number of states reachable in exactly `t <= T` steps
+        """
+        return int(np.count_nonzero(self.layers[t]))
+
+    def min_time(self, dest: int) -> Optional[int]:
+        """
+        :param dest: pos of corresponding vector of destination state
+        :return: the least `T >= 1` such that `dest` can be reached in exactly `T` steps,
+            or None if it can never be reached
+        """
+        T = 1
+        while True:
+            if self.reaches(dest, T):
+                return T
+            # every layer after the first repetition has been seen before
+            if self.period is not None and T >= self.T:
+                return None
+            T += 1
+
+    def _successors(self, state: int) -> List[Tuple[int, List[int]]]:
+        """
+        :return: the next states of the state at index `state` with the inputs leading to them,
+            ordered as in `SmallBCN.one_step_states`
+        """
+        return [(next_state - 1, inputs) for next_state, inputs in self.successors.successors(state + 1).items()]
+
+    def paths(self, dest: int, T: int) -> Iterator[Tuple[List[int], List[List[int]]]]:
+        """
+        Enumerate the control sequences steering the initial state to `dest` in exactly `T` steps.
+        They are yielded in the order in which a breadth-first search over `SmallBCN.one_step_states` finds them.
+        :param dest: pos of corresponding vector of destination state
+        :param T: the number of steps
+        :return: a generator of `(state sequence, input sequence)`, each item of the input sequence
+            being the list of the inputs leading to the next state
+        """
+        if not self.reaches(dest, T):
+            return
+        # targets[t]: states in layer t from which `dest` can be reached in T - t steps
+        targets = [None] * (T + 1)
+        targets[T] = np.zeros(self.N, dtype=bool)
+        targets[T][dest - 1] = True
+        for t in range(T - 1, -1, -1):
+            targets[t] = self.layers[t] & self.successors.preimage(targets[t + 1])
+
+        seq = [self.init]
+        c_seq = []
+        stack = [iter(self._successors(self.init - 1))]
+        while stack:
+            t = len(stack)
+            for next_state, inputs in stack[-1]:
+                if targets[t][next_state]:
+                    break
+            else:
+                stack.pop()
+                seq.pop()
+                if c_seq:
+                    c_seq.pop()
+                continue
+            seq.append(next_state + 1)
+            c_seq.append(inputs)
+            if t == T:
+                yield list(seq), list(c_seq)
+                seq.pop()
+                c_seq.pop()
+            else:
+                stack.append(iter(self._successors(next_state)))
+
+
+class BackwardLayers:
+    """
+    Sets of the states from which a destination state can be reached in exactly `k` steps, `k = 0, 1, ...`,
+    stored as boolean arrays over the `N` states, together with the least such `k >= 1` of every state seen so far.
+    Once computed, the minimum control time from any initial state to the destination is a lookup in `times`.
+    If `max_bytes` is given, the oldest layers are dropped once the instance takes more memory, see `nbytes`.
+    `times` and the packed layers kept to detect the period count against the budget but are never dropped,
+    so only the layers shrink to make room for them, and the packed layers are freed once the period is found.
+    """
+
+    def __init__(self, successors: SuccessorIndex, dest: int, max_bytes: Optional[int] = None):
+        """
+        :param successors: the SuccessorIndex of the network
+        :param dest: pos of corresponding vector of destination state
+        :param max_bytes: the memory budget, see `nbytes`, the last layer is kept in any case
+        :return: a BackwardLayers instance
+        """
+        self.successors = successors
+        self.N = successors.N
+        self.dest = dest
+        self.max_bytes = max_bytes
+        layer = np.zeros(self.N, dtype=bool)
+        layer[dest - 1] = True
+        self.layers = [layer]
+        self.first = 0  # the number of steps of `layers[0]`, increased when old layers are dropped
+        self.times = np.zeros(self.N, dtype=np.uint32)  # least `k >= 1` of every state, 0 if not found yet
+        self._seen = {np.packbits(layer).tobytes(): 0}
+        self.period = None  # set once a layer repeats an earlier one, after which `times` is complete
+        # the layers are shared by the queries of `SmallBCN.controllability`, which may run in several threads
+        self._lock = threading.RLock()
+
+    @property
+    def k(self) -> int:
+        """
+        :return: the number of steps of the last layer
+        """
+        return self.first + len(self.layers) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: the memory taken by the layers, `times` and the packed layers kept to detect the period
+        """
+        return len(self.layers) * self.N + self.times.nbytes + len(self._seen) * ((self.N + 7) // 8)
+
+    def extend(self) -> np.ndarray:
+        """
+        Compute the next layer.
+        :return: the states from which the destination can be reached in exactly `k` steps, after incrementing `k`
+        """
+        with self._lock:
+            layer = self.successors.preimage(self.layers[-1])
+            self.layers.append(layer)
+            self.times[layer & (self.times == 0)] = self.k
+            if self.period is None:
+                key = np.packbits(layer).tobytes()
+                if key in self._seen:
+                    self.period = self.k - self._seen[key]
+                    self._seen.clear()
+                else:
+                    self._seen[key] = self.k
+            self._drop()
+            return layer
+
+    def _drop(self):
+        """
+        Drop the oldest layers until the instance fits in `max_bytes`.
+        """
+        if self.max_bytes is None:
+            return
+        while len(self.layers) > 1 and self.nbytes > self.max_bytes:
+            self.layers.pop(0)
+            self.first += 1
+
+    def extend_to(self, k: int):
+        """
+        Compute the layers up to `k` steps.
+        """
+        with self._lock:
+            while self.k < k:
+                self.extend()
+
+    def complete(self) -> "BackwardLayers":
+        """
+        Compute the layers until they become periodic, after which `times` holds the minimum time of every state.
+        :return: the instance itself
+        """
+        with self._lock:
+            while self.period is None:
+                self.extend()
+        return self
+
+    def reaches(self, state: int, k: int) -> bool:
+        """
+        :return: whether the destination can be reached from `state` in exactly `k` steps
+        """
+        with self._lock:
+            self.extend_to(k)
+            if k < self.first:
+                raise ValueError(f"the layer of {k} steps has been dropped, the oldest kept layer is {self.first}")
+            return bool(self.layers[k - self.first][state - 1])
+
+    def min_time(self, init: int) -> Optional[int]:
+        """
+        :param init: pos of corresponding vector of initial state
+        :return: the least `k >= 1` such that the destination can be reached from `init` in exactly `k` steps,
+            or None if it can never be reached
+        """
+        with self._lock:
+            while self.times[init - 1] == 0 and self.period is None:
+                self.extend()
+            return int(self.times[init - 1]) or None
@@ -1,10 +1,86 @@
 import sys
+import threading
 from collections import deque
-from itertools import product
-from typing import List, Mapping, Optional, Union
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
-from pybcn.lexer import lexer
+import numpy as np
+
+from pybcn.attractors import Attractors
+from pybcn.cache import ASSRCache
+from pybcn.lexer import tokenize
 from pybcn.logical_vector import LogicalVector
+from pybcn.parser import CONSTANTS, compile_expression, compile_network, compile_vectorized, parse
+from pybcn.reachability import BackwardLayers, ForwardLayers, PredecessorIndex, SuccessorIndex
+
+
+ASSR_CHUNK_SIZE = 2 ** 20
+
+
+def tokenize_network(
+    d: Mapping[str, str], tokens: Optional[Mapping[str, list]] = None
+) -> Tuple[Dict[str, list], List[str]]:
+    """
+    :param d: a dict with structure '<variable, expression>'
+    :param tokens: the tokens of the expressions of a network `d` is part of, e.g. `LargeBCN.list_of_tokens`,
+        reused instead of tokenizing the expressions again
+    :return: the tokens of every expression, and the input variables, i.e. the variables that are not
+        keys of `d` or `CONSTANTS`, in order of first appearance
+    """
+    list_of_tokens = {}
+    input_variables = {}
+    for var, expr in d.items():
+        if tokens is None or var not in tokens:
+            list_of_tokens[var] = tokenize(expr)
+        else:
+            list_of_tokens[var] = tokens[var]
+        for t in list_of_tokens[var]:
+            if t.type == "VARIABLE" and t.value not in d and t.value not in CONSTANTS:
+                input_variables[t.value] = None
+    return list_of_tokens, list(input_variables)
+
+
+def assr_dtype(N: int) -> np.dtype:
+    """
+    :param N: the number of states
+    :return: the smallest unsigned integer dtype that can hold the positions `1..N` stored in `L`
+    """
+    return np.min_scalar_type(N)
+
+
+def _batch_inputs(
+    init_positions: Union[Iterable[int], np.ndarray],
+    input_sequences: Union[Iterable[Iterable[int]], np.ndarray],
+    dtype: np.dtype = np.int64,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :param dtype: the dtype of the arrays, `object` holding positions of 64 bits or more as Python ints
+    :return: the initial states and the `(K, T)` inputs of `simulate_batch`
+    """
+    states = np.asarray(init_positions, dtype=dtype)
+    inputs = np.asarray(input_sequences, dtype=dtype)
+    if inputs.ndim == 1:
+        inputs = np.broadcast_to(inputs, (len(states), len(inputs)))
+    assert inputs.shape[0] == len(states), f"got {inputs.shape[0]} input sequences for {len(states)} initial states"
+    return states, inputs
+
+
+def _batch_steps(states: np.ndarray, inputs: np.ndarray, step) -> Iterator[np.ndarray]:
+    """
+    The arrays of states of `simulate_batch`, `step(states, inputs)` returning the next states of the trajectories,
+    in the dtype of `states`.
+    """
+    yield states
+    for t in range(inputs.shape[1]):
+        states = np.asarray(step(states, inputs[:, t]), dtype=states.dtype)
+        yield states
+
+
+def _collect_steps(states: np.ndarray, inputs: np.ndarray, step, dtype: np.dtype) -> np.ndarray:
+    res = np.empty((len(states), inputs.shape[1] + 1), dtype=dtype)
+    for t, states in enumerate(_batch_steps(states, inputs, step)):
+        res[:, t] = states
+    return res
 
 
 class SmallBCN:
@@ -12,52 +88,89 @@ class SmallBCN:
     Small-scale Boolean Control Network
     """
 
-    def __init__(self, d: Mapping[str, str], init_states: Optional[List[int]] = None):
+    def __init__(
+        self,
+        d: Mapping[str, str],
+        init_states: Optional[List[int]] = None,
+        L: Optional[np.ndarray] = None,
+        cache: Optional[ASSRCache] = None,
+        tokens: Optional[Mapping[str, list]] = None,
+    ):
         """
         Generate a SmallBCN instance.
 
         :param d: a dict with structure '<variable, expression>'
         :param init_states: initial states, set to all 0 if it is None
+        :param L: a previously generated ASSR of the same network (e.g. from `load_assr`), generated if it is None
+        :param cache: an ASSRCache to look the ASSR up in, and to add it to when it has to be generated
+        :param tokens: the tokens of the expressions, see `tokenize_network`
         :return: a SmallBCN instance
         """
         self.d = d
         self.variables = []
         self.list_of_tokens = {}
+        self.trees = {}  # syntax trees of the update functions
+        self.functions = {}  # compiled update functions, see `pybcn.parser.compile_expression`
+        self.inputs_of = {}  # the set of input variables each update function refers to
         self.input_variables = []
         self.states = {}
         self.n = None  # number of state variables
         self.m = None  # number of input variables
         self.N = None  # equals to 2 ** n
         self.M = None  # equals to 2 ** m
+        self.L = None  # ASSR, `L[i + j * N]` is the position of the next state of state `i + 1` under input `j + 1`
+        self._successors = None  # SuccessorIndex of `L`, built on first use
+        self._predecessors = None  # PredecessorIndex of `_successors`, built on first use
+        self._backward = {}  # destination -> BackwardLayers, see `controllability`
+        self._lock = threading.RLock()  # guards the lazily built `_successors`, `_predecessors` and `_backward`
 
-        self._generate(d, init_states)
+        self._generate(d, init_states, L, cache, tokens)
 
-    def _generate(self, d: Mapping[str, str], init_states: Optional[List[int]] = None):
+    def _generate(
+        self,
+        d: Mapping[str, str],
+        init_states: Optional[List[int]] = None,
+        L: Optional[np.ndarray] = None,
+        cache: Optional[ASSRCache] = None,
+        tokens: Optional[Mapping[str, list]] = None,
+    ):
         """
         :param d: a dict with structure '<variable, expression>'
         :param init_states: initial states, set to all 0 if it is None
+        :param L: a previously generated ASSR, generated if it is None
+        :param cache: an ASSRCache to look the ASSR up in
+        :param tokens: the tokens of the expressions, see `tokenize_network`
         :return: a SmallBCN instance
         """
         self.variables = list(d.keys())
         self.n = len(self.variables)
         self.N = 2 ** self.n
-        for var, expr in d.items():
-            lexer.input(expr)
-            tokens = lexer.get_all_tokens()
-            self.list_of_tokens[var] = tokens
-            self.input_variables.extend(map(
-                lambda t: t.value,
-                filter(
-                    lambda t: t.value not in self.variables
-                    and t.value not in self.input_variables
-                    and t.type == "VARIABLE",
-                    tokens
-                )
-            ))
+        self.list_of_tokens, self.input_variables = tokenize_network(d, tokens)
         self.m = len(self.input_variables)
         self.M = 2 ** self.m
 
-        self._generate_assr()
+        input_set = set(self.input_variables)
+        for var, tokens in self.list_of_tokens.items():
+            self.inputs_of[var] = {t.value for t in tokens if t.type == "VARIABLE"} & input_set
+            self.trees[var] = parse(tokens)
+            self.functions[var] = compile_expression(self.trees[var], self.variables, self.input_variables)
+        self._transition = compile_network(
+            [self.trees[var] for var in self.variables], self.variables, self.input_variables
+        )
+
+        if L is None and cache is not None:
+            key = cache.key(self)
+            L = cache.get(key, self)
+            if L is None:
+                self._generate_assr()
+                cache.put(key, self)
+                L = self.L
+        if L is None:
+            self._generate_assr()
+        else:
+            assert L.shape == (self.M * self.N,), f"L should have shape {(self.M * self.N,)}, got {L.shape}"
+            assert L.dtype == assr_dtype(self.N), f"L should have dtype {assr_dtype(self.N)}, got {L.dtype}"
+            self.L = L
 
         if init_states is None:
             self.states = dict(zip(self.variables, [0] * len(self.variables)))
@@ -71,63 +184,84 @@ class SmallBCN:
     def _generate_assr(self):
         """
         Generate Algebraic State Space Representation (ASSR) of the BCN.
+        The update functions are evaluated over all state-input pairs at once, in chunks of
+        `ASSR_CHUNK_SIZE` columns of `L`.
         """
-        L = [0] * (self.M * self.N)
-        for state_l in product(*([[0, 1]] * self.n)):
-            for input_l in product(*([[0, 1]] * self.m)):
-                state_v = LogicalVector.from_states(list(state_l))
-                input_v = LogicalVector.from_states(list(input_l))
+        n, m, N = self.n, self.m, self.N
+        size = self.M * N
+        dtype = assr_dtype(N)
+        index_dtype = np.min_scalar_type(size - 1)
+        functions = [compile_vectorized(self.trees[var]) for var in self.variables]
+        # bit of the flattened index `i + j * N` holding each variable, see `pybcn.parser.compile_expression`
+        shifts = {var: n - 1 - i for i, var in enumerate(self.variables)}
+        for i, var in enumerate(self.input_variables):
+            shifts[var] = n + m - 1 - i
 
-                self.set_states(dict(zip(self.variables, state_l)))
-                inputs = dict(zip(self.input_variables, input_l))
-                self.update_network(inputs)
+        L = np.empty(size, dtype=dtype)
+        for start in range(0, size, ASSR_CHUNK_SIZE):
+            index = np.arange(start, min(start + ASSR_CHUNK_SIZE, size), dtype=index_dtype)
+            columns = {
+                var: (1 ^ ((index >> shift) & 1)).astype(np.uint8)
+                for var, shift in shifts.items()
+            }
+            chunk = np.ones(len(index), dtype=dtype)
+            for i, f in enumerate(functions):
+                chunk += np.asarray(1 ^ f(columns)).astype(dtype) << (n - 1 - i)
+            L[start:start + len(index)] = chunk
 
-                next_state_l = self.get_states("list")
-                next_state_v = LogicalVector.from_states(next_state_l)
+        self.L = L
 
-                i = state_v.pos - 1
-                j = input_v.pos - 1
-                L[i + j * self.N] = next_state_v.pos
+    def save_assr(self, path: str):
+        """
+        Save the ASSR to a `.npy` file.
+        :param path: path of the file
+        """
+        np.save(path, self.L, allow_pickle=False)
 
-        self.L = L
+    @classmethod
+    def load_assr(cls, d: Mapping[str, str], path: str, init_states: Optional[List[int]] = None, mmap: bool = True):
+        """
+        Generate a SmallBCN instance with an ASSR saved by `save_assr` instead of generating it.
+        :param d: a dict with structure '<variable, expression>', the same as the saved network
+        :param path: path of the file
+        :param init_states: initial states, set to all 0 if it is None
+        :param mmap: memory-map the file read-only instead of reading it into memory,
+            processes mapping the same file share its pages
+        :return: a SmallBCN instance
+        """
+        L = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        return cls(d, init_states, L)
+
+    def _index(self, values: List[int]) -> int:
+        """
+        :param values: a list of states consisting of 1 or 0
+        :return: the position of the corresponding logical vector minus 1
+        """
+        if len(values) == 0:
+            return 0
+        return LogicalVector.from_states(values).pos - 1
 
     def update_variable(self, variable: str, inputs: Mapping[str, int]) -> int:
         """
         Update the state of a variable with given inputs.
         :param variable: name of the variable
-        :param inputs: a dict with structure '<input_variable, value>'
+        :param inputs: a dict with structure '<input_variable, value>', only the inputs the update function
+            of `variable` refers to are required
         :return: the updated value
         """
-        tokens = self.list_of_tokens[variable]
-        expression = []
-        for t in tokens:
-            if t.type == "VARIABLE":
-                if t.value in self.variables:
-                    expression.append(str(self.states[t.value]))
-                elif t.value in self.input_variables:
-                    expression.append(str(inputs[t.value]))
-            elif t.type == "AND":
-                expression.append("&")
-            elif t.type == "OR":
-                expression.append("|")
-            elif t.type == "XOR":
-                expression.append("^")
-            elif t.type == "NOT":
-                expression.append("not")
-            else:
-                expression.append(t.value)
-        return int(eval(" ".join(expression)))
+        used = self.inputs_of[variable]
+        s = self._index(self.get_states("list"))
+        u = self._index([inputs[var] if var in used else inputs.get(var, 0) for var in self.input_variables])
+        return self.functions[variable](s, u)
 
     def update_network(self, inputs: Mapping[str, int]):
         """
         Update the state of the network with given inputs.
         :param inputs: a dict with structure '<input_variable, value>'
         """
-        new_states = {}
-        for variable in self.variables:
-            state = self.update_variable(variable, inputs)
-            new_states[variable] = state
-        self.set_states(new_states)
+        s = self._index(self.get_states("list"))
+        u = self._index([inputs[var] for var in self.input_variables])
+        self.set_states({variable: self.functions[variable](s, u) for variable in self.variables})
 
     def set_states_i(self, states: int):
         states_v = LogicalVector(states, self.N).to_list()
@@ -167,7 +301,63 @@ class SmallBCN:
             return LogicalVector.from_states(list(inputs_formatted.values())).pos
 
     def next_state(self, state, inputs):
-        return self.L[(inputs - 1) * self.N + state - 1]
+        return int(self.L[(inputs - 1) * self.N + state - 1])
+
+    def simulate_batch(
+        self,
+        init_positions: Union[Iterable[int], np.ndarray],
+        input_sequences: Union[Iterable[Iterable[int]], np.ndarray],
+        stream: bool = False,
+    ) -> Union[np.ndarray, Iterator[np.ndarray]]:
+        """
+        Simulate many trajectories at once, advancing all of them a step with a single indexing into `L`.
+        :param init_positions: positions of the `K` initial states
+        :param input_sequences: positions of the inputs, an array of shape `(K, T)`, or of shape `(T,)`
+            to apply the same input sequence to every trajectory
+        :param stream: return a generator of the `T + 1` arrays of the `K` states at every step instead,
+            so that only the current step is kept in memory
+        :return: an array of shape `(K, T + 1)` of the positions of the states, column 0 being `init_positions`
+        """
+        states, inputs = _batch_inputs(init_positions, input_sequences)
+        step = lambda states, inputs: self.L[(inputs - 1) * self.N + states - 1]
+        if stream:
+            return _batch_steps(states, inputs, step)
+        return _collect_steps(states, inputs, step, assr_dtype(self.N))
+
+    @property
+    def successors(self) -> SuccessorIndex:
+        """
+        :return: the SuccessorIndex of `L`, rebuilt if `L` has been replaced
+        """
+        successors = self._successors
+        if successors is None or successors.L is not self.L:
+            with self._lock:
+                if self._successors is None or self._successors.L is not self.L:
+                    self._successors = SuccessorIndex(self.L, self.N, self.M)
+                successors = self._successors
+        return successors
+
+    @property
+    def predecessors(self) -> PredecessorIndex:
+        """
+        :return: the PredecessorIndex of `successors`, rebuilt with it
+        """
+        successors = self.successors
+        predecessors = self._predecessors
+        if predecessors is None or predecessors.successors is not successors:
+            with self._lock:
+                if self._predecessors is None or self._predecessors.successors is not successors:
+                    self._predecessors = PredecessorIndex(successors)
+                predecessors = self._predecessors
+        return predecessors
+
+    def attractors(self, inputs: int) -> Attractors:
+        """
+        The attractors, fixed points and basins of the network under constant inputs.
+        :param inputs: pos of corresponding vector of the inputs
+        :return: the Attractors of the column of `L` of `inputs`
+        """
+        return Attractors(self.L[(inputs - 1) * self.N:inputs * self.N])
 
     def one_step_states(self, state: int):
         """
@@ -175,62 +365,177 @@ class SmallBCN:
         :param state: current state
         :return: the states and the corresponding inputs
         """
-        res = {}
-        for k in range(self.M):
-            r = self.L[k * self.N + state - 1]
-            if r not in res:
-                res[r] = []
-            res[r].append(k + 1)
+        return self.successors.successors(state)
 
-        return res
+    def one_step_image(self, states: Iterable[int]) -> np.ndarray:
+        """
+        :param states: positions of the current states
+        :return: the sorted positions of the states that can be reached from `states` in one step
+        """
+        return self.successors.image_of(states)
+
+    def forward_layers(self, init: int) -> ForwardLayers:
+        """
+        :param init: pos of corresponding vector of initial state
+        :return: the ForwardLayers of the states reachable from `init`
+        """
+        return ForwardLayers(self.L, self.N, self.M, init, self.successors)
 
-    def optimal_time_control(self, init: int, dest: int):
+    def optimal_time_control(self, init: int, dest: int, bidirectional: bool = False):
         """
         Optimal Time Control with BFS.
+        Every state is expanded at most once, and is stored with a back-pointer to the state it was first reached from,
+        so only the first control sequence found is returned.
         :param init: pos of corresponding vector of initial state
         :param dest: pos of corresponding vector of destination state
+        :param bidirectional: search from both ends, see `_optimal_time_control_bidirectional`,
+            T is the same but the control sequence may differ
+        :return: `(T, res)`, T is `sys.maxsize` and res is empty if `dest` is unreachable
         """
-        s = set((init,))
-        q = deque([(init, [init], [])])
-        T = sys.maxsize
-        res = []
+        if bidirectional:
+            return self._optimal_time_control_bidirectional(init, dest)
+        successors = self.successors
+        parents = {init: None}  # state -> (previous state, inputs leading from it)
+        q = deque([init])
 
         while len(q) != 0:
-            state, seq, c_seq = q.popleft()
-            if len(seq) >= T:
-                continue
-            for next_state, inputs in self.one_step_states(state).items():
-                new_seq = seq + [next_state]
-                new_c_seq = c_seq + [inputs]
+            state = q.popleft()
+            for next_state, inputs in successors.successors(state).items():
                 if next_state == dest:
-                    T = len(seq)
-                    res.append((new_seq, new_c_seq))
-                if next_state not in s:
-                    s.add(next_state)
-                    q.append((next_state, new_seq, new_c_seq))
-        return T, res
-
-    def optimal_time_control_2(self, init: int, dest: int):
-        T = 0
-        q = deque([(init, [init], [])])
-        res = []
-        flag = True
-
-        while flag:
-            T += 1
-            while len(q[0][1]) == T:
-                state, seq, c_seq = q.popleft()
-                for next_state, inputs in self.one_step_states(state).items():
-                    new_seq = seq + [next_state]
-                    new_c_seq = c_seq + [inputs]
-                    q.append((next_state, new_seq, new_c_seq))
-
-            for i in q:
-                if i[0] == dest:
-                    res.append((i[1], i[2]))
-                    flag = False
-
-        return T, res
+                    seq, c_seq = [next_state], [inputs]
+                    while parents[state] is not None:
+                        seq.append(state)
+                        state, inputs = parents[state]
+                        c_seq.append(inputs)
+                    seq.append(state)
+                    return len(c_seq), [(seq[::-1], c_seq[::-1])]
+                if next_state not in parents:
+                    parents[next_state] = (state, inputs)
+                    q.append(next_state)
+        return sys.maxsize, []
+
+    def _optimal_time_control_bidirectional(self, init: int, dest: int):
+        """
+        Optimal Time Control with a BFS forward from `init` on `successors` and backward from `dest` on `predecessors`,
+        expanding a whole layer of the smaller frontier at a time until the searches meet.
+        Where the forward BFS reaches `dest` at depth T, the two searches only reach depth about T / 2 each.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :return: `(T, res)`, T is `sys.maxsize` and res is empty if `dest` is unreachable
+        """
+        successors = self.successors
+        predecessors = self.predecessors
+        # the forward search starts from the next states of `init` so that T >= 1 even if `init` is `dest`
+        forward = {}  # state -> (distance from `init`, previous state)
+        frontier = []
+        for next_state in successors.next_of(init).tolist():
+            forward[next_state] = (1, init)
+            frontier.append(next_state)
+        backward = {dest: (0, None)}  # state -> (distance to `dest`, next state)
+        backward_frontier = [dest]
+        meeting = [state for state in frontier if state in backward]
+
+        while not meeting and frontier and backward_frontier:
+            if len(frontier) <= len(backward_frontier):
+                new = []
+                for state in frontier:
+                    distance = forward[state][0] + 1
+                    for next_state in successors.next_of(state).tolist():
+                        if next_state not in forward:
+                            forward[next_state] = (distance, state)
+                            new.append(next_state)
+                frontier = new
+                meeting = [state for state in frontier if state in backward]
+            else:
+                new = []
+                for state in backward_frontier:
+                    distance = backward[state][0] + 1
+                    for previous_state in predecessors.previous_of(state).tolist():
+                        if previous_state not in backward:
+                            backward[previous_state] = (distance, state)
+                            new.append(previous_state)
+                backward_frontier = new
+                meeting = [state for state in backward_frontier if state in forward]
+        if not meeting:
+            return sys.maxsize, []
+
+        state = min(meeting, key=lambda state: forward[state][0] + backward[state][0])
+        seq = [state]
+        for _ in range(forward[state][0]):
+            seq.append(forward[seq[-1]][1])
+        seq.reverse()
+        for _ in range(backward[state][0]):
+            seq.append(backward[seq[-1]][1])
+        c_seq = [successors.successors(seq[t])[seq[t + 1]] for t in range(len(seq) - 1)]
+        return len(c_seq), [(seq, c_seq)]
+
+    def optimal_time_control_2(self, init: int, dest: int, first_only: bool = False):
+        """
+        Optimal Time Control with layered reachable sets, see `pybcn.reachability.ForwardLayers`.
+        Finds all the control sequences of minimum time, in the order of a breadth-first search over `one_step_states`.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param first_only: only reconstruct the first control sequence
+        :return: `(T, res)`, T is `sys.maxsize` and res is empty if `dest` is unreachable
+        """
+        res = list(self.iter_optimal_controls(init, dest, 1 if first_only else None))
+        if not res:
+            return sys.maxsize, []
+        return len(res[0][1]), res
+
+    def iter_optimal_controls(
+        self, init: int, dest: int, limit: Optional[int] = None
+    ) -> Iterator[Tuple[List[int], List[List[int]]]]:
+        """
+        The control sequences of `optimal_time_control_2`, reconstructed one at a time from the forward layers.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param limit: stop after this many control sequences
+        :return: a generator of `(state sequence, input sequence)`, empty if `dest` is unreachable
+        """
+        layers = self.forward_layers(init)
+        T = layers.min_time(dest)
+        if T is None:
+            return iter(())
+        return islice(layers.paths(dest, T), limit)
+
+    def controllability(self, dest: int, max_bytes: Optional[int] = None) -> BackwardLayers:
+        """
+        The sets of states from which `dest` can be reached in each number of steps, kept for later queries.
+        :param dest: pos of corresponding vector of destination state
+        :param max_bytes: the memory budget of the layers, see `pybcn.reachability.BackwardLayers`
+        :return: the BackwardLayers of `dest`, computed up to the steps previous queries needed
+        """
+        with self._lock:
+            layers = self._backward.get(dest)
+            if layers is None or layers.successors is not self.successors:
+                layers = BackwardLayers(self.successors, dest, max_bytes)
+                self._backward[dest] = layers
+            elif max_bytes is not None:
+                layers.max_bytes = max_bytes
+            return layers
+
+    def min_time(self, init: int, dest: int) -> int:
+        """
+        The minimum control time, answered from the BackwardLayers of `dest` kept by `controllability`.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :return: the T of `optimal_time_control_2`, `sys.maxsize` if `dest` is unreachable
+        """
+        T = self.controllability(dest).min_time(init)
+        return sys.maxsize if T is None else T
+
+    def all_pairs_min_time(self) -> np.ndarray:
+        """
+        The minimum control time between all pairs of states, only meant for small N.
+        :return: an N x N array, the item `[init - 1, dest - 1]` is `min_time(init, dest)`
+        """
+        res = np.empty((self.N, self.N), dtype=np.int64)
+        for dest in range(1, self.N + 1):
+            times = BackwardLayers(self.successors, dest).complete().times.astype(np.int64)
+            times[times == 0] = sys.maxsize
+            res[:, dest - 1] = times
+        return res
 
     def __str__(self):
         return f"{{variables: {self.variables}, inputs: {self.input_variables}, states: {list(self.states.values())}}}"
@@ -0,0 +1,135 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+# the callbacks of `subscribe`
+_hooks: List[Callable[[str, "SolverStats"], None]] = []
+
+
+def subscribe(hook: Callable[[str, "SolverStats"], None]) -> Callable[[str, "SolverStats"], None]:
+    """
+    Call `hook(event, stats)` during every `LargeBCN.optimal_time_control` query from now on, with the event
+    "horizon" once every horizon `T` has been tried and "done" once the query has been answered.
+    The hooks are called in the thread of the query and must not modify `stats`. An exception raised by a hook
+    stops the query and is raised by it, e.g. to cancel it.
+    :return: `hook`, so that it can be used as a decorator
+    """
+    _hooks.append(hook)
+    return hook
+
+
+def unsubscribe(hook: Callable[[str, "SolverStats"], None]):
+    """
+    Stop calling a hook passed to `subscribe`.
+    """
+    _hooks.remove(hook)
+
+
+def stats_for(stats: Optional["SolverStats"]) -> Optional["SolverStats"]:
+    """
+    :param stats: the SolverStats a query was given
+    :return: `stats`, or a new SolverStats if it is None and there are hooks, None if nothing is to be recorded
+    """
+    if stats is None and _hooks:
+        return SolverStats()
+    return stats
+
+
+class BlockStats:
+    """
+    The counters of a block during a query. A source block counts the states of its forward layers,
+    a downstream block counts the combinations of control sequences of the source blocks it was tried with.
+    """
+
+    __slots__ = ("states_expanded", "queue_peak", "paths", "combinations", "simulations")
+
+    def __init__(self):
+        self.states_expanded = 0  # the number of states in the forward layers up to the horizon
+        self.queue_peak = 0  # the largest number of states of a forward layer
+        self.paths = 0  # the number of control sequences reaching the destination that were reconstructed
+        self.combinations = 0  # the number of combinations the block was tried with
+        self.simulations = 0  # the number of control sequences simulated up to the destination
+
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"BlockStats({', '.join(f'{name}={value}' for name, value in self.as_dict().items())})"
+
+
+class SolverStats:
+    """
+    What a `LargeBCN.optimal_time_control` query did, recorded when it is given a SolverStats
+    or when hooks are subscribed.
+    The phases are "project", "forward" (extending the forward layers of the source blocks), "paths" (reconstructing
+    their first control sequences), "combinations" (enumerating the combinations of them, pulling the other control
+    sequences as they are reached) and "downstream" (deciding the downstream blocks), each one timed in seconds
+    over the whole query.
+    """
+
+    def __init__(self, hook: Optional[Callable[[str, "SolverStats"], None]] = None):
+        """
+        :param hook: called like the hooks of `subscribe`, but only with the events of the query given this SolverStats,
+            before them, and with the event "combination" as well before every combination of control sequences of
+            the source blocks is tried, e.g. to stop a query within a horizon with many of them
+        :return: a SolverStats instance
+        """
+        self.T = 0  # the last horizon tried
+        self.hook = hook
+        self.phases: Dict[str, float] = {}
+        self.blocks: Dict[int, BlockStats] = {}
+        self.combinations = 0  # the number of combinations of control sequences of the source blocks tried
+        self._start = None
+
+    def block(self, k: int) -> BlockStats:
+        """
+        :return: the counters of block `k`, created on first use
+        """
+        res = self.blocks.get(k)
+        if res is None:
+            res = self.blocks[k] = BlockStats()
+        return res
+
+    def start(self):
+        """
+        Start timing a phase, see `stop`.
+        """
+        self._start = time.perf_counter()
+
+    def stop(self, phase: str):
+        """
+        Add the time since the last `start` or `stop` to `phase`, and start timing the next phase.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._start
+        self._start = now
+
+    def emit(self, event: str):
+        """
+        Call `hook` and the subscribed hooks.
+        """
+        if self.hook is not None:
+            self.hook(event, self)
+        for hook in list(_hooks):
+            hook(event, self)
+
+    @property
+    def total(self) -> float:
+        """
+        :return: the time of the query in seconds
+        """
+        return sum(self.phases.values())
+
+    def as_dict(self) -> dict:
+        """
+        :return: the stats as plain dicts and numbers, e.g. to be serialized as JSON
+        """
+        return {
+            "T": self.T,
+            "combinations": self.combinations,
+            "phases": dict(self.phases),
+            "blocks": {k: block.as_dict() for k, block in sorted(self.blocks.items())},
+        }
+
+    def __repr__(self):
+        phases = ", ".join(f"{phase}={seconds:.6f}s" for phase, seconds in self.phases.items())
+        return f"SolverStats(T={self.T}, combinations={self.combinations}, {phases})"
@@ -0,0 +1,356 @@
+import sys
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from pybcn.bdd import BDD, FALSE, TRUE
+from pybcn.parser import CONSTANTS, Node, parse
+from pybcn.small_bcn import tokenize_network
+
+
+class SymbolicBCN:
+    """
+    Boolean Control Network whose transition relation and sets of states are binary decision diagrams,
+    for networks too large for the `M * N` ASSR of SmallBCN.
+    States and inputs are identified by the same positions as in SmallBCN, but sets of them are never enumerated.
+    The inputs come first in the variable order, then the current and the next value of every state variable interleaved.
+    """
+
+    def __init__(
+        self, d: Mapping[str, str], init_states: Optional[List[int]] = None, tokens: Optional[Mapping[str, list]] = None
+    ):
+        """
+        Generate a SymbolicBCN instance.
+
+        :param d: a dict with structure '<variable, expression>'
+        :param init_states: initial states, set to all 0 if it is None
+        :param tokens: the tokens of the expressions, see `tokenize_network`
+        :return: a SymbolicBCN instance
+        """
+        self.d = d
+        self.variables = list(d.keys())
+        self.n = len(self.variables)
+        self.N = 2 ** self.n
+        self.list_of_tokens, self.input_variables = tokenize_network(d, tokens)
+        self.m = len(self.input_variables)
+        self.M = 2 ** self.m
+        self.trees = {var: parse(tokens) for var, tokens in self.list_of_tokens.items()}
+        if init_states is None:
+            init_states = [0] * self.n
+        assert len(init_states) == self.n, \
+            f"the number of states and variables must be the same, but we got {self.n} and {len(init_states)}"
+        self.states = dict(zip(self.variables, init_states))
+
+        self.bdd = BDD()
+        self.input_levels = list(range(self.m))
+        self.state_levels = [self.m + 2 * i for i in range(self.n)]
+        self.next_levels = [self.m + 2 * i + 1 for i in range(self.n)]
+        self._to_next = dict(zip(self.state_levels, self.next_levels))
+        self._to_current = dict(zip(self.next_levels, self.state_levels))
+        self._levels = {**dict(zip(self.input_variables, self.input_levels)), **dict(zip(self.variables, self.state_levels))}
+        # the update function of every variable over the current states and the inputs
+        self.functions = {var: self._build(tree) for var, tree in self.trees.items()}
+        # the transition relation, true for (state, inputs, next state) if the inputs lead from the state to the next
+        relation = TRUE
+        for var, level in reversed(list(zip(self.variables, self.next_levels))):
+            next_value = self.bdd.neg(self.bdd.apply("XOR", self.bdd.var(level), self.functions[var]))
+            relation = self.bdd.apply("AND", next_value, relation)
+        self.transition = relation
+
+    def _build(self, tree: Node) -> int:
+        """
+        :return: the BDD of a syntax tree of `pybcn.parser`
+        """
+        kind = tree[0]
+        if kind == "VARIABLE":
+            if tree[1] in CONSTANTS:
+                return TRUE if tree[1] == "1" else FALSE
+            return self.bdd.var(self._levels[tree[1]])
+        if kind == "NOT":
+            return self.bdd.neg(self._build(tree[1]))
+        return self.bdd.apply(kind, self._build(tree[1]), self._build(tree[2]))
+
+    @staticmethod
+    def _values(pos: int, levels: List[int]) -> Dict[int, int]:
+        """
+        :return: the values of the variables of `levels` in the logical vector of position `pos`
+        """
+        index = pos - 1
+        k = len(levels)
+        return {level: 1 ^ ((index >> (k - 1 - i)) & 1) for i, level in enumerate(levels)}
+
+    @staticmethod
+    def _position(values: Mapping[int, int], levels: List[int]) -> int:
+        """
+        The inverse of `_values`.
+        """
+        index = 0
+        for level in levels:
+            index = (index << 1) | (1 ^ values[level])
+        return index + 1
+
+    def state_set(self, states: Iterable[int]) -> int:
+        """
+        :param states: positions of states
+        :return: the BDD of the set of them over the current states
+        """
+        u = FALSE
+        for state in states:
+            u = self.bdd.apply("OR", u, self.bdd.cube(self._values(state, self.state_levels)))
+        return u
+
+    def states_of(self, u: int) -> Iterator[int]:
+        """
+        :param u: a set of states over the current states
+        :return: a generator of the positions of its states, ascending
+        """
+        for values in self.bdd.assignments(u, self.state_levels):
+            yield self._position(values, self.state_levels)
+
+    def contains(self, u: int, state: int) -> bool:
+        """
+        :return: whether the set of states `u` contains the state of position `state`
+        """
+        return self.bdd.evaluate(u, self._values(state, self.state_levels))
+
+    def image(self, u: int) -> int:
+        """
+        :param u: a set of states
+        :return: the set of the states that can be reached from them in one step
+        """
+        return self.bdd.rename(self.bdd.and_exists(u, self.transition, self.state_levels + self.input_levels), self._to_current)
+
+    def preimage(self, u: int) -> int:
+        """
+        :param u: a set of states
+        :return: the set of the states from which one of them can be reached in one step
+        """
+        return self.bdd.and_exists(self.bdd.rename(u, self._to_next), self.transition, self.next_levels + self.input_levels)
+
+    def next_state(self, state: int, inputs: int) -> int:
+        values = {**self._values(state, self.state_levels), **self._values(inputs, self.input_levels)}
+        return self._position(self.bdd.pick(self.bdd.restrict(self.transition, values), self.next_levels), self.next_levels)
+
+    def one_step_states(self, state: int, targets: int = TRUE) -> Dict[int, List[int]]:
+        """
+        :param state: current state
+        :param targets: only return the next states in this set
+        :return: the states that can be reached from current state in one step and the corresponding inputs,
+            ordered as in `SmallBCN.one_step_states`
+        """
+        relation = self.bdd.restrict(self.transition, self._values(state, self.state_levels))
+        relation = self.bdd.apply("AND", relation, self.bdd.rename(targets, self._to_next))
+        res = []
+        for values in self.bdd.assignments(self.bdd.exists(relation, self.input_levels), self.next_levels):
+            inputs = self.bdd.restrict(relation, values)
+            res.append((
+                self._position(values, self.next_levels),
+                [self._position(u, self.input_levels) for u in self.bdd.assignments(inputs, self.input_levels)],
+            ))
+        res.sort(key=lambda item: item[1][0])
+        return dict(res)
+
+    def forward_layers(self, init: int) -> "SymbolicLayers":
+        """
+        :param init: pos of corresponding vector of initial state
+        :return: the SymbolicLayers of the states reachable from `init`
+        """
+        return SymbolicLayers(self, init)
+
+    def min_time(self, init: int, dest: int) -> int:
+        """
+        :return: the minimum control time, `sys.maxsize` if `dest` is unreachable
+        """
+        T = self.forward_layers(init).min_time(dest)
+        return sys.maxsize if T is None else T
+
+    def optimal_time_control(self, init: int, dest: int):
+        """
+        Optimal Time Control on the reachable sets, see `SmallBCN.optimal_time_control`.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :return: `(T, res)`, T is `sys.maxsize` and res is empty if `dest` is unreachable
+        """
+        return self.optimal_time_control_2(init, dest, first_only=True)
+
+    def optimal_time_control_2(self, init: int, dest: int, first_only: bool = False):
+        """
+        All the control sequences of minimum time, in the same order as `SmallBCN.optimal_time_control_2`.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param first_only: only reconstruct the first control sequence
+        :return: `(T, res)`, T is `sys.maxsize` and res is empty if `dest` is unreachable
+        """
+        res = list(self.iter_optimal_controls(init, dest, 1 if first_only else None))
+        if not res:
+            return sys.maxsize, []
+        return len(res[0][1]), res
+
+    def iter_optimal_controls(
+        self, init: int, dest: int, limit: Optional[int] = None
+    ) -> Iterator[Tuple[List[int], List[List[int]]]]:
+        """
+        The control sequences of `optimal_time_control_2`, reconstructed one at a time from the forward layers.
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :param limit: stop after this many control sequences
+        :return: a generator of `(state sequence, input sequence)`, empty if `dest` is unreachable
+        """
+        layers = self.forward_layers(init)
+        T = layers.min_time(dest)
+        if T is None:
+            return iter(())
+        return islice(layers.paths(dest, T), limit)
+
+    def control_driven(self, T: int, interior: List[Mapping[str, int]], init: int, dest: int) -> Optional[list]:
+        """
+        Steer the network from `init` to `dest` in `T` steps while some of its inputs are given at every step,
+        choosing the others, see `LargeBCN._control_block`.
+        :param T: the number of steps
+        :param interior: the values of the given inputs at every step
+        :param init: pos of corresponding vector of initial state
+        :param dest: pos of corresponding vector of destination state
+        :return: `[state sequence, input sequence]`, the free inputs being the least in lexicographic order
+            of their positions, or None if the destination cannot be reached
+        """
+        free_levels = [self._levels[var] for var in self.input_variables if var not in interior[0]] if T else []
+        relations = [
+            self.bdd.restrict(self.transition, {self._levels[var]: value for var, value in values.items()})
+            for values in interior
+        ]
+        goods = [FALSE] * (T + 1)
+        goods[T] = self.state_set([dest])
+        for t in range(T - 1, -1, -1):
+            goods[t] = self.bdd.and_exists(
+                relations[t], self.bdd.rename(goods[t + 1], self._to_next), free_levels + self.next_levels
+            )
+        if not self.contains(goods[0], init):
+            return None
+
+        cur_state = init
+        cur_seq = [[cur_state], []]
+        for t in range(T):
+            relation = self.bdd.restrict(relations[t], self._values(cur_state, self.state_levels))
+            choices = self.bdd.and_exists(relation, self.bdd.rename(goods[t + 1], self._to_next), self.next_levels)
+            free = self.bdd.pick(choices, free_levels)
+            next_values = self.bdd.pick(self.bdd.restrict(relation, free), self.next_levels)
+            cur_state = self._position(next_values, self.next_levels)
+            values = {**{self._levels[var]: value for var, value in interior[t].items()}, **free}
+            cur_seq[0].append(cur_state)
+            cur_seq[1].append(self._position(values, self.input_levels))
+        return cur_seq
+
+    def __str__(self):
+        return f"SymbolicBCN({self.n} variables, {self.m} inputs, {len(self.bdd)} BDD nodes)"
+
+
+class SymbolicLayers:
+    """
+    Sets of the states reachable from an initial state in exactly `t` steps, `t = 0, 1, ...`, as BDDs,
+    the counterpart of `pybcn.reachability.ForwardLayers` for SymbolicBCN.
+    """
+
+    def __init__(self, bcn: SymbolicBCN, init: int):
+        """
+        :param bcn: the network
+        :param init: pos of corresponding vector of initial state
+        :return: a SymbolicLayers instance
+        """
+        self.bcn = bcn
+        self.init = init
+        layer = bcn.state_set([init])
+        self.layers = [layer]
+        self._seen = {layer: 0}
+        self.period = None  # set once a layer repeats an earlier one, after which the layers are periodic
+
+    @property
+    def T(self) -> int:
+        """
+        :return: the number of steps of the last layer
+        """
+        return len(self.layers) - 1
+
+    def extend(self) -> int:
+        """
+        Compute the next layer.
+        :return: the states reachable in exactly `T` steps, after incrementing `T`
+        """
+        layer = self.bcn.image(self.layers[-1])
+        self.layers.append(layer)
+        if self.period is None:
+            if layer in self._seen:
+                self.period = self.T - self._seen[layer]
+            else:
+                self._seen[layer] = self.T
+        return layer
+
+    def extend_to(self, T: int):
+        """
+        Compute the layers up to `T` steps.
+        """
+        while self.T < T:
+            self.extend()
+
+    def reaches(self, dest: int, T: int) -> bool:
+        """
+        :return: whether `dest` can be reached in exactly `T` steps
+        """
+        self.extend_to(T)
+        return self.bcn.contains(self.layers[T], dest)
+
+    def size(self, t: int) -> int:
+        """
+        :return: the number of states reachable in exactly `t <= T` steps
+        """
+        return self.bcn.bdd.count(self.layers[t], self.bcn.state_levels)
+
+    def min_time(self, dest: int) -> Optional[int]:
+        """
+        :param dest: pos of corresponding vector of destination state
+        :return: the least `T >= 1` such that `dest` can be reached in exactly `T` steps,
+            or None if it can never be reached
+        """
+        T = 1
+        while True:
+            if self.reaches(dest, T):
+                return T
+            if self.period is not None and T >= self.T:
+                return None
+            T += 1
+
+    def paths(self, dest: int, T: int) -> Iterator[Tuple[List[int], List[List[int]]]]:
+        """
+        Enumerate the control sequences steering the initial state to `dest` in exactly `T` steps,
+        in the same order as `ForwardLayers.paths`.
+        :param dest: pos of corresponding vector of destination state
+        :param T: the number of steps
+        :return: a generator of `(state sequence, input sequence)`, each item of the input sequence
+            being the list of the inputs leading to the next state
+        """
+        if not self.reaches(dest, T):
+            return
+        targets = [FALSE] * (T + 1)
+        targets[T] = self.bcn.state_set([dest])
+        for t in range(T - 1, -1, -1):
+            targets[t] = self.bcn.bdd.apply("AND", self.layers[t], self.bcn.preimage(targets[t + 1]))
+
+        seq = [self.init]
+        c_seq = []
+        stack = [iter(self.bcn.one_step_states(self.init, targets[1]).items())]
+        while stack:
+            t = len(stack)
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                seq.pop()
+                if c_seq:
+                    c_seq.pop()
+                continue
+            next_state, inputs = item
+            seq.append(next_state)
+            c_seq.append(inputs)
+            if t == T:
+                yield list(seq), list(c_seq)
+                seq.pop()
+                c_seq.pop()
+            else:
+                stack.append(iter(self.bcn.one_step_states(next_state, targets[t + 1]).items()))
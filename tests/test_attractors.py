@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from pybcn.attractors import *
+from pybcn.large_bcn import LargeBCN
+from pybcn.small_bcn import SmallBCN
+from tests.test_large_bcn import EXTERIOR
+
+
+def brute_force(next_states):
+    """
+    The attractor every state ends up in by iterating `next_states` until a state repeats.
+    """
+    res = []
+    for state in range(1, len(next_states) + 1):
+        seen = []
+        while state not in seen:
+            seen.append(state)
+            state = int(next_states[state - 1])
+        cycle = seen[seen.index(state):]
+        start = cycle.index(min(cycle))
+        res.append(cycle[start:] + cycle[:start])
+    return res
+
+
+class TestAttractors(unittest.TestCase):
+    def test_functional_graph(self):
+        next_states = [2, 3, 1, 3, 4, 6, 8, 7, 8, 6]
+        attractors = Attractors(next_states)
+        self.assertEqual(attractors.cycles, [[1, 2, 3], [6], [7, 8]])
+        self.assertEqual(attractors.fixed_points, [6])
+        self.assertEqual(attractors.attractor_of.tolist(), [0, 0, 0, 0, 0, 1, 2, 2, 2, 1])
+        self.assertEqual(attractors.basin_sizes.tolist(), [5, 2, 3])
+        self.assertEqual(attractors.basin(2).tolist(), [7, 8, 9])
+        self.assertEqual(attractors.depth, 2)
+
+    def test_random(self):
+        rng = np.random.default_rng(0)
+        for N in (1, 2, 17, 256):
+            next_states = rng.integers(1, N + 1, N)
+            attractors = Attractors(next_states)
+            expected = brute_force(next_states)
+            self.assertEqual([attractors.cycles[k] for k in attractors.attractor_of], expected)
+            self.assertEqual(attractors.basin_sizes.sum(), N)
+
+    def test_small_bcn(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        for inputs in range(1, bcn.M + 1):
+            attractors = bcn.attractors(inputs)
+            column = [bcn.next_state(state, inputs) for state in range(1, bcn.N + 1)]
+            self.assertEqual([attractors.cycles[k] for k in attractors.attractor_of], brute_force(column))
+
+    def test_block_attractors(self):
+        d = {**EXTERIOR, "x15": "x15 ^ x1", "x16": "x17 & u1", "x17": "!x16 | x15"}
+        small = SmallBCN(d)
+        large = LargeBCN(d)
+        large.partition()
+        for inputs in (1, 2, 7, 20, large.M):
+            expected = sorted(small.attractors(inputs).cycles, key=lambda cycle: cycle[0])
+            self.assertEqual(large.attractors(inputs), expected)
+
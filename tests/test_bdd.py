@@ -0,0 +1,85 @@
+import random
+import sys
+import threading
+import unittest
+from itertools import product
+
+from pybcn.bdd import *
+
+
+class TestBDD(unittest.TestCase):
+    def truth_table(self, bdd, u, levels):
+        return [bdd.evaluate(u, dict(zip(levels, values))) for values in product((0, 1), repeat=len(levels))]
+
+    def test_apply(self):
+        bdd = BDD()
+        x, y, z = bdd.var(0), bdd.var(1), bdd.var(2)
+        f = bdd.apply("OR", bdd.apply("AND", x, y), bdd.neg(z))
+        expected = [(a & b) | (1 ^ c) == 1 for a, b, c in product((0, 1), repeat=3)]
+        self.assertEqual(self.truth_table(bdd, f, [0, 1, 2]), expected)
+        self.assertEqual(bdd.apply("XOR", f, f), FALSE)
+        # equal functions are the same node
+        self.assertEqual(bdd.apply("AND", y, x), bdd.apply("AND", x, y))
+        self.assertEqual(bdd.neg(bdd.neg(f)), f)
+
+    def test_quantify(self):
+        bdd = BDD()
+        x, y, z = bdd.var(0), bdd.var(1), bdd.var(2)
+        f = bdd.apply("AND", bdd.apply("XOR", x, y), z)
+        self.assertEqual(bdd.exists(f, [1]), z)
+        self.assertEqual(bdd.and_exists(bdd.apply("XOR", x, y), z, [0, 1]), z)
+        self.assertEqual(bdd.exists(f, [0, 1, 2]), TRUE)
+        self.assertEqual(bdd.restrict(f, {0: 1, 2: 1}), bdd.neg(y))
+        self.assertEqual(bdd.restrict(f, {2: 0}), FALSE)
+
+    def test_rename(self):
+        bdd = BDD()
+        f = bdd.apply("OR", bdd.var(0), bdd.neg(bdd.var(2)))
+        self.assertEqual(bdd.rename(f, {0: 1, 2: 3}), bdd.apply("OR", bdd.var(1), bdd.neg(bdd.var(3))))
+        self.assertRaises(AssertionError, bdd.rename, f, {0: 5})
+
+    def test_assignments(self):
+        bdd = BDD()
+        f = bdd.apply("OR", bdd.var(0), bdd.var(2))
+        values = list(bdd.assignments(f, [0, 2, 4]))
+        # positions ascending, the first variable being the most significant and 1 coming first
+        self.assertEqual(values, [
+            {0: 1, 2: 1, 4: 1}, {0: 1, 2: 1, 4: 0}, {0: 1, 2: 0, 4: 1}, {0: 1, 2: 0, 4: 0},
+            {0: 0, 2: 1, 4: 1}, {0: 0, 2: 1, 4: 0},
+        ])
+        self.assertEqual(bdd.pick(bdd.neg(bdd.var(0)), [0]), {0: 0})
+        self.assertEqual(list(bdd.assignments(FALSE, [0])), [])
+        self.assertEqual(bdd.cube({0: 1, 4: 0}), bdd.apply("AND", bdd.var(0), bdd.neg(bdd.var(4))))
+        self.assertEqual(bdd.count(f, [0, 2, 4]), 6)
+        self.assertEqual(bdd.count(bdd.var(2), [0, 2, 4]), 4)
+        self.assertEqual(bdd.count(TRUE, [0, 2]), 4)
+        self.assertEqual(bdd.count(FALSE, [0, 2]), 0)
+
+    def test_threads(self):
+        # switch threads as often as possible so that they race to create the same nodes
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(10):
+                bdd = BDD()
+                barrier = threading.Barrier(16)
+                res = [None] * 16
+
+                def build(i):
+                    rng = random.Random(i % 2)
+                    barrier.wait()
+                    u = TRUE
+                    for _ in range(200):
+                        u = bdd.apply(rng.choice(["AND", "OR", "XOR"]), u, bdd.var(rng.randrange(10)))
+                    res[i] = u
+
+                threads = [threading.Thread(target=build, args=(i,)) for i in range(16)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # no node was created twice, so the threads building the same function got the same node
+                self.assertEqual(len(bdd), len(bdd._unique) + 2)
+                self.assertEqual(res, res[:2] * 8)
+        finally:
+            sys.setswitchinterval(interval)
@@ -0,0 +1,42 @@
+import unittest
+
+from benchmarks.networks import structured_network
+from benchmarks.run import compare, run
+from pybcn.large_bcn import LargeBCN
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_structured_network(self):
+        d = structured_network((5, 3, 2), inputs=4, chains=2, chain_depth=3, seed=2)
+        self.assertEqual(len(d), 16)
+        bcn = LargeBCN(d)
+        self.assertEqual(bcn.m, 4)
+        bcn.partition()
+        self.assertEqual(sorted(block.n for block in bcn.blocks), [1] * 6 + [2, 3, 5])
+        # the first component is the only source block
+        self.assertEqual([bcn.blocks[k].n for k in bcn.A], [5])
+        self.assertEqual(d, structured_network((5, 3, 2), inputs=4, chains=2, chain_depth=3, seed=2))
+
+    def test_compare(self):
+        class Suite:
+            params = [[1, 2], ["a"]]
+
+            def setup(self, k, s):
+                self.calls = []
+
+            def time_f(self, k, s):
+                self.calls.append(k)
+
+            def track_g(self, k, s):
+                return k / 10
+
+        results = {"Suite.time_f": run(Suite, "time_f", 3)}
+        self.assertEqual(list(results["Suite.time_f"]), ["1, a", "2, a"])
+        self.assertEqual(results["Suite.time_f"]["1, a"]["repeat"], 3)
+        self.assertEqual(run(Suite, "track_g", 2)["2, a"], {"min": 0.2, "median": 0.2, "max": 0.2, "repeat": 2})
+
+        base = {"Suite.time_f": {"1, a": {"median": 1.0}, "2, a": {"median": 1.0}}}
+        results = {"Suite.time_f": {"1, a": {"median": 1.1}, "2, a": {"median": 1.5}, "3, a": {"median": 9.0}}}
+        self.assertEqual(compare(base, results, 1.2), [
+            ("Suite.time_f", "1, a", 1.0, 1.1, 1.1, False), ("Suite.time_f", "2, a", 1.0, 1.5, 1.5, True),
+        ])
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from pybcn.cache import *
+from pybcn.large_bcn import LargeBCN
+from pybcn.small_bcn import SmallBCN
+
+
+class TestASSRCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ASSRCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key(self):
+        bcn = SmallBCN({"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"})
+        same = SmallBCN({"x1": "(x2)|x3", "x2": "x1&u1", "x3": "(u1 | x2) & !x1"})
+        reordered = SmallBCN({"x2": "x1 & u1", "x1": "x2 | x3", "x3": "(u1 | x2) & (!x1)"})
+        self.assertEqual(self.cache.key(bcn), self.cache.key(same))
+        self.assertNotEqual(self.cache.key(bcn), self.cache.key(reordered))
+
+    def test_get_put(self):
+        d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
+        bcn = SmallBCN(d, cache=self.cache)
+        key = self.cache.key(bcn)
+        self.assertEqual(self.cache.get(key, bcn).tolist(), bcn.L.tolist())
+        cached = SmallBCN(d, cache=self.cache)
+        self.assertIsInstance(cached.L, np.memmap)
+        self.assertEqual(cached.L.tolist(), bcn.L.tolist())
+        self.assertIsNone(self.cache.get("0" * 64, bcn))
+
+    def test_evict(self):
+        bcns = [SmallBCN({"x1": f"x2 & u{i}", "x2": "x1"}) for i in range(3)]
+        now = time.time()
+        for i, bcn in enumerate(bcns):
+            self.cache.put(self.cache.key(bcn), bcn)
+            # set distinct last-used times explicitly, file mtimes may have a coarse resolution
+            t = now - 100 + i
+            os.utime(self.cache._path(self.cache.key(bcn), "npy"), (t, t))
+        size = self.cache.size()
+        # use the first entry so that the second one is the least recently used
+        self.cache.get(self.cache.key(bcns[0]), bcns[0])
+        self.cache.max_bytes = size * 2 // 3 + 1
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get(self.cache.key(bcns[0]), bcns[0]))
+        self.assertIsNone(self.cache.get(self.cache.key(bcns[1]), bcns[1]))
+        self.assertIsNotNone(self.cache.get(self.cache.key(bcns[2]), bcns[2]))
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_partition(self):
+        d = {"x1": "u1 & (x3 | x6)", "x2": "x1 | (x3 & x6)", "x3": "(u1 & u2) & (!x5)", "x4": "(!x7) & x3 & x2",
+             "x5": "x1 | (!x6)", "x6": "u3 & (!x7)", "x7": "x4", "x8": "x3", "x9": "x4 & x8"}
+        expected = LargeBCN(d)
+        expected.partition()
+        for _ in range(2):
+            bcn = LargeBCN(d)
+            bcn.partition(cache=self.cache)
+            self.assertEqual(len(self.cache.entries()), len(expected.blocks))
+            for block, expected_block in zip(bcn.blocks, expected.blocks):
+                self.assertEqual(block.input_variables, expected_block.input_variables)
+                self.assertEqual(block.L.tolist(), expected_block.L.tolist())
@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import unittest
+
+from pybcn.jobs import ControlJob, Progress
+from pybcn.large_bcn import LargeBCN
+from pybcn.logical_vector import LogicalVector
+from tests.test_large_bcn import EXAMPLE, EXAMPLE_DEST, EXAMPLE_INIT, EXAMPLE_RESULT, UNREACHABLE, normalize
+
+
+class TestControlJob(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.bcn = LargeBCN(EXAMPLE)
+        self.bcn.partition()
+        # a query that never ends without `max_T`, with exponentially many combinations at every horizon
+        self.unreachable = LargeBCN(UNREACHABLE)
+        self.unreachable.partition()
+        self.pair = LogicalVector.from_states([0, 0]).pos, LogicalVector.from_states([1, 1]).pos
+
+    async def test_result(self):
+        reported = []
+        job = ControlJob(self.bcn, EXAMPLE_INIT, EXAMPLE_DEST, progress=reported.append)
+        progress = [p async for p in job]
+        T, res = await job
+        self.assertEqual((T, normalize(res)), (4, EXAMPLE_RESULT))
+        self.assertEqual([p.T for p in progress], [1, 2, 3, 4])
+        self.assertEqual(reported, progress)
+        self.assertIsInstance(progress[-1], Progress)
+        self.assertEqual(progress[-1].states_explored, sum(block.states_expanded for block in job.stats.blocks.values()))
+        self.assertEqual(progress[-1].combinations, 1)
+        self.assertTrue(job.done())
+
+        T, res = await self.bcn.optimal_time_control_async(EXAMPLE_INIT, EXAMPLE_DEST)
+        self.assertEqual((T, normalize(res)), (4, EXAMPLE_RESULT))
+
+    async def test_max_T(self):
+        job = ControlJob(self.unreachable, *self.pair, max_T=6)
+        self.assertEqual([p.T for p in [p async for p in job]], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(await job, (sys.maxsize, {}))
+
+    async def test_timeout(self):
+        job = ControlJob(self.unreachable, *self.pair, timeout=0.2)
+        with self.assertRaises(asyncio.TimeoutError):
+            await job
+        # the query stops in its thread as well
+        async for _ in job:
+            pass
+        self.assertTrue(job.done())
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.unreachable.optimal_time_control_async(*self.pair, timeout=0.1)
+
+    async def test_cancel(self):
+        job = ControlJob(self.unreachable, *self.pair)
+        async for progress in job:
+            if progress.T == 3:
+                job.cancel()
+        self.assertTrue(job.done())
+        with self.assertRaises(asyncio.CancelledError):
+            await job
+
+        # cancelling the task awaiting the job cancels the query
+        job = ControlJob(self.unreachable, *self.pair)
+        task = asyncio.ensure_future(job.result())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        async for _ in job:
+            pass
+        self.assertTrue(job.done())
+
+    async def test_event_loop(self):
+        # the event loop goes on while the query runs in its thread
+        ticks = 0
+        job = ControlJob(self.unreachable, *self.pair, max_T=12)
+        while not job.done():
+            ticks += 1
+            await asyncio.sleep(0.001)
+        self.assertGreater(ticks, 1)
+        self.assertEqual(await job, (sys.maxsize, {}))
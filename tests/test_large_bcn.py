@@ -0,0 +1,512 @@
+import copy
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from itertools import product
+from unittest import mock
+
+import numpy as np
+import rustworkx as rx
+
+import pybcn.large_bcn
+from pybcn.large_bcn import *
+from pybcn.logical_vector import LogicalVector
+from pybcn.stats import SolverStats
+from pybcn.small_bcn import SmallBCN
+from pybcn.symbolic_bcn import SymbolicBCN
+
+EXAMPLE = {
+    "x1": "u1 & (x3 | x6)", "x2": "x1 | (x3 & x6)", "x3": "(u1 & u2) & (!x5)", "x4": "(!x7) & x3 & x2",
+    "x5": "x1 | (!x6)", "x6": "u3 & (!x7)", "x7": "x4", "x8": "x3", "x9": "x4", "x10": "x9", "x11": "x10",
+    "x12": "x11 & x4", "x13": "x9", "x14": "x9", "x15": "(x8 | x12) & (x4 & x11 & x14)", "x16": "x15",
+    "x17": "x16", "x18": "x17", "x19": "x18", "x20": "x15", "x21": "x23", "x22": "x21", "x23": "x20",
+    "x24": "x22", "x25": "x23", "x26": "!x25", "x27": "!x26", "x28": "x29", "x29": "x30", "x30": "x34",
+    "x31": "x13 | x35", "x32": "x31", "x33": "x32", "x34": "x33", "x35": "x20 & x23", "x36": "x34",
+    "x37": "x36 & x24",
+}
+
+EXAMPLE_INIT = 130459631617
+EXAMPLE_DEST = 9394935877
+# x2 can never be set once x1 is 0, the source block, and x1 reaches 1 whenever u1 is 1
+UNREACHABLE = {"x1": "u1", "x2": "x2 & x1"}
+# the result of `optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)`, block -> [state sequence, input sequence]
+EXAMPLE_RESULT = {
+    30: [[122, 64, 89, 12, 17], [3, 1, 1, 1]], 29: [[2, 2, 2, 1, 2], [2, 2, 1, 2]],
+    28: [[1, 2, 2, 2, 1], [2, 2, 2, 1]], 27: [[1, 1, 2, 2, 2], [1, 2, 2, 2]], 26: [[1, 1, 1, 2, 2], [1, 1, 2, 2]],
+    25: [[1, 2, 2, 2, 2], [2, 2, 2, 3]], 24: [[1, 1, 2, 2, 2], [1, 2, 2, 2]], 23: [[1, 1, 2, 2, 2], [1, 2, 2, 2]],
+    22: [[1, 2, 2, 2, 2], [21, 29, 30, 12]], 21: [[1, 1, 2, 2, 2], [1, 2, 2, 2]], 20: [[1, 1, 1, 2, 2], [1, 1, 2, 2]],
+    19: [[1, 1, 1, 1, 2], [1, 1, 1, 2]], 18: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 17: [[1, 1, 2, 2, 2], [1, 2, 2, 2]],
+    16: [[1, 1, 1, 2, 2], [1, 1, 2, 2]], 15: [[1, 1, 1, 1, 2], [1, 1, 1, 2]], 14: [[1, 1, 1, 1, 1], [1, 1, 1, 1]],
+    13: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 12: [[1, 1, 1, 1, 2], [1, 1, 1, 2]], 11: [[1, 2, 2, 2, 2], [1, 1, 1, 1]],
+    10: [[1, 2, 1, 1, 1], [1, 2, 2, 2]], 9: [[1, 1, 1, 2, 2], [1, 1, 3, 4]], 8: [[1, 1, 1, 1, 2], [1, 1, 3, 4]],
+    7: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 6: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 5: [[1, 1, 1, 1, 1], [1, 1, 1, 1]],
+    4: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 3: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 2: [[1, 1, 1, 1, 1], [1, 1, 1, 1]],
+    1: [[1, 1, 1, 1, 1], [1, 1, 1, 1]], 0: [[1, 1, 1, 1, 1], [1, 1, 1, 1]],
+}
+
+# the first 14 variables of the example, with exterior inputs in blocks downstream of x1..x7
+EXTERIOR = {
+    "x1": "u1 & (x3 | x6)", "x2": "x1 | (x3 & x6)", "x3": "(u1 & u2) & (!x5)", "x4": "(!x7) & x3 & x2",
+    "x5": "x1 | (!x6)", "x6": "u3 & (!x7)", "x7": "x4", "x8": "x3 | u4", "x9": "x4 ^ x8", "x10": "x9 ^ u5",
+    "x11": "x10", "x12": "x11 & x4 | (x12 & u4)", "x13": "x9 & u4", "x14": "x9 | x13",
+}
+
+
+def step(d, state, inputs):
+    """
+    Evaluate every update function of `d` on the state list `state` and the input values `inputs`.
+    """
+    env = dict(zip(d, state))
+    env.update(inputs)
+    return [eval(expr.replace("!", "1 ^ "), {}, env) & 1 for expr in d.values()]
+
+
+def control_block_brute_force(bcn, k, T, seq_comb, init, dest):
+    """
+    `LargeBCN._control_block` simulating every sequence of exterior inputs.
+    """
+    block = bcn.blocks[k]
+    ex_inputs_num = 2 ** len(block.exterior_inputs)
+    for self_control_seq in product(*([range(1, ex_inputs_num + 1)] * T)):
+        cur_state = init
+        cur_seq = [[cur_state], []]
+        for t in range(T):
+            inputs = bcn._block_inputs(k, t, seq_comb, self_control_seq[t])
+            next_state = block.next_state(cur_state, inputs)
+            cur_seq[0].append(next_state)
+            cur_seq[1].append(inputs)
+            cur_state = next_state
+        if cur_state == dest:
+            return cur_seq
+    return None
+
+
+def reachable_pairs(d, count, seed=0):
+    """
+    `(init, dest)` positions where `dest` is reached from a random `init` within 4 random steps, and that number of steps.
+    """
+    rng = random.Random(seed)
+    inputs = sorted({v for expr in d.values() for v in expr.replace("(", " ").replace(")", " ").replace("!", " ").split()
+                     if v.startswith("u")})
+    res = []
+    for _ in range(count):
+        init = [rng.randint(0, 1) for _ in d]
+        state = init
+        steps = rng.randint(1, 4)
+        for _ in range(steps):
+            state = step(d, state, {u: rng.randint(0, 1) for u in inputs})
+        res.append(((LogicalVector.from_states(init).pos, LogicalVector.from_states(state).pos), steps))
+    return res
+
+
+def normalize(res):
+    return {k: [list(seq), list(c_seq)] for k, (seq, c_seq) in res.items()}
+
+
+def iterate(res):
+    """
+    The former `LargeBCN.iterate`, deep-copying every combination.
+    """
+    for i in product(*res.values()):
+        ret = dict(zip(res.keys(), [[ii[0], None] for ii in i]))
+        for j in product(*[product(*k[1]) for k in i]):
+            for idx, key in enumerate(ret.keys()):
+                ret[key][1] = j[idx]
+            yield copy.deepcopy(ret)
+
+
+RES = {
+    3: [([1, 2, 3], [[1, 2], [3]]), ([1, 4, 3], [[4], [1, 2, 3]])],
+    5: [([2, 2, 1], [[1], [1, 2]])],
+    0: [([7, 8, 8], [[2, 3], [1]]), ([7, 7, 8], [[1], [4]])],
+}
+
+
+class TestCombinations(unittest.TestCase):
+    def test_iter(self):
+        self.assertEqual(list(Combinations(RES)), list(iterate(RES)))
+        self.assertEqual(list(Combinations({3: RES[3]})), list(iterate({3: RES[3]})))
+        self.assertEqual(list(Combinations({3: [], 5: RES[5]})), [])
+        self.assertEqual(list(Combinations({})), [])
+        # the control sequences of the blocks pulled from generators as they are reached
+        combinations = Combinations({k: iter(paths) for k, paths in RES.items()})
+        self.assertEqual(next(iter(combinations)), list(iterate(RES))[0])
+        self.assertEqual([combinations.pulled(k) for k in RES], [1] * len(RES))
+        self.assertEqual(list(Combinations({k: iter(paths) for k, paths in RES.items()})), list(iterate(RES)))
+
+    def test_skip(self):
+        expected = list(iterate(RES))
+        combinations = Combinations(RES)
+        res = []
+        for combination in combinations:
+            res.append(combination)
+            if combination[3] == [[1, 2, 3], (1, 3)]:
+                combinations.skip([3])
+        # the combinations right after a skipped one with the same control sequence and inputs of block 3 are left out
+        kept = []
+        skipping = False
+        for c in expected:
+            if skipping and c[3] == [[1, 2, 3], (1, 3)]:
+                continue
+            skipping = c[3] == [[1, 2, 3], (1, 3)]
+            kept.append(c)
+        self.assertEqual(res, kept)
+        self.assertLess(len(res), len(expected))
+        combinations = Combinations(RES)
+        self.assertEqual([c for c in combinations if combinations.skip([]) is None], expected[:1])
+
+
+class TestLargeBCN(unittest.TestCase):
+    def test_optimal_time_control(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        T, res = bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)
+        self.assertEqual(T, 4)
+        self.assertEqual(normalize(res), EXAMPLE_RESULT)
+
+    def test_import(self):
+        # the modules only partitioning in processes, drawing or the ply lexer and parser need are imported on first use
+        lazy = ["ply.yacc", "rustworkx.visualization", "multiprocessing", "concurrent.futures", "asyncio"]
+        code = f"import sys, pybcn.large_bcn; print([m for m in {lazy!r} if m in sys.modules])"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), "[]")
+
+    def test_iter_optimal_controls(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        solutions = list(bcn.iter_optimal_controls(EXAMPLE_INIT, EXAMPLE_DEST))
+        self.assertEqual(len(solutions), 4)
+        self.assertEqual(normalize(solutions[0][1]), EXAMPLE_RESULT)
+        self.assertEqual(len({str(normalize(res)) for _, res in solutions}), 4)
+        for T, res in solutions:
+            self.assertEqual(T, 4)
+            self.assertEqual(bcn.combine([res[k][0][0] for k in range(len(bcn.blocks))]), EXAMPLE_INIT)
+            self.assertEqual(bcn.combine([res[k][0][T] for k in range(len(bcn.blocks))]), EXAMPLE_DEST)
+        self.assertEqual(list(bcn.iter_optimal_controls(EXAMPLE_INIT, EXAMPLE_DEST, limit=2)), solutions[:2])
+        self.assertEqual(list(bcn.iter_optimal_controls(EXAMPLE_INIT, EXAMPLE_DEST, limit=0)), [])
+
+    def test_max_T(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        self.assertEqual(bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST, max_T=3), (sys.maxsize, {}))
+        T, res = bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST, max_T=4)
+        self.assertEqual((T, normalize(res)), (4, EXAMPLE_RESULT))
+
+        # the source block reaches the destination whenever u1 is 1, only the downstream block fails
+        bcn = LargeBCN(UNREACHABLE)
+        bcn.partition()
+        init, dest = LogicalVector.from_states([0, 0]).pos, LogicalVector.from_states([1, 1]).pos
+        solver_stats = SolverStats()
+        self.assertEqual(bcn.optimal_time_control(init, dest, solver_stats, max_T=8), (sys.maxsize, {}))
+        self.assertEqual(solver_stats.T, 8)
+        self.assertEqual(list(bcn.iter_optimal_controls(init, dest, max_T=8)), [])
+
+        # the source blocks cannot reach their destinations, each one alone or both at the same time
+        for d, dest in (({"x1": "x1 & u1", "x2": "x2 ^ x1"}, [1, 0]), ({"x1": "!x1", "x2": "!x2", "x3": "x1 & x2 & u1"}, [1, 0, 0])):
+            bcn = LargeBCN(d)
+            bcn.partition()
+            solver_stats = SolverStats()
+            init = LogicalVector.from_states([0] * len(d)).pos
+            T, res = bcn.optimal_time_control(init, LogicalVector.from_states(dest).pos, solver_stats)
+            self.assertEqual((T, res), (sys.maxsize, {}))
+            self.assertLessEqual(solver_stats.T, 6)
+
+    def test_solve_many(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        pairs = reachable_pairs(EXAMPLE, 12) * 4
+        serial = [bcn.optimal_time_control(*pair) for pair, _ in pairs]
+        for (T, _), (_, steps) in zip(serial, pairs):
+            self.assertLessEqual(T, steps)
+        for _ in range(3):
+            self.assertEqual(bcn.solve_many([pair for pair, _ in pairs], workers=8), serial)
+        self.assertEqual(bcn.solve_many([pair for pair, _ in pairs[:4]], workers=2, processes=True), serial[:4])
+        self.assertEqual(bcn.solve_many([(EXAMPLE_INIT, EXAMPLE_DEST)])[0][1], bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)[1])
+
+    def test_simulate_batch(self):
+        for d in (EXAMPLE, EXTERIOR):
+            bcn = LargeBCN(d)
+            bcn.partition()
+            rng = random.Random(1)
+            inits = [[rng.randint(0, 1) for _ in d] for _ in range(20)]
+            inputs = [[[rng.randint(0, 1) for _ in bcn.input_variables] for _ in range(6)] for _ in range(20)]
+            res = bcn.simulate_batch(
+                [LogicalVector.from_states(init).pos for init in inits],
+                [[LogicalVector.from_states(u).pos for u in seq] for seq in inputs],
+            )
+            self.assertEqual(res.shape, (20, 7))
+            for k, (init, seq) in enumerate(zip(inits, inputs)):
+                state = init
+                self.assertEqual(int(res[k, 0]), LogicalVector.from_states(state).pos)
+                for t, u in enumerate(seq):
+                    state = step(d, state, dict(zip(bcn.input_variables, u)))
+                    self.assertEqual(int(res[k, t + 1]), LogicalVector.from_states(state).pos)
+            steps = bcn.simulate_batch(res[:, 0], [LogicalVector.from_states(u).pos for u in inputs[0]], stream=True)
+            self.assertEqual([int(states[0]) for states in steps], res[0].tolist())
+
+    def test_simulate_batch_wide(self):
+        # 70 variables, the positions of the states do not fit in int64
+        d = {}
+        for i in range(35):
+            d[f"a{i}"] = f"b{i} ^ u{i % 3 + 1}"
+            d[f"b{i}"] = f"a{i} & a{i - 1}" if i else "a0"
+        bcn = LargeBCN(d)
+        bcn.partition()
+        rng = random.Random(0)
+        inits = [[rng.randint(0, 1) for _ in d] for _ in range(5)]
+        inits[0] = [0] * len(d)
+        inputs = [[[rng.randint(0, 1) for _ in bcn.input_variables] for _ in range(4)] for _ in range(5)]
+        res = bcn.simulate_batch(
+            [LogicalVector.from_states(init).pos for init in inits],
+            [[LogicalVector.from_states(u).pos for u in seq] for seq in inputs],
+        )
+        self.assertEqual(res[0, 0], 2 ** 70)
+        for k, (init, seq) in enumerate(zip(inits, inputs)):
+            state = init
+            for t, u in enumerate(seq):
+                state = step(d, state, dict(zip(bcn.input_variables, u)))
+                self.assertEqual(res[k, t + 1], LogicalVector.from_states(state).pos)
+        steps = bcn.simulate_batch(res[:, 0], [LogicalVector.from_states(u).pos for u in inputs[0]], stream=True)
+        self.assertEqual([states[0] for states in steps], res[0].tolist())
+
+    def test_symbolic_blocks(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition(symbolic_min_bits=5)
+        self.assertTrue(any(isinstance(block, SymbolicBCN) for block in bcn.blocks))
+        self.assertTrue(any(isinstance(block, SmallBCN) for block in bcn.blocks))
+        T, res = bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)
+        self.assertEqual(T, 4)
+        self.assertEqual(normalize(res), EXAMPLE_RESULT)
+
+    def test_symbolic_partition(self):
+        # a ring of 30 variables, too large for an ASSR, driving a small block
+        d = {"x1": "x30 ^ u1", **{f"x{i}": f"x{i - 1}" for i in range(2, 31)}, "x31": "x31 ^ x1 & u2"}
+        bcn = LargeBCN(d)
+        bcn.partition()
+        ring, other = bcn.A[0], bcn.B[0]
+        self.assertIsInstance(bcn.blocks[ring], SymbolicBCN)
+        self.assertIsInstance(bcn.blocks[other], SmallBCN)
+        init = [0] * 31
+        dest = [1, 1, 0] + [0] * 27 + [1]
+        T, res = bcn.optimal_time_control(LogicalVector.from_states(init).pos, LogicalVector.from_states(dest).pos)
+        self.assertEqual(T, 2)
+        # replay the control sequence on the whole network
+        state = init
+        block = bcn.blocks[other]
+        for t in range(T):
+            values = dict(zip(block.input_variables, LogicalVector(res[other][1][t], block.M).to_list()))
+            state = step(d, state, {"u1": LogicalVector(res[ring][1][t], 2).to_list()[0], "u2": values["u2"]})
+        self.assertEqual(state, dest)
+
+    def test_update_expression(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        before = list(bcn.blocks)
+        rng = np.random.default_rng(0)
+        inits = rng.integers(1, bcn.N + 1, 50, dtype=np.int64)
+        for var, expr in (("x7", "0"), ("x20", "x15 | u4"), ("x1", "u1 & (x3 | x6)")):
+            d = {**bcn.d, var: expr}
+            bcn.update_expression(var, expr)
+            self.assertEqual(bcn.d, d)
+            fresh = LargeBCN(d)
+            fresh.partition()
+            self.assertEqual(bcn.input_variables, fresh.input_variables)
+            self.assertEqual(
+                sorted(sorted(block.variables) for block in bcn.blocks), sorted(sorted(block.variables) for block in fresh.blocks)
+            )
+            inputs = rng.integers(1, bcn.M + 1, (50, 5))
+            np.testing.assert_array_equal(bcn.simulate_batch(inits, inputs), fresh.simulate_batch(inits, inputs))
+            if var == "x7":
+                for pair, _ in reachable_pairs(d, 5):
+                    self.assertEqual(bcn.optimal_time_control(*pair)[0], fresh.optimal_time_control(*pair)[0])
+        self.assertEqual(EXAMPLE["x7"], "x4")
+        # knocking x7 out splits the block of x1..x7, the blocks of the other variables but x20 are reused
+        changed = {f"x{i}" for i in range(1, 8)} | {"x20"}
+        for block in bcn.blocks:
+            self.assertEqual(any(block is b for b in before), not set(block.variables) & changed, block.variables)
+        # the dependency graph is kept up to date before partitioning as well
+        unpartitioned = LargeBCN(EXAMPLE)
+        unpartitioned.update_expression("x7", "0")
+        unpartitioned.partition()
+        fresh = LargeBCN({**EXAMPLE, "x7": "0"})
+        fresh.partition()
+        self.assertEqual([block.d for block in unpartitioned.blocks], [block.d for block in fresh.blocks])
+
+    def test_save_load(self):
+        bcn = LargeBCN(EXAMPLE, [1, 0] * 18 + [1])
+        bcn.partition(symbolic_min_bits=5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "example.snapshot")
+            bcn.save(path)
+            for mmap in (True, False):
+                loaded = LargeBCN.load(path, mmap=mmap)
+                self.assertEqual(loaded.d, bcn.d)
+                self.assertEqual(loaded.states, bcn.states)
+                self.assertEqual(loaded.input_variables, bcn.input_variables)
+                self.assertEqual((loaded.A, loaded.B, loaded.pred_list), (bcn.A, bcn.B, bcn.pred_list))
+                self.assertEqual(loaded.source_ancestors, bcn.source_ancestors)
+                self.assertEqual(sorted(loaded.condensation_graph.edge_list()), sorted(bcn.condensation_graph.edge_list()))
+                for block, expected in zip(loaded.blocks, bcn.blocks):
+                    self.assertIs(type(block), type(expected))
+                    self.assertEqual(block.variables, expected.variables)
+                    self.assertEqual(block.interior_inputs, expected.interior_inputs)
+                    self.assertEqual(block.exterior_inputs, expected.exterior_inputs)
+                    if isinstance(block, SmallBCN):
+                        self.assertEqual(block.L.dtype, expected.L.dtype)
+                        np.testing.assert_array_equal(block.L, expected.L)
+                        self.assertEqual(isinstance(block.L.base, np.memmap), mmap)
+                T, res = loaded.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)
+                self.assertEqual(T, 4)
+                self.assertEqual(normalize(res), EXAMPLE_RESULT)
+            # the processes of solve_many load the snapshot instead of partitioning the network
+            pairs = [pair for pair, _ in reachable_pairs(EXAMPLE, 12)[:3]]
+            self.assertEqual(
+                bcn.solve_many(pairs, workers=2, processes=True, snapshot=path),
+                [bcn.optimal_time_control(*pair) for pair in pairs],
+            )
+
+            with open(path, "r+b") as f:
+                f.seek(len(SNAPSHOT_MAGIC))
+                f.write((SNAPSHOT_VERSION + 1).to_bytes(4, "little"))
+            self.assertRaises(ValueError, LargeBCN.load, path)
+            with open(path, "wb") as f:
+                f.write(b"x1, u1\n")
+            self.assertRaises(ValueError, LargeBCN.load, path)
+        self.assertRaises(AssertionError, LargeBCN(EXAMPLE).save, path)
+
+    def test_control_block(self):
+        rng = random.Random(0)
+        bcn = LargeBCN(EXTERIOR)
+        bcn.partition()
+        self.assertTrue(any(bcn.blocks[k].exterior_inputs for k in bcn.B))
+        symbolic = LargeBCN(EXTERIOR)
+        symbolic.partition(symbolic_min_bits=2)
+        self.assertTrue(all(isinstance(block, SymbolicBCN) for block in symbolic.blocks))
+        found = 0
+        for _ in range(40):
+            T = rng.randint(1, 4)
+            inits = bcn.project(rng.randint(1, bcn.N))
+            dests = bcn.project(rng.randint(1, bcn.N))
+            seq_comb = {}
+            for k in bcn.A:
+                block = bcn.blocks[k]
+                seq, c_seq = [inits[k]], []
+                for _ in range(T):
+                    c_seq.append(rng.randint(1, block.M))
+                    seq.append(block.next_state(seq[-1], c_seq[-1]))
+                seq_comb[k] = [seq, tuple(c_seq)]
+            for k in bcn.B:
+                block = bcn.blocks[k]
+                if rng.random() < 0.8:
+                    # a destination reachable with some exterior inputs
+                    state = inits[k]
+                    for t in range(T):
+                        exterior = rng.randint(1, 2 ** len(block.exterior_inputs))
+                        state = block.next_state(state, bcn._block_inputs(k, t, seq_comb, exterior))
+                    dests[k] = state
+                cur_seq = bcn._control_block(k, T, seq_comb, inits[k], dests[k])
+                self.assertEqual(cur_seq, control_block_brute_force(bcn, k, T, seq_comb, inits[k], dests[k]))
+                self.assertEqual(symbolic._control_block(k, T, seq_comb, inits[k], dests[k]), cur_seq)
+                if cur_seq is None:
+                    break
+                found += 1
+                seq_comb[k] = cur_seq
+        self.assertGreater(found, 100)
+
+    def test_control_block_full_width(self):
+        # the block of y1 has exactly 8 and 16 input bits, its last input position is M
+        for n in (8, 16):
+            bcn = LargeBCN({"x1": "u1", "y1": "x1 | " + " | ".join(f"u{i}" for i in range(2, n + 1))})
+            bcn.partition()
+            (k,) = bcn.B
+            self.assertEqual(bcn.blocks[k].M, 2 ** n)
+            seq_comb = {bcn.A[0]: [[1, 2, 2], (2, 2)]}
+            cur_seq = bcn._control_block(k, 2, seq_comb, 1, 2)
+            self.assertEqual(cur_seq, [[1, 1, 2], [1, 2 ** n]])
+            self.assertEqual(cur_seq, control_block_brute_force(bcn, k, 2, seq_comb, 1, 2))
+            self.assertEqual(bcn.optimal_time_control(1, bcn.N)[1][k], [[1, 1, 2], [1, 2 ** n]])
+
+    def test_projection(self):
+        rng = random.Random(0)
+        bcn = LargeBCN(EXTERIOR)
+        bcn.partition()
+        for k in bcn.B:
+            block = bcn.blocks[k]
+            preds = [bcn.blocks[pred] for pred in bcn.pred_list[k]]
+            for _ in range(20):
+                states = [rng.randint(1, pred.N) for pred in preds]
+                inputs = [rng.randint(1, pred.M) for pred in preds]
+                exterior = rng.randint(1, 2 ** len(block.exterior_inputs))
+                # the former projection through the states of the blocks
+                projection = {}
+                for pred, state, i in zip(preds, states, inputs):
+                    pred.set_states_i(state)
+                    projection.update(pred.get_states("dict"))
+                    projection.update(pred.get_inputs(i))
+                if block.exterior_inputs:
+                    values = LogicalVector(exterior, 2 ** len(block.exterior_inputs)).to_list()
+                    projection.update(dict(zip(block.exterior_inputs, values)))
+                self.assertEqual(bcn.projections[k].inputs(states, inputs, exterior), block.get_inputs(projection))
+
+    def test_project(self):
+        rng = random.Random(0)
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        for _ in range(20):
+            pos = rng.randint(1, bcn.N)
+            states = dict(zip(bcn.variables, LogicalVector(pos, bcn.N).to_list()))
+            expected = [LogicalVector.from_states([states[var] for var in block.variables]).pos for block in bcn.blocks]
+            self.assertEqual(bcn.project(pos), expected)
+            self.assertEqual(bcn.combine(expected), pos)
+
+    def test_source_ancestors(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        for k in bcn.B:
+            ancestors = rx.ancestors(bcn.condensation_graph, k)
+            self.assertEqual(bcn.source_ancestors[k], [a for a in bcn.A if a in ancestors])
+
+    def test_min_time_lower_bound(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition()
+        layers = bcn.controllability(EXAMPLE_DEST)
+        self.assertEqual(list(layers), bcn.A)
+        self.assertLessEqual(bcn.min_time_lower_bound(EXAMPLE_INIT, EXAMPLE_DEST), 4)
+        dests = bcn.project(EXAMPLE_DEST)
+        for k in bcn.A:
+            self.assertEqual(layers[k].dest, dests[k])
+
+    def test_partition_workers(self):
+        serial = LargeBCN(EXAMPLE)
+        serial.partition()
+        parallel = LargeBCN(EXAMPLE)
+        with mock.patch.object(pybcn.large_bcn, "PARALLEL_MIN_BITS", 4):
+            parallel.partition(workers=2)
+        self.assertEqual(parallel.A, serial.A)
+        self.assertEqual(parallel.B, serial.B)
+        self.assertEqual(parallel.pred_list, serial.pred_list)
+        self.assertEqual(len(parallel.blocks), len(serial.blocks))
+        for block, expected in zip(parallel.blocks, serial.blocks):
+            self.assertEqual(block.variables, expected.variables)
+            self.assertEqual(block.input_variables, expected.input_variables)
+            self.assertEqual(block.interior_inputs, expected.interior_inputs)
+            self.assertEqual(block.exterior_inputs, expected.exterior_inputs)
+            self.assertEqual(block.L.dtype, expected.L.dtype)
+            self.assertEqual(block.L.tolist(), expected.L.tolist())
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "needs /dev/shm")
+    def test_partition_workers_error(self):
+        def small_bcn(d, init_states=None, L=None, cache=None, tokens=None):
+            if L is not None:
+                raise RuntimeError("failed to build a block")
+            return SmallBCN(d, init_states, L, cache, tokens)
+
+        before = set(os.listdir("/dev/shm"))
+        bcn = LargeBCN(EXAMPLE)
+        with mock.patch.object(pybcn.large_bcn, "PARALLEL_MIN_BITS", 4), \
+                mock.patch.object(pybcn.large_bcn, "SmallBCN", small_bcn):
+            self.assertRaises(RuntimeError, bcn.partition, workers=2)
+        self.assertEqual(set(os.listdir("/dev/shm")) - before, set())
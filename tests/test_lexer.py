@@ -17,3 +17,9 @@ class TestLY(unittest.TestCase):
         self.assertEqual(tokens[6].value, ")")
         self.assertEqual(tokens[7].value, "^")
         self.assertEqual(tokens[8].value, "x4")
+
+    def test_tokenize(self):
+        for expr in ["x3 & ( x1 | x2) ^ x4", "!x_1 & 0 | (u1^u2)", "((a))", ""]:
+            lexer.input(expr)
+            expected = [(tok.type, tok.value, tok.lexpos) for tok in lexer.get_all_tokens()]
+            self.assertEqual([(tok.type, tok.value, tok.lexpos) for tok in tokenize(expr)], expected)
@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import unittest
+from itertools import product
+
+from pybcn.large_bcn import LargeBCN
+from pybcn.lexer import tokenize
+from pybcn.loader import *
+from pybcn.loader import _bnet_expression
+from pybcn.parser import compile_expression, parse
+from pybcn.small_bcn import SmallBCN
+from tests.test_large_bcn import EXAMPLE, EXAMPLE_DEST, EXAMPLE_INIT
+
+
+def bnet(d):
+    return "targets, factors\n" + "".join(f"{var}, {expr}\n" for var, expr in d.items())
+
+
+class TestLoader(unittest.TestCase):
+    def test_read(self):
+        f = io.StringIO("# a comment\ntargets, factors\n\nx1, x2 & u1  # x1\nx2, !x1 | (u2 ^ x2)\n")
+        self.assertEqual(list(read_bnet(f)), [("x1", "x2 & u1"), ("x2", "(!x1) | (u2 ^ x2)")])
+        f = io.StringIO("x1 = x2 & u1\n\n  # a comment\nx2 = 1\n")
+        self.assertEqual(list(read_text(f)), [("x1", "x2 & u1"), ("x2", "1")])
+        self.assertRaises(SyntaxError, list, read_bnet(io.StringIO("x1, x2\nx2 x1\n")))
+        self.assertRaises(SyntaxError, list, read_text(io.StringIO("x1 = \n")))
+
+    def test_bnet_precedence(self):
+        # `!` binds tightest in BoolNet, the expressions are compared with Python's `not`, which does too
+        cases = {
+            "!x2 & x3": lambda x1, x2, x3: (not x2) and x3,
+            "!x1 | x2 & x3": lambda x1, x2, x3: (not x1) or (x2 and x3),
+            "x1 & !x2 | x3": lambda x1, x2, x3: (x1 and not x2) or x3,
+            "!!x1 & x2": lambda x1, x2, x3: (not not x1) and x2,
+            "!(x1 | x2) & !x3": lambda x1, x2, x3: (not (x1 or x2)) and not x3,
+            "!(x1 | !x2 & x3) | x1": lambda x1, x2, x3: (not (x1 or (not x2 and x3))) or x1,
+            "x1 & !x2": lambda x1, x2, x3: x1 and not x2,
+            "(!x3)": lambda x1, x2, x3: not x3,
+        }
+        variables = ["x1", "x2", "x3"]
+        for expr, expected in cases.items():
+            f = compile_expression(parse(tokenize(_bnet_expression(expr))), variables, [])
+            for values in product((0, 1), repeat=3):
+                # the first variable is the most significant bit, and a set bit means the variable is 0
+                s = sum((1 ^ value) << (2 - i) for i, value in enumerate(values))
+                self.assertEqual(f(s, 0), int(bool(expected(*values))), (expr, values))
+
+        bcn = SmallBCN(load_network(io.StringIO(bnet({"x1": "!x2 & x3", "x2": "x2", "x3": "x3"})), "bnet").d)
+        # from [0, 1, 0] x1 stays 0, the state with x2 and x3 kept being position 6
+        self.assertEqual(bcn.next_state(6, 1), 6)
+
+    def test_builder(self):
+        builder = NetworkBuilder()
+        for var, expr in EXAMPLE.items():
+            builder.add(var, expr)
+        self.assertEqual(builder.d, EXAMPLE)
+        self.assertEqual(builder.input_variables, ["u1", "u2", "u3"])
+        # the edges of the variables referred to before they are defined are added once they are
+        expected = {(tok.value, var) for var, expr in EXAMPLE.items() for tok in builder.list_of_tokens[var]
+                    if tok.value in EXAMPLE}
+        names = builder.dag.nodes()
+        self.assertEqual({(names[a], names[b]) for a, b in builder.dag.edge_list()}, expected)
+        self.assertEqual([names[i] for i in builder.dag.node_indices()], list(EXAMPLE))
+        self.assertRaises(AssertionError, builder.add, "x1", "x2")
+
+    def test_load_network(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "example.bnet")
+            with open(path, "w") as f:
+                f.write(bnet(EXAMPLE))
+            self.assertEqual(load_network(path).d, EXAMPLE)
+            with open(path) as f:
+                self.assertEqual(load_network(f, "bnet").d, EXAMPLE)
+            bcn = LargeBCN.from_file(path)
+        expected = LargeBCN(EXAMPLE)
+        self.assertEqual((bcn.d, bcn.input_variables, bcn.m), (expected.d, expected.input_variables, expected.m))
+        text = io.StringIO("".join(f"{var} = {expr}\n" for var, expr in EXAMPLE.items()))
+        self.assertEqual(LargeBCN.from_file(text).d, EXAMPLE)
+
+        bcn.partition()
+        expected.partition()
+        self.assertEqual([block.d for block in bcn.blocks], [block.d for block in expected.blocks])
+        self.assertEqual(bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST),
+                         expected.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST))
@@ -1,5 +1,7 @@
+import random
 import unittest
 
+import numpy as np
 from ply.lex import LexToken
 
 from pybcn.logical_vector import *
@@ -37,6 +39,28 @@ class TestLogicalVector(unittest.TestCase):
     def test_from_states(self):
         self.assertEqual(LogicalVector.from_states(
             [0, 0, 0]), LogicalVector(8, 8))
+        self.assertEqual(LogicalVector.from_states([1, 0, 1]), LogicalVector(3, 8))
+        self.assertRaises(AssertionError, LogicalVector.from_states, [1, 2])
+        rng = random.Random(0)
+        for n in (1, 5, 40, 80):
+            states = [rng.randint(0, 1) for _ in range(n)]
+            v = LogicalVector.from_states(states)
+            self.assertEqual(v, LogicalVector.from_integer(states[0]) * [LogicalVector.from_integer(s) for s in states[1:]])
+            self.assertEqual(v.to_list(), states)
+
+    def test_slots(self):
+        self.assertRaises(AttributeError, setattr, LogicalVector(1, 2), "foo", 1)
+
+    def test_batch(self):
+        rng = np.random.default_rng(0)
+        positions = rng.integers(1, 2 ** 20 + 1, 100)
+        states = positions_to_states(positions, 20)
+        self.assertEqual(states.shape, (100, 20))
+        for pos, row in zip(positions.tolist(), states.tolist()):
+            self.assertEqual(row, LogicalVector(pos, 2 ** 20).to_list())
+        self.assertEqual(states_to_positions(states).tolist(), positions.tolist())
+        self.assertEqual(states_to_positions([[1, 1], [0, 1]]).tolist(), [1, 3])
+        self.assertEqual(positions_to_states([2 ** 63], 64).tolist(), [[1] + [0] * 63])
 
     def test_eq(self):
         self.assertTrue(LogicalVector(5, 16) == LogicalVector(5, 16))
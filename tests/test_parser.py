@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import unittest
+from itertools import product
+
+from pybcn.lexer import lexer
+from pybcn.parser import *
+
+
+def tokenize(expr):
+    lexer.input(expr)
+    return lexer.get_all_tokens()
+
+
+class TestParser(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(
+            parse(tokenize("x1 & (x2 | u1)")),
+            ("AND", ("VARIABLE", "x1"), ("OR", ("VARIABLE", "x2"), ("VARIABLE", "u1")))
+        )
+        self.assertEqual(
+            parse(tokenize("!x1 & x2")),
+            ("NOT", ("AND", ("VARIABLE", "x1"), ("VARIABLE", "x2")))
+        )
+        self.assertRaises(SyntaxError, parse, tokenize("x1 & "))
+        self.assertRaises(SyntaxError, parse, tokenize("(x1 | x2"))
+
+    def test_parse_without_lexer(self):
+        # the ply lexer is built on first use, parsing tokens from `tokenize` must not need it
+        code = (
+            "import pybcn.lexer, pybcn.parser; "
+            "print(pybcn.parser.parse(pybcn.lexer.tokenize('x1 & !u1')), pybcn.lexer._lexer)"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), "('AND', ('VARIABLE', 'x1'), ('NOT', ('VARIABLE', 'u1'))) None")
+
+    def test_precedence(self):
+        for expr in ["x1 | x2 & x3", "x1 ^ x2 & x3", "x1 | x2 ^ x3", "!x1 | x2", "(!x1) & x2 ^ (!x3)"]:
+            tree = parse(tokenize(expr))
+            source = to_source(tree, str)
+            python_expr = expr.replace("!", " not ")
+            for values in product([0, 1], repeat=3):
+                env = dict(zip(["x1", "x2", "x3"], values))
+                self.assertEqual(int(eval(source, {}, env)), int(eval(python_expr, {}, env)), expr)
+
+    def test_to_source(self):
+        tree = parse(tokenize("x1 | x2 | x3 & !x4"))
+        self.assertEqual(to_source(tree, str), "(x1 | x2 | (x3 & (1 ^ x4)))")
+
+    def test_compile_expression(self):
+        f = compile_expression(parse(tokenize("x1 & !u2")), ["x1", "x2"], ["u1", "u2"])
+        # x1 = 1 when the state index has its high bit cleared, u2 = 0 when the low input bit is set
+        self.assertEqual(f(0, 1), 1)
+        self.assertEqual(f(0, 0), 0)
+        self.assertEqual(f(2, 1), 0)
+
+    def test_compile_network(self):
+        variables = ["x1", "x2"]
+        trees = [parse(tokenize("x2")), parse(tokenize("x1 ^ u1"))]
+        f = compile_network(trees, variables, ["u1"])
+        # (x1, x2) = (1, 0), u1 = 1 -> (0, 0)
+        self.assertEqual(f(1, 0), 3)
+        # (x1, x2) = (0, 1), u1 = 0 -> (1, 0)
+        self.assertEqual(f(2, 1), 1)
+
+    def test_constants(self):
+        self.assertEqual(to_source(parse(tokenize("x1 & 0 | !1")), str), "((x1 & 0) | (1 ^ 1))")
+        f = compile_expression(parse(tokenize("x1 | 1")), ["x1"], [])
+        self.assertEqual([f(s, 0) for s in range(2)], [1, 1])
+        self.assertEqual(compile_vectorized(parse(tokenize("0")))({}), 0)
@@ -0,0 +1,118 @@
+import unittest
+
+from pybcn.reachability import *
+from pybcn.small_bcn import SmallBCN
+
+
+def one_step_states(L, N, M, state):
+    res = {}
+    for k in range(M):
+        res.setdefault(int(L[k * N + state - 1]), []).append(k + 1)
+    return res
+
+
+class TestSuccessorIndex(unittest.TestCase):
+    def setUp(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        self.bcn = SmallBCN(d)
+        self.index = SuccessorIndex(self.bcn.L, self.bcn.N, self.bcn.M)
+
+    def test_successors(self):
+        for state in range(1, self.bcn.N + 1):
+            expected = one_step_states(self.bcn.L, self.bcn.N, self.bcn.M, state)
+            self.assertEqual(list(self.index.successors(state).items()), list(expected.items()))
+        self.assertEqual(self.index.indptr[-1], len(self.index.next_states))
+        self.assertEqual(self.index.input_indptr[-1], self.bcn.N * self.bcn.M)
+
+    def test_image(self):
+        rng = np.random.default_rng(0)
+        for _ in range(10):
+            mask = rng.random(self.bcn.N) < 0.3
+            states = np.flatnonzero(mask) + 1
+            expected = sorted({s for state in states for s in one_step_states(self.bcn.L, self.bcn.N, self.bcn.M, state)})
+            self.assertEqual((np.flatnonzero(self.index.image(mask)) + 1).tolist(), expected)
+            self.assertEqual(self.index.image_of(states.tolist()).tolist(), expected)
+            preimage = [
+                state for state in range(1, self.bcn.N + 1)
+                if any(mask[s - 1] for s in one_step_states(self.bcn.L, self.bcn.N, self.bcn.M, state))
+            ]
+            self.assertEqual((np.flatnonzero(self.index.preimage(mask)) + 1).tolist(), preimage)
+        self.assertEqual(self.index.image_of([]).tolist(), [])
+
+    def test_predecessors(self):
+        predecessors = PredecessorIndex(self.index)
+        for state in range(1, self.bcn.N + 1):
+            self.assertEqual(self.index.next_of(state).tolist(), list(one_step_states(self.bcn.L, self.bcn.N, self.bcn.M, state)))
+            expected = [
+                s for s in range(1, self.bcn.N + 1) if state in one_step_states(self.bcn.L, self.bcn.N, self.bcn.M, s)
+            ]
+            self.assertEqual(predecessors.previous_of(state).tolist(), expected)
+        self.assertEqual(predecessors.indptr[-1], len(self.index.next_states))
+
+
+class TestForwardLayers(unittest.TestCase):
+    def setUp(self):
+        d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
+        self.bcn = SmallBCN(d)
+
+    def test_extend(self):
+        layers = ForwardLayers(self.bcn.L, self.bcn.N, self.bcn.M, 8)
+        self.assertEqual(np.flatnonzero(layers.extend()).tolist(), [6, 7])
+        self.assertEqual(layers.T, 1)
+        layers.extend_to(3)
+        self.assertEqual(len(layers.layers), 4)
+        self.assertTrue(layers.reaches(7, 1))
+        self.assertFalse(layers.reaches(1, 1))
+
+    def test_min_time(self):
+        layers = ForwardLayers(self.bcn.L, self.bcn.N, self.bcn.M, 8)
+        self.assertEqual(layers.min_time(8), 1)
+        self.assertEqual(layers.min_time(3), 2)
+        # x1 = x2 = x3 = 1 has no predecessor
+        self.assertIsNone(layers.min_time(1))
+        self.assertIsNotNone(layers.period)
+
+    def test_paths(self):
+        layers = ForwardLayers(self.bcn.L, self.bcn.N, self.bcn.M, 8)
+        self.assertEqual(list(layers.paths(8, 1)), [([8, 8], [[2]])])
+        self.assertEqual(list(layers.paths(3, 2)), [([8, 7, 3], [[1], [1]])])
+        self.assertEqual(list(layers.paths(2, 3)), [([8, 7, 3, 2], [[1], [1], [1]])])
+        self.assertEqual(list(layers.paths(1, 3)), [])
+
+
+class TestBackwardLayers(unittest.TestCase):
+    def setUp(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        self.bcn = SmallBCN(d)
+
+    def test_min_time(self):
+        for dest in range(1, self.bcn.N + 1):
+            layers = BackwardLayers(self.bcn.successors, dest)
+            for init in range(1, self.bcn.N + 1):
+                forward = ForwardLayers(self.bcn.L, self.bcn.N, self.bcn.M, init, self.bcn.successors)
+                self.assertEqual(layers.min_time(init), forward.min_time(dest))
+            self.assertIsNotNone(layers.complete().period)
+
+    def test_reaches(self):
+        layers = BackwardLayers(self.bcn.successors, 15)
+        forward = ForwardLayers(self.bcn.L, self.bcn.N, self.bcn.M, 3, self.bcn.successors)
+        for k in range(6):
+            self.assertEqual(layers.reaches(3, k), forward.reaches(15, k))
+
+    def test_max_bytes(self):
+        # two layers, `times` and the 6 packed layers of 2 bytes seen after 5 steps
+        max_bytes = 2 * self.bcn.N + 4 * self.bcn.N + 6 * 2
+        layers = BackwardLayers(self.bcn.successors, 15, max_bytes=max_bytes)
+        expected = BackwardLayers(self.bcn.successors, 15).complete()
+        layers.extend_to(5)
+        self.assertEqual(layers.nbytes, max_bytes)
+        self.assertEqual(len(layers.layers), 2)
+        self.assertEqual(layers.first, 4)
+        self.assertEqual(layers.k, 5)
+        self.assertRaises(ValueError, layers.reaches, 3, 2)
+        self.assertEqual(layers.reaches(3, 5), expected.reaches(3, 5))
+        layers.complete()
+        self.assertEqual(layers.times.tolist(), expected.times.tolist())
+        self.assertLessEqual(layers.nbytes, max_bytes)
+        # the packed layers are freed once the period is found
+        self.assertEqual(layers.nbytes, len(layers.layers) * self.bcn.N + 4 * self.bcn.N)
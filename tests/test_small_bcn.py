@@ -1,8 +1,81 @@
+import os
+import sys
+import tempfile
 import unittest
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+
+from benchmarks.networks import random_network
 from pybcn.small_bcn import *
 
 
+def optimal_time_control_paths(bcn, init, dest):
+    """
+    `SmallBCN.optimal_time_control` copying the whole path of every queue entry.
+    """
+    s = set((init,))
+    q = deque([(init, [init], [])])
+    T = sys.maxsize
+    res = []
+    while len(q) != 0:
+        state, seq, c_seq = q.popleft()
+        if len(seq) >= T:
+            continue
+        for next_state, inputs in bcn.one_step_states(state).items():
+            new_seq = seq + [next_state]
+            new_c_seq = c_seq + [inputs]
+            if next_state == dest:
+                T = len(seq)
+                res.append((new_seq, new_c_seq))
+            if next_state not in s:
+                s.add(next_state)
+                q.append((next_state, new_seq, new_c_seq))
+    return T, res
+
+
+def generate_assr_loop(bcn):
+    """
+    The ASSR of `bcn` generated one state-input pair at a time with its compiled transition function,
+    `SmallBCN._generate_assr` before it was vectorized.
+    """
+    N = bcn.N
+    L = [0] * (bcn.M * N)
+    for j in range(bcn.M):
+        offset = j * N
+        for i in range(N):
+            L[i + offset] = bcn._transition(i, j) + 1
+    return np.array(L, dtype=assr_dtype(N))
+
+
+def optimal_time_control_2_bfs(bcn, init, dest):
+    """
+    `SmallBCN.optimal_time_control_2` with a BFS copying the whole path of every queue entry.
+    Its memory grows like M ** T and it does not terminate if `dest` is unreachable.
+    """
+    T = 0
+    q = deque([(init, [init], [])])
+    res = []
+    flag = True
+
+    while flag:
+        T += 1
+        while len(q[0][1]) == T:
+            state, seq, c_seq = q.popleft()
+            for next_state, inputs in bcn.one_step_states(state).items():
+                new_seq = seq + [next_state]
+                new_c_seq = c_seq + [inputs]
+                q.append((next_state, new_seq, new_c_seq))
+
+        for i in q:
+            if i[0] == dest:
+                res.append((i[1], i[2]))
+                flag = False
+
+    return T, res
+
+
 class TestSmallBCN(unittest.TestCase):
     def test_init(self):
         d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | x3", "x3": "x1 & u2"}
@@ -13,10 +86,23 @@ class TestSmallBCN(unittest.TestCase):
         self.assertEqual(bcn.input_variables, ["u1", "u2"])
         self.assertEqual(bcn.states, {"x1": 1, "x2": 0, "x3": 1})
 
+    def test_constants(self):
+        bcn = SmallBCN({"x1": "x2 | u1", "x2": "0", "x3": "1 ^ x1"})
+        self.assertEqual(bcn.input_variables, ["u1"])
+        for state in range(1, bcn.N + 1):
+            for inputs in range(1, bcn.M + 1):
+                x1, x2, x3 = LogicalVector(state, bcn.N).to_list()
+                u1, = LogicalVector(inputs, bcn.M).to_list()
+                self.assertEqual(LogicalVector(bcn.next_state(state, inputs), bcn.N).to_list(), [x2 | u1, 0, 1 ^ x1])
+
     def test_update_variable(self):
         d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | x3", "x3": "x1 & u2"}
         bcn = SmallBCN(d, [1, 0, 1])
         self.assertEqual(bcn.update_variable("x1", {"u1": 1, "u2": 0}), 1)
+        # only the inputs the update function refers to are required
+        self.assertEqual(bcn.update_variable("x2", {}), 1)
+        self.assertEqual(bcn.update_variable("x1", {"u1": 1}), 1)
+        self.assertRaises(KeyError, bcn.update_variable, "x3", {"u1": 1})
 
     def test_set_states(self):
         d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | x3", "x3": "x1 & u2"}
@@ -42,15 +128,136 @@ class TestSmallBCN(unittest.TestCase):
         d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
         bcn = SmallBCN(d)
         self.assertEqual(
-            bcn.L,
+            bcn.L.tolist(),
             [2, 2, 2, 6, 3, 3, 3, 7, 4, 4, 4, 8, 3, 3, 4, 8]
         )
 
     def test_one_step_states(self):
         d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
         bcn = SmallBCN(d)
-        states = list(bcn.one_step_states(8))
+        states = list(bcn.one_step_states(8).items())
         self.assertEqual(
             states,
-            [(7, 1), (8, 2)]
+            [(7, [1]), (8, [2])]
         )
+        self.assertEqual(bcn.one_step_image([4, 8]).tolist(), [6, 7, 8])
+
+    def test_generate_assr_loop(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        L = generate_assr_loop(bcn)
+        self.assertEqual(L.dtype, bcn.L.dtype)
+        self.assertEqual(L.tolist(), bcn.L.tolist())
+
+    def test_assr_dtype(self):
+        self.assertEqual(assr_dtype(2 ** 8), np.uint16)
+        self.assertEqual(assr_dtype(2 ** 7), np.uint8)
+        d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
+        self.assertEqual(SmallBCN(d).L.dtype, np.uint8)
+
+    def test_save_load_assr(self):
+        d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
+        bcn = SmallBCN(d)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "L.npy")
+            bcn.save_assr(path)
+            loaded = SmallBCN.load_assr(d, path, [1, 0, 1])
+            self.assertIsInstance(loaded.L, np.memmap)
+            self.assertEqual(loaded.L.tolist(), bcn.L.tolist())
+            self.assertEqual(loaded.next_state(8, 2), bcn.next_state(8, 2))
+            self.assertEqual(loaded.one_step_states(3), bcn.one_step_states(3))
+            self.assertEqual(loaded.get_states("list"), [1, 0, 1])
+            del loaded
+        self.assertRaises(AssertionError, SmallBCN, d, None, bcn.L[:-1])
+        self.assertRaises(AssertionError, SmallBCN, d, None, bcn.L.astype(np.uint32))
+
+    def test_optimal_time_control(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        for init in range(1, bcn.N + 1):
+            for dest in range(1, bcn.N + 1):
+                self.assertEqual(bcn.optimal_time_control(init, dest), optimal_time_control_paths(bcn, init, dest))
+        self.assertEqual(bcn.optimal_time_control(3, 5), (sys.maxsize, []))
+
+    def test_optimal_time_control_2(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        for init, dest in [(1, 16), (3, 15), (16, 16), (7, 2)]:
+            T, res = bcn.optimal_time_control_2(init, dest)
+            self.assertEqual((T, res), optimal_time_control_2_bfs(bcn, init, dest))
+            self.assertEqual(bcn.optimal_time_control_2(init, dest, first_only=True), (T, res[:1]))
+        self.assertEqual(bcn.optimal_time_control_2(3, 5), (sys.maxsize, []))
+        d = {"x1": "x2 | x3", "x2": "x1 & u1", "x3": "(u1 | x2) & (!x1)"}
+        self.assertEqual(SmallBCN(d).optimal_time_control_2(8, 1), (sys.maxsize, []))
+
+    def test_iter_optimal_controls(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        for init, dest in [(1, 16), (3, 15), (16, 16), (7, 2)]:
+            T, res = bcn.optimal_time_control_2(init, dest)
+            solutions = bcn.iter_optimal_controls(init, dest)
+            self.assertEqual(next(solutions), res[0])
+            self.assertEqual(list(solutions), res[1:])
+            self.assertEqual(list(bcn.iter_optimal_controls(init, dest, limit=2)), res[:2])
+        self.assertEqual(list(bcn.iter_optimal_controls(3, 5)), [])
+
+    def test_optimal_time_control_bidirectional(self):
+        for seed in range(6):
+            bcn = SmallBCN(random_network(7, 2, degree=2, seed=seed))
+            rng = np.random.default_rng(seed)
+            pairs = [(1, 1)] + [tuple(pair) for pair in rng.integers(1, bcn.N + 1, (40, 2)).tolist()]
+            for init, dest in pairs:
+                T, res = bcn.optimal_time_control(init, dest)
+                T2, res2 = bcn.optimal_time_control(init, dest, bidirectional=True)
+                self.assertEqual(T2, T)
+                if T == sys.maxsize:
+                    self.assertEqual(res2, [])
+                    continue
+                (seq, c_seq), = res2
+                self.assertEqual((seq[0], seq[-1], len(seq)), (init, dest, T + 1))
+                for t in range(T):
+                    self.assertEqual(c_seq[t], bcn.one_step_states(seq[t])[seq[t + 1]])
+
+    def test_min_time(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        times = bcn.all_pairs_min_time()
+        for init in range(1, bcn.N + 1):
+            for dest in range(1, bcn.N + 1):
+                T = bcn.optimal_time_control_2(init, dest)[0]
+                self.assertEqual(bcn.min_time(init, dest), T)
+                self.assertEqual(times[init - 1, dest - 1], T)
+        layers = bcn.controllability(15, max_bytes=1024)
+        self.assertIs(bcn.controllability(15), layers)
+        self.assertEqual(layers.max_bytes, 1024)
+
+    def test_simulate_batch(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2"}
+        bcn = SmallBCN(d)
+        rng = np.random.default_rng(0)
+        inits = rng.integers(1, bcn.N + 1, 50)
+        inputs = rng.integers(1, bcn.M + 1, (50, 7))
+        res = bcn.simulate_batch(inits, inputs)
+        self.assertEqual(res.shape, (50, 8))
+        for k in range(50):
+            state = int(inits[k])
+            self.assertEqual(res[k, 0], state)
+            for t in range(7):
+                state = bcn.next_state(state, int(inputs[k, t]))
+                self.assertEqual(res[k, t + 1], state)
+        steps = bcn.simulate_batch(inits, inputs, stream=True)
+        self.assertNotIsInstance(steps, np.ndarray)
+        np.testing.assert_array_equal(np.stack(list(steps), axis=1), res)
+        np.testing.assert_array_equal(bcn.simulate_batch(inits, inputs[0]), bcn.simulate_batch(inits, np.tile(inputs[0], (50, 1))))
+        self.assertEqual(bcn.simulate_batch([3], np.zeros((1, 0), dtype=int)).tolist(), [[3]])
+
+    def test_min_time_threads(self):
+        d = {"x1": "x2 & x3 ^ u1", "x2": "x1 | (!x3)", "x3": "x1 & u2 | x4", "x4": "!x4 ^ u1 & x2", "x5": "x5 ^ x1"}
+        expected = SmallBCN(d).all_pairs_min_time()
+        for _ in range(5):
+            bcn = SmallBCN(d)
+            pairs = [(init, dest) for dest in range(1, bcn.N + 1) for init in range(1, bcn.N + 1)] * 3
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                times = list(executor.map(lambda pair: bcn.min_time(*pair), pairs))
+            for (init, dest), T in zip(pairs, times):
+                self.assertEqual(T, expected[init - 1, dest - 1])
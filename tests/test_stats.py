@@ -0,0 +1,69 @@
+import unittest
+
+from pybcn import stats
+from pybcn.large_bcn import LargeBCN
+from pybcn.stats import SolverStats
+from tests.test_large_bcn import EXAMPLE, EXAMPLE_DEST, EXAMPLE_INIT, EXAMPLE_RESULT, normalize
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.bcn = LargeBCN(EXAMPLE)
+        self.bcn.partition()
+
+    def test_solver_stats(self):
+        solver_stats = SolverStats()
+        T, res = self.bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST, stats=solver_stats)
+        self.assertEqual((T, normalize(res)), (4, EXAMPLE_RESULT))
+        self.assertEqual(solver_stats.T, 4)
+        self.assertEqual(solver_stats.combinations, 1)
+        self.assertEqual(set(solver_stats.phases), {"project", "forward", "paths", "combinations", "downstream"})
+        self.assertAlmostEqual(solver_stats.total, sum(solver_stats.as_dict()["phases"].values()))
+        k = self.bcn.A[0]
+        source = solver_stats.blocks[k]
+        self.assertEqual(source.paths, 1)
+        layers = self.bcn.blocks[k].forward_layers(self.bcn.project(EXAMPLE_INIT)[k])
+        layers.extend_to(4)
+        self.assertEqual(source.states_expanded, sum(layers.size(t) for t in range(5)))
+        self.assertGreaterEqual(source.states_expanded, source.queue_peak)
+        for k in self.bcn.B:
+            self.assertEqual((solver_stats.blocks[k].combinations, solver_stats.blocks[k].simulations), (1, 1))
+
+    def test_symbolic_blocks(self):
+        bcn = LargeBCN(EXAMPLE)
+        bcn.partition(symbolic_min_bits=5)
+        solver_stats = SolverStats()
+        bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST, stats=solver_stats)
+        expected = SolverStats()
+        self.bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST, stats=expected)
+        self.assertEqual(solver_stats.blocks[bcn.A[0]].as_dict(), expected.blocks[self.bcn.A[0]].as_dict())
+
+    def test_hooks(self):
+        self.assertIsNone(stats.stats_for(None))
+        events = []
+        hook = stats.subscribe(lambda event, solver_stats: events.append((event, solver_stats.T)))
+        try:
+            self.assertIsInstance(stats.stats_for(None), SolverStats)
+            self.bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)
+        finally:
+            stats.unsubscribe(hook)
+        self.assertEqual(events, [("horizon", 1), ("horizon", 2), ("horizon", 3), ("horizon", 4), ("done", 4)])
+        self.bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST)
+        self.assertEqual(len(events), 5)
+
+    def test_hook(self):
+        events = []
+        solver_stats = SolverStats(hook=lambda event, solver_stats: events.append((event, solver_stats.T)))
+        self.bcn.optimal_time_control(EXAMPLE_INIT, EXAMPLE_DEST, stats=solver_stats)
+        self.assertEqual(
+            events, [("horizon", 1), ("horizon", 2), ("horizon", 3), ("combination", 4), ("horizon", 4), ("done", 4)]
+        )
+
+        # an exception raised by a hook stops the query
+        def stop(event, solver_stats):
+            if solver_stats.T == 2:
+                raise RuntimeError("stop")
+
+        solver_stats = SolverStats(hook=stop)
+        self.assertRaises(RuntimeError, self.bcn.optimal_time_control, EXAMPLE_INIT, EXAMPLE_DEST, solver_stats)
+        self.assertEqual(solver_stats.T, 2)
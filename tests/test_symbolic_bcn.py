@@ -0,0 +1,61 @@
+import random
+import unittest
+from itertools import product
+
+import numpy as np
+
+from benchmarks.networks import random_network
+from pybcn.small_bcn import SmallBCN
+from pybcn.symbolic_bcn import *
+
+
+class TestSymbolicBCN(unittest.TestCase):
+    def test_transitions(self):
+        for seed in range(4):
+            d = random_network(5, 2, seed=seed)
+            small = SmallBCN(d)
+            bcn = SymbolicBCN(d)
+            for state in range(1, small.N + 1):
+                self.assertEqual(bcn.one_step_states(state), small.one_step_states(state))
+                for inputs in range(1, small.M + 1):
+                    self.assertEqual(bcn.next_state(state, inputs), small.next_state(state, inputs))
+            states = [1, 5, 17, 32]
+            self.assertEqual(list(bcn.states_of(bcn.image(bcn.state_set(states)))), small.one_step_image(states).tolist())
+            preimage = small.successors.preimage(np.isin(np.arange(1, small.N + 1), states))
+            self.assertEqual(list(bcn.states_of(bcn.preimage(bcn.state_set(states)))), (np.flatnonzero(preimage) + 1).tolist())
+
+    def test_optimal_time_control(self):
+        for seed in range(4):
+            d = random_network(6, 2, seed=seed)
+            small = SmallBCN(d)
+            bcn = SymbolicBCN(d)
+            rng = random.Random(seed)
+            for _ in range(20):
+                init, dest = rng.randint(1, small.N), rng.randint(1, small.N)
+                expected = small.optimal_time_control_2(init, dest)
+                self.assertEqual(bcn.optimal_time_control_2(init, dest), expected)
+                self.assertEqual(bcn.optimal_time_control(init, dest), small.optimal_time_control_2(init, dest, first_only=True))
+                self.assertEqual(bcn.min_time(init, dest), expected[0])
+                self.assertEqual(list(bcn.iter_optimal_controls(init, dest, limit=3)), expected[1][:3])
+
+    def test_control_driven(self):
+        d = {"x1": "x2 & u1 | x3", "x2": "x1 ^ u2", "x3": "!x3 & u3"}
+        small = SmallBCN(d)
+        bcn = SymbolicBCN(d)
+        rng = random.Random(0)
+        for _ in range(30):
+            T = rng.randint(1, 4)
+            interior = [{"u1": rng.randint(0, 1)} for _ in range(T)]
+            init, dest = rng.randint(1, bcn.N), rng.randint(1, bcn.N)
+            res = bcn.control_driven(T, interior, init, dest)
+            # the least inputs in lexicographic order reaching `dest`, found by brute force
+            expected = None
+            for free in product(*[[(1, 1), (1, 0), (0, 1), (0, 0)]] * T):
+                seq, c_seq = [init], []
+                for values, (u2, u3) in zip(interior, free):
+                    c_seq.append(small.get_inputs({"u1": values["u1"], "u2": u2, "u3": u3}))
+                    seq.append(small.next_state(seq[-1], c_seq[-1]))
+                if seq[-1] == dest:
+                    expected = [seq, c_seq]
+                    break
+            self.assertEqual(res, expected)